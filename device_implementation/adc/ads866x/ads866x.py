@@ -12,7 +12,7 @@ Datasheet: https://www.ti.com/lit/ds/symlink/ads8661.pdf
 """
 
 from device_implementation.adc import AdcBase
-from typing import Callable, Optional
+from typing import Callable, Literal, Optional, overload
 
 from device_implementation.adc.ads866x.operations import (
     Nop,
@@ -23,35 +23,62 @@ from device_implementation.adc.ads866x.operations import (
     SetGpo,
     ClearGpo,
 )
-from spi_elements.async_return import AsyncReturn
+from spi_elements.async_return import AsyncReturn, create_async_return
 from spi_elements.spi_operation_request_iterator import (
-    SequenceTransferOperationRequest,
+    OperationPriority,
     SingleTransferOperationRequest,
 )
+from spi_elements.transfer_plan import TransferPlanRequest
 
 
 class Ads866x(AdcBase):
     def __init__(self) -> None:
         super().__init__()
-
-    def _get_default_operation_request(self) -> SingleTransferOperationRequest:
-        return SingleTransferOperationRequest(
+        # The default operation request is shared by all idle cycles.
+        self._default_operation_request = SingleTransferOperationRequest(
             operation=Nop(),
             callback=None,
         )
 
+    def _get_default_operation_request(self) -> SingleTransferOperationRequest:
+        return self._default_operation_request
+
+    def _get_idle_operation_request(self) -> SingleTransferOperationRequest:
+        # The Nop neither takes a response nor has a callback.
+        return self._default_operation_request
+
+    @overload
     def nop(
         self,
         callback: Optional[Callable[..., None]] = None,
-    ) -> AsyncReturn:
+        fire_and_forget: Literal[False] = False,
+    ) -> AsyncReturn: ...
+
+    @overload
+    def nop(
+        self,
+        callback: Optional[Callable[..., None]] = None,
+        *,
+        fire_and_forget: Literal[True],
+    ) -> None: ...
+
+    def nop(
+        self,
+        callback: Optional[Callable[..., None]] = None,
+        fire_and_forget: bool = False,
+    ) -> Optional[AsyncReturn]:
         """Perform no operation. Can be used to wait for a cycle to
-        synchoronize multiple spi_elements."""
-        ar = AsyncReturn(callback)
+        synchoronize multiple spi_elements.
+
+        :param fire_and_forget: if True, no AsyncReturn is created and None is
+        returned. The callback is still called with the response.
+        """
+        ar, ar_callback = create_async_return(callback, fire_and_forget)
 
         self._put_unprocessed_operation_request(
             SingleTransferOperationRequest(
                 operation=Nop(),
-                callback=ar.get_callback(),
+                callback=ar_callback,
             ),
         )
         return ar
@@ -66,48 +93,106 @@ class Ads866x(AdcBase):
         ar = AsyncReturn(callback)
 
         self._put_unprocessed_operation_request(
-            SequenceTransferOperationRequest(
-                operation=Initialize(input_range),
+            TransferPlanRequest(
+                plan=self._get_transfer_plan(
+                    (Initialize, input_range), lambda: Initialize(input_range)
+                ),
                 callback=ar.get_callback(),
             ),
         )
         return ar
 
-    def read(self, callback: Optional[Callable[..., None]] = None) -> AsyncReturn:
-        """Read the quantizied analog voltage(s) and return the voltage as float."""
-        ar = AsyncReturn(callback)
+    @overload
+    def read(
+        self,
+        callback: Optional[Callable[..., None]] = None,
+        priority: OperationPriority = OperationPriority.NORMAL,
+        fire_and_forget: Literal[False] = False,
+    ) -> AsyncReturn: ...
+
+    @overload
+    def read(
+        self,
+        callback: Optional[Callable[..., None]] = None,
+        priority: OperationPriority = OperationPriority.NORMAL,
+        *,
+        fire_and_forget: Literal[True],
+    ) -> None: ...
+
+    def read(
+        self,
+        callback: Optional[Callable[..., None]] = None,
+        priority: OperationPriority = OperationPriority.NORMAL,
+        fire_and_forget: bool = False,
+    ) -> Optional[AsyncReturn]:
+        """Read the quantizied analog voltage(s) and return the voltage as float.
+
+        :param priority: OperationPriority of the operation request.
+        :param fire_and_forget: if True, no AsyncReturn is created and None is
+        returned. The callback is still called with the response.
+        """
+        ar, ar_callback = create_async_return(callback, fire_and_forget)
 
         self._put_unprocessed_operation_request(
             SingleTransferOperationRequest(
                 operation=ReadVoltage(),
-                callback=ar.get_callback(),
+                callback=ar_callback,
             ),
+            priority=priority,
         )
         return ar
 
+    @overload
+    def write_gpo(
+        self,
+        callback: Optional[Callable[..., None]] = None,
+        gpo_val: Optional[Ads866xGpoVal] = None,
+        priority: OperationPriority = OperationPriority.NORMAL,
+        fire_and_forget: Literal[False] = False,
+    ) -> AsyncReturn: ...
+
+    @overload
+    def write_gpo(
+        self,
+        callback: Optional[Callable[..., None]] = None,
+        gpo_val: Optional[Ads866xGpoVal] = None,
+        priority: OperationPriority = OperationPriority.NORMAL,
+        *,
+        fire_and_forget: Literal[True],
+    ) -> None: ...
+
     def write_gpo(
         self,
         callback: Optional[Callable[..., None]] = None,
         gpo_val: Optional[Ads866xGpoVal] = None,
-    ):
-        """Write the specified value to the digital general purpose output of the adc."""
+        priority: OperationPriority = OperationPriority.NORMAL,
+        fire_and_forget: bool = False,
+    ) -> Optional[AsyncReturn]:
+        """Write the specified value to the digital general purpose output of the adc.
+
+        :param priority: OperationPriority of the operation request.
+        :param fire_and_forget: if True, no AsyncReturn is created and None is
+        returned. The callback is still called with the response.
+        """
         if not gpo_val:
             raise ValueError("gpo_val must be defined by caller")
 
-        ar = AsyncReturn(callback)
+        ar, ar_callback = create_async_return(callback, fire_and_forget)
         if gpo_val == Ads866xGpoVal.HIGH:
             self._put_unprocessed_operation_request(
                 SingleTransferOperationRequest(
                     operation=SetGpo(),
-                    callback=ar.get_callback(),
-                )
+                    callback=ar_callback,
+                ),
+                priority=priority,
             )
         elif gpo_val == Ads866xGpoVal.LOW:
             self._put_unprocessed_operation_request(
                 SingleTransferOperationRequest(
                     operation=ClearGpo(),
-                    callback=ar.get_callback(),
-                )
+                    callback=ar_callback,
+                ),
+                priority=priority,
             )
         else:
             raise RuntimeError(  # pyright: ignore
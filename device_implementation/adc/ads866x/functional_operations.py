@@ -2,8 +2,8 @@ from typing import Any, List
 from bitarray import bitarray
 from enum import Enum
 
-from util import bitarray_to_uint
-from spi_operation import SequenceTransferOperation
+from util import bitarray_to_uint, uint_to_bitarray
+from spi_operation import SequenceTransferOperation, constant_operation
 import device_implementation.adc.ads866x.register_operations as op
 import device_implementation.adc.ads866x.registers as reg
 
@@ -156,6 +156,7 @@ class Initialize(SequenceTransferOperation):
         return None
 
 
+@constant_operation
 class ReadVoltage(op.Ads866xSingleTransferOperation):
     """Read the quantized analog voltage from the adc."""
 
@@ -243,24 +244,26 @@ class ReadVoltage(op.Ads866xSingleTransferOperation):
         return ba.count() % 2 == 0
 
 
+@constant_operation
 class SetGpo(op.SetHword):
     """Set the general purpose output of the ADC."""
 
     def __init__(self):
         SDO_CTL_REG = reg.SdoCtlReg()
-        SDO_CTL_REG.data[SDO_CTL_REG.GPO_VAL.slice] = bitarray("1")
+        SDO_CTL_REG.data[SDO_CTL_REG.GPO_VAL.slice] = uint_to_bitarray(0b1, 1)
 
         super().__init__(
             addr=SDO_CTL_REG.address_lower_halfword_ba, data=SDO_CTL_REG.data[0:16]
         )
 
 
+@constant_operation
 class ClearGpo(op.ClearHword):
     """Clear the general purpose output of the ADC."""
 
     def __init__(self):
         SDO_CTL_REG = reg.SdoCtlReg()
-        SDO_CTL_REG.data[SDO_CTL_REG.GPO_VAL.slice] = bitarray("1")
+        SDO_CTL_REG.data[SDO_CTL_REG.GPO_VAL.slice] = uint_to_bitarray(0b1, 1)
 
         super().__init__(
             addr=SDO_CTL_REG.address_lower_halfword_ba, data=SDO_CTL_REG.data[0:16]
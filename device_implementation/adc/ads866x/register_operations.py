@@ -2,11 +2,14 @@ from __future__ import annotations
 
 from abc import abstractmethod
 from typing import Any, List, Optional, Tuple
-from copy import deepcopy
 from bitarray import bitarray
 from warnings import warn
-from util import reverse_string, concat_bitarray
-from spi_operation import SingleTransferOperation, SequenceTransferOperation
+from util import uint_to_bitarray, concat_bitarray, FrameLayout, FrameTemplate
+from spi_operation import (
+    SingleTransferOperation,
+    SequenceTransferOperation,
+    constant_operation,
+)
 
 # ADS866x WORD == 32 bit
 
@@ -14,6 +17,11 @@ from spi_operation import SingleTransferOperation, SequenceTransferOperation
 class Ads866xSingleTransferOperation(SingleTransferOperation):
     """SingleTransferOperation of Ads866x with its structure."""
 
+    layout = FrameLayout({"data": 16, "addr": 9, "byte_selector": 2, "op": 5})
+    # Fixed fields of the operation. Child classes replace the template with
+    # their own, such that only the variable fields are patched per instance.
+    template = FrameTemplate(layout)
+
     def __init__(
         self,
         op: bitarray | None = None,
@@ -23,22 +31,19 @@ class Ads866xSingleTransferOperation(SingleTransferOperation):
         response: Optional[bitarray] = None,
         response_required: bool = True,
     ):
-        if not op:
-            op = bitarray(reverse_string("00000"))
-        if not byte_selector:
-            byte_selector = bitarray(reverse_string("00"))
-        if not addr:
-            addr = bitarray(reverse_string("0 00000000"))
-        if not data:
-            data = bitarray(reverse_string("00000000 00000000"))
+        # The template checks the bitlength of the fields.
+        fields = {}
+        if op:
+            fields["op"] = op
+        if byte_selector:
+            fields["byte_selector"] = byte_selector
+        if addr:
+            fields["addr"] = self.check_addr(addr)
+        if data:
+            fields["data"] = data
 
         super().__init__(
-            command=concat_bitarray(
-                self.check_data(data),
-                self.check_addr(addr),
-                self.check_byte_selector(byte_selector),
-                self.check_op(op),
-            ),
+            command=self.template.build(**fields),
             response=response,
             response_required=response_required,
         )
@@ -61,33 +66,17 @@ class Ads866xSingleTransferOperation(SingleTransferOperation):
 
         return None
 
-    def check_op(self, op: bitarray):
-        if len(op) != 5:
-            raise ValueError(f"Expected 5-bit op, but got {op=}")
-        return op
-
-    def check_byte_selector(self, bs: bitarray):
-        if len(bs) != 2:
-            raise ValueError(f"Expected 2-bit byteselector, but got {bs=}")
-        return bs
-
     def check_addr(self, addr: bitarray):
-        if len(addr) != 9:
-            raise ValueError(f"Expected 9-bit addr, but got {addr=}")
         if addr[0] == 1:
-            addr_old = deepcopy(addr)
+            addr_old = addr.copy()
             addr[0] = 0
             warn(
                 f"ADS866x: Address {addr_old} is not aligned to 2-byte, aligned to {addr}"
             )
         return addr
 
-    def check_data(self, data: bitarray):
-        if len(data) != 16:
-            raise ValueError(f"Expected 16-bit data, but got {data=}")
-        return data
-
 
+@constant_operation
 class Nop(Ads866xSingleTransferOperation):
     """No operation"""
 
@@ -98,6 +87,10 @@ class Nop(Ads866xSingleTransferOperation):
 class ClearHword(Ads866xSingleTransferOperation):
     """Clear up to half word worth bits of a register"""
 
+    template = FrameTemplate(
+        Ads866xSingleTransferOperation.layout, {"op": uint_to_bitarray(0b11000, 5)}
+    )
+
     def __init__(self, addr: bitarray, data: bitarray):
         """Any bit marked 1 in the data field results in that particular bit of
         the specified register being reset to 0, leaving the other bits
@@ -108,7 +101,6 @@ class ClearHword(Ads866xSingleTransferOperation):
         """
 
         super().__init__(
-            op=bitarray(reverse_string("11000")),
             addr=addr,
             data=data,
             response_required=False,
@@ -118,6 +110,10 @@ class ClearHword(Ads866xSingleTransferOperation):
 class SetHword(Ads866xSingleTransferOperation):
     """Set up to half word worth bits of a register"""
 
+    template = FrameTemplate(
+        Ads866xSingleTransferOperation.layout, {"op": uint_to_bitarray(0b11011, 5)}
+    )
+
     def __init__(self, addr: bitarray, data: bitarray):
         """Any bit marked 1 in the data field results in that particular bit of
         the specified register being set to 1, leaving the other bits
@@ -128,7 +124,6 @@ class SetHword(Ads866xSingleTransferOperation):
         """
 
         super().__init__(
-            op=bitarray(reverse_string("11011")),
             addr=addr,
             data=data,
             response_required=False,
@@ -138,6 +133,10 @@ class SetHword(Ads866xSingleTransferOperation):
 class ReadHword(Ads866xSingleTransferOperation):
     """Read a half word read operation"""
 
+    template = FrameTemplate(
+        Ads866xSingleTransferOperation.layout, {"op": uint_to_bitarray(0b11001, 5)}
+    )
+
     def __init__(self, addr: bitarray):
         """Read the data of the half word at address 'addr'.
 
@@ -145,7 +144,6 @@ class ReadHword(Ads866xSingleTransferOperation):
         """
 
         super().__init__(
-            op=bitarray(reverse_string("11001")),
             addr=addr,
             response_required=True,
         )
@@ -179,6 +177,10 @@ class ReadHword(Ads866xSingleTransferOperation):
 class WriteHword(Ads866xSingleTransferOperation):
     """Write a half word read operation"""
 
+    template = FrameTemplate(
+        Ads866xSingleTransferOperation.layout, {"op": uint_to_bitarray(0b11010, 5)}
+    )
+
     def __init__(self, addr: bitarray, data: bitarray):
         """Write the data of the half word at address 'addr'.
 
@@ -187,7 +189,6 @@ class WriteHword(Ads866xSingleTransferOperation):
         """
 
         super().__init__(
-            op=bitarray(reverse_string("11010")),
             addr=addr,
             data=data,
             response_required=False,
@@ -199,16 +200,14 @@ class Ads866xWordOperation(SequenceTransferOperation):
     def __init__(
         self,
         addr: bitarray,
-        data: bitarray = bitarray(
-            reverse_string("00000000 00000000 00000000 00000000")
-        ),
+        data: bitarray = uint_to_bitarray(0, 32),
     ):
         addr_ba = self.check_addr(bitarray(addr))
         data_ba = self.check_data(bitarray(data))
 
-        addr_upper = deepcopy(addr_ba)
+        addr_upper = addr_ba.copy()
         addr_upper[1] = 1
-        addr_lower = deepcopy(addr_ba)
+        addr_lower = addr_ba.copy()
         data_upper = data_ba[16:32]
         data_lower = data_ba[0:16]
 
@@ -251,7 +250,7 @@ class Ads866xWordOperation(SequenceTransferOperation):
         if len(addr) != 9:
             raise ValueError(f"Expected 9-bit addr, but got {addr=}")
         if addr[0] == 1 or addr[1] == 1:
-            addr_old = deepcopy(addr)
+            addr_old = addr.copy()
             addr[-2] = 0
             addr[-1] = 0
             warn(
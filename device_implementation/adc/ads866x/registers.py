@@ -1,6 +1,6 @@
 from typing import Optional
 from dataclasses import dataclass, field
-from util import reverse_string, uint_to_bitarray
+from util import uint_to_bitarray
 from bitarray import bitarray
 
 
@@ -19,9 +19,7 @@ class Ads866xRegister:
     address_lower_halfword_ba: bitarray = field(init=False)
     address_upper_halfword_ba: bitarray = field(init=False)
     data: bitarray = field(
-        default_factory=lambda: bitarray(
-            reverse_string("00000000 00000000 00000000 00000000")
-        ),
+        default_factory=lambda: uint_to_bitarray(0, 32),
     )
 
     def __post_init__(self):
@@ -60,13 +58,13 @@ class DeviceIdReg(Ads866xRegister):
         data: Optional[bitarray] = None,
     ):
         if not data:
-            data = bitarray("00000000 00000000 00000000 00000000")
+            data = uint_to_bitarray(0, 32)
         super().__init__(address=0x00, data=data)
 
     def __post_init__(self):
         super().__post_init__()
         self.DEVICE_ADDR = BitfieldSpec(
-            slice(16, 20), {"DEFAULT_ADDR": bitarray(reverse_string("0000"))}
+            slice(16, 20), {"DEFAULT_ADDR": uint_to_bitarray(0b0000, 4)}
         )
 
 
@@ -84,7 +82,7 @@ class RstPwrctlReg(Ads866xRegister):
         data: Optional[bitarray] = None,
     ):
         if not data:
-            data = bitarray("00000000 00000000 00000000 00000000")
+            data = uint_to_bitarray(0, 32)
         super().__init__(address=0x04, data=data)
 
     def __post_init__(self):
@@ -95,36 +93,36 @@ class RstPwrctlReg(Ads866xRegister):
         self.VDD_AL_DIS = BitfieldSpec(
             slice(5, 6),
             {
-                "VDD_AL_ENABLED": bitarray(reverse_string("0")),
-                "VDD_AL_DISABLED": bitarray(reverse_string("1")),
+                "VDD_AL_ENABLED": uint_to_bitarray(0b0, 1),
+                "VDD_AL_DISABLED": uint_to_bitarray(0b1, 1),
             },
         )
         self.IN_AL_DIS = BitfieldSpec(
             slice(4, 5),
             {
-                "IN_AL_ENABLED": bitarray(reverse_string("0")),
-                "IN_AL_DISABLED": bitarray(reverse_string("1")),
+                "IN_AL_ENABLED": uint_to_bitarray(0b0, 1),
+                "IN_AL_DISABLED": uint_to_bitarray(0b1, 1),
             },
         )
         self.RSTN_APP = BitfieldSpec(
             slice(2, 3),
             {
-                "RSTN_POR": bitarray(reverse_string("0")),
-                "RSTN_APP": bitarray(reverse_string("1")),
+                "RSTN_POR": uint_to_bitarray(0b0, 1),
+                "RSTN_APP": uint_to_bitarray(0b1, 1),
             },
         )
         self.NAP_EN = BitfieldSpec(
             slice(1, 2),
             {
-                "NAP_DISABLED": bitarray(reverse_string("0")),
-                "NAP_ENABLED": bitarray(reverse_string("1")),
+                "NAP_DISABLED": uint_to_bitarray(0b0, 1),
+                "NAP_ENABLED": uint_to_bitarray(0b1, 1),
             },
         )
         self.PWRDN = BitfieldSpec(
             slice(0, 1),
             {
-                "MODE_ACTIVE": bitarray(reverse_string("0")),
-                "MODE_PWR_DOWN": bitarray(reverse_string("1")),
+                "MODE_ACTIVE": uint_to_bitarray(0b0, 1),
+                "MODE_PWR_DOWN": uint_to_bitarray(0b1, 1),
             },
         )
 
@@ -138,7 +136,7 @@ class SdiCtlReg(Ads866xRegister):
         data: Optional[bitarray] = None,
     ):
         if not data:
-            data = bitarray("00000000 00000000 00000000 00000000")
+            data = uint_to_bitarray(0, 32)
         super().__init__(address=0x08, data=data)
 
     def __post_init__(self):
@@ -146,10 +144,10 @@ class SdiCtlReg(Ads866xRegister):
         self.SDI_MODE = BitfieldSpec(
             slice(0, 2),
             {
-                "SPI_MODE_0_CPOL_0_CPHA_0": bitarray(reverse_string("00")),
-                "SPI_MODE_1_CPOL_0_CPHA_1": bitarray(reverse_string("01")),
-                "SPI_MODE_2_CPOL_1_CPHA_0": bitarray(reverse_string("10")),
-                "SPI_MODE_3_CPOL_1_CPHA_1": bitarray(reverse_string("11")),
+                "SPI_MODE_0_CPOL_0_CPHA_0": uint_to_bitarray(0b00, 2),
+                "SPI_MODE_1_CPOL_0_CPHA_1": uint_to_bitarray(0b01, 2),
+                "SPI_MODE_2_CPOL_1_CPHA_0": uint_to_bitarray(0b10, 2),
+                "SPI_MODE_3_CPOL_1_CPHA_1": uint_to_bitarray(0b11, 2),
             },
         )
 
@@ -166,7 +164,7 @@ class SdoCtlReg(Ads866xRegister):
         data: Optional[bitarray] = None,
     ):
         if not data:
-            data = bitarray("00000000 00000000 00000000 00000000")
+            data = uint_to_bitarray(0, 32)
         super().__init__(address=0x0C, data=data)
 
     def __post_init__(self):
@@ -174,31 +172,31 @@ class SdoCtlReg(Ads866xRegister):
         self.GPO_VAL = BitfieldSpec(
             slice(12, 13),
             {
-                "LOW": bitarray(reverse_string("0")),
-                "HIGH": bitarray(reverse_string("1")),
+                "LOW": uint_to_bitarray(0b0, 1),
+                "HIGH": uint_to_bitarray(0b1, 1),
             },
         )
         self.SDO1_CONFIG = BitfieldSpec(
             slice(8, 10),
             {
-                "SDO1_TRISTATE": bitarray(reverse_string("00")),
-                "SDO1_ALARM": bitarray(reverse_string("01")),
-                "SDO1_GPO": bitarray(reverse_string("10")),
-                "SDO1_SPI_2BIT_SDO": bitarray(reverse_string("11")),
+                "SDO1_TRISTATE": uint_to_bitarray(0b00, 2),
+                "SDO1_ALARM": uint_to_bitarray(0b01, 2),
+                "SDO1_GPO": uint_to_bitarray(0b10, 2),
+                "SDO1_SPI_2BIT_SDO": uint_to_bitarray(0b11, 2),
             },
         )
         self.SSYNC_CLK = BitfieldSpec(
             slice(6, 7),
             {
-                "CLK_EXT": bitarray(reverse_string("0")),
-                "CLK_INT": bitarray(reverse_string("1")),
+                "CLK_EXT": uint_to_bitarray(0b0, 1),
+                "CLK_INT": uint_to_bitarray(0b1, 1),
             },
         )
         self.SDO_MODE = BitfieldSpec(
             slice(0, 2),
             {
-                "SDO_DEFAULT_CLK": bitarray(reverse_string("00")),
-                "SDO_INTERNAL_CLK": bitarray(reverse_string("11")),
+                "SDO_DEFAULT_CLK": uint_to_bitarray(0b00, 2),
+                "SDO_INTERNAL_CLK": uint_to_bitarray(0b11, 2),
             },
         )
 
@@ -219,7 +217,7 @@ class DataOutCtlReg(Ads866xRegister):
         data: Optional[bitarray] = None,
     ):
         if not data:
-            data = bitarray("00000000 00000000 00000000 00000000")
+            data = uint_to_bitarray(0, 32)
         super().__init__(address=0x10, data=data)
 
     def __post_init__(self):
@@ -227,60 +225,60 @@ class DataOutCtlReg(Ads866xRegister):
         self.DEVICE_ADDR_INCL = BitfieldSpec(
             slice(14, 15),
             {
-                "EXCLUDE": bitarray(reverse_string("0")),
-                "INCLUDE": bitarray(reverse_string("1")),
+                "EXCLUDE": uint_to_bitarray(0b0, 1),
+                "INCLUDE": uint_to_bitarray(0b1, 1),
             },
         )
         self.VDD_ACTIVE_L_ALARM_INCL = BitfieldSpec(
             slice(13, 14),
             {
-                "EXCLUDE": bitarray(reverse_string("0")),
-                "INCLUDE": bitarray(reverse_string("1")),
+                "EXCLUDE": uint_to_bitarray(0b0, 1),
+                "INCLUDE": uint_to_bitarray(0b1, 1),
             },
         )
         self.VDD_ACTIVE_H_ALARM_INCL = BitfieldSpec(
             slice(12, 13),
             {
-                "EXCLUDE": bitarray(reverse_string("0")),
-                "INCLUDE": bitarray(reverse_string("1")),
+                "EXCLUDE": uint_to_bitarray(0b0, 1),
+                "INCLUDE": uint_to_bitarray(0b1, 1),
             },
         )
         self.IN_ACTIVE_L_ALARM_INCL = BitfieldSpec(
             slice(11, 12),
             {
-                "EXCLUDE": bitarray(reverse_string("0")),
-                "INCLUDE": bitarray(reverse_string("1")),
+                "EXCLUDE": uint_to_bitarray(0b0, 1),
+                "INCLUDE": uint_to_bitarray(0b1, 1),
             },
         )
         self.IN_ACTIVE_H_ALARM_INCL = BitfieldSpec(
             slice(10, 11),
             {
-                "EXCLUDE": bitarray(reverse_string("0")),
-                "INCLUDE": bitarray(reverse_string("1")),
+                "EXCLUDE": uint_to_bitarray(0b0, 1),
+                "INCLUDE": uint_to_bitarray(0b1, 1),
             },
         )
         self.RANGE_INCL = BitfieldSpec(
             slice(8, 9),
             {
-                "EXCLUDE": bitarray(reverse_string("0")),
-                "INCLUDE": bitarray(reverse_string("1")),
+                "EXCLUDE": uint_to_bitarray(0b0, 1),
+                "INCLUDE": uint_to_bitarray(0b1, 1),
             },
         )
         self.PAR_EN = BitfieldSpec(
             slice(3, 4),
             {
-                "EXCLUDE": bitarray(reverse_string("0")),
-                "INCLUDE": bitarray(reverse_string("1")),
+                "EXCLUDE": uint_to_bitarray(0b0, 1),
+                "INCLUDE": uint_to_bitarray(0b1, 1),
             },
         )
         self.DATA_VAL = BitfieldSpec(
             slice(0, 3),
             {
-                "CONVERSION_RESULT": bitarray(reverse_string("000")),
-                "ALL_ZEROS": bitarray(reverse_string("100")),
-                "ALL_ONES": bitarray(reverse_string("101")),
-                "ALTERNATE_ZEROS_ONES": bitarray(reverse_string("110")),
-                "ALTERNATE_DOUBLE_ZEROS_DOUBLE_ONES": bitarray(reverse_string("111")),
+                "CONVERSION_RESULT": uint_to_bitarray(0b000, 3),
+                "ALL_ZEROS": uint_to_bitarray(0b100, 3),
+                "ALL_ONES": uint_to_bitarray(0b101, 3),
+                "ALTERNATE_ZEROS_ONES": uint_to_bitarray(0b110, 3),
+                "ALTERNATE_DOUBLE_ZEROS_DOUBLE_ONES": uint_to_bitarray(0b111, 3),
             },
         )
 
@@ -295,7 +293,7 @@ class RangeSelReg(Ads866xRegister):
         data: Optional[bitarray] = None,
     ):
         if not data:
-            data = bitarray("00000000 00000000 00000000 00000000")
+            data = uint_to_bitarray(0, 32)
         super().__init__(address=0x14, data=data)
 
     def __post_init__(self):
@@ -303,22 +301,22 @@ class RangeSelReg(Ads866xRegister):
         self.INTREF_DIS = BitfieldSpec(
             slice(6, 7),
             {
-                "INTREF_ENABLE": bitarray(reverse_string("0")),
-                "INTREF_DISABLE": bitarray(reverse_string("1")),
+                "INTREF_ENABLE": uint_to_bitarray(0b0, 1),
+                "INTREF_DISABLE": uint_to_bitarray(0b1, 1),
             },
         )
         self.RANGE_SEL = BitfieldSpec(
             slice(0, 4),
             {
-                "BIPOLAR_12V288": bitarray(reverse_string("0000")),
-                "BIPOLAR_10V24": bitarray(reverse_string("0001")),
-                "BIPOLAR_6V144": bitarray(reverse_string("0010")),
-                "BIPOLAR_5V12": bitarray(reverse_string("0011")),
-                "BIPOLAR_2V56": bitarray(reverse_string("0100")),
-                "UNIPOLAR_12V288": bitarray(reverse_string("1000")),
-                "UNIPOLAR_10V24": bitarray(reverse_string("1001")),
-                "UNIPOLAR_6V144": bitarray(reverse_string("1010")),
-                "UNIPOLAR_5V12": bitarray(reverse_string("1011")),
+                "BIPOLAR_12V288": uint_to_bitarray(0b0000, 4),
+                "BIPOLAR_10V24": uint_to_bitarray(0b0001, 4),
+                "BIPOLAR_6V144": uint_to_bitarray(0b0010, 4),
+                "BIPOLAR_5V12": uint_to_bitarray(0b0011, 4),
+                "BIPOLAR_2V56": uint_to_bitarray(0b0100, 4),
+                "UNIPOLAR_12V288": uint_to_bitarray(0b1000, 4),
+                "UNIPOLAR_10V24": uint_to_bitarray(0b1001, 4),
+                "UNIPOLAR_6V144": uint_to_bitarray(0b1010, 4),
+                "UNIPOLAR_5V12": uint_to_bitarray(0b1011, 4),
             },
         )
 
@@ -340,7 +338,7 @@ class AlarmReg(Ads866xRegister):
         data: Optional[bitarray] = None,
     ):
         if not data:
-            data = bitarray("00000000 00000000 00000000 00000000")
+            data = uint_to_bitarray(0, 32)
         super().__init__(address=0x20, data=data)
 
     def __post_init__(self):
@@ -348,64 +346,64 @@ class AlarmReg(Ads866xRegister):
         self.ACTIVE_VDD_L_FLAG = BitfieldSpec(
             slice(15, 16),
             {
-                "NO_ALARM": bitarray(reverse_string("0")),
-                "ALARM": bitarray(reverse_string("1")),
+                "NO_ALARM": uint_to_bitarray(0b0, 1),
+                "ALARM": uint_to_bitarray(0b1, 1),
             },
         )
         self.ACTIVE_VDD_H_FLAG = BitfieldSpec(
             slice(14, 15),
             {
-                "NO_ALARM": bitarray(reverse_string("0")),
-                "ALARM": bitarray(reverse_string("1")),
+                "NO_ALARM": uint_to_bitarray(0b0, 1),
+                "ALARM": uint_to_bitarray(0b1, 1),
             },
         )
         self.ACTIVE_IN_L_FLAG = BitfieldSpec(
             slice(11, 12),
             {
-                "NO_ALARM": bitarray(reverse_string("0")),
-                "ALARM": bitarray(reverse_string("1")),
+                "NO_ALARM": uint_to_bitarray(0b0, 1),
+                "ALARM": uint_to_bitarray(0b1, 1),
             },
         )
         self.ACTIVE_IN_H_FLAG = BitfieldSpec(
             slice(10, 11),
             {
-                "NO_ALARM": bitarray(reverse_string("0")),
-                "ALARM": bitarray(reverse_string("1")),
+                "NO_ALARM": uint_to_bitarray(0b0, 1),
+                "ALARM": uint_to_bitarray(0b1, 1),
             },
         )
         self.TRP_VDD_L_FLAG = BitfieldSpec(
             slice(7, 8),
             {
-                "NO_ALARM": bitarray(reverse_string("0")),
-                "ALARM": bitarray(reverse_string("1")),
+                "NO_ALARM": uint_to_bitarray(0b0, 1),
+                "ALARM": uint_to_bitarray(0b1, 1),
             },
         )
         self.TRP_VDD_H_FLAG = BitfieldSpec(
             slice(6, 7),
             {
-                "NO_ALARM": bitarray(reverse_string("0")),
-                "ALARM": bitarray(reverse_string("1")),
+                "NO_ALARM": uint_to_bitarray(0b0, 1),
+                "ALARM": uint_to_bitarray(0b1, 1),
             },
         )
         self.TRP_IN_L_FLAG = BitfieldSpec(
             slice(5, 6),
             {
-                "NO_ALARM": bitarray(reverse_string("0")),
-                "ALARM": bitarray(reverse_string("1")),
+                "NO_ALARM": uint_to_bitarray(0b0, 1),
+                "ALARM": uint_to_bitarray(0b1, 1),
             },
         )
         self.TRP_IN_H_FLAG = BitfieldSpec(
             slice(4, 5),
             {
-                "NO_ALARM": bitarray(reverse_string("0")),
-                "ALARM": bitarray(reverse_string("1")),
+                "NO_ALARM": uint_to_bitarray(0b0, 1),
+                "ALARM": uint_to_bitarray(0b1, 1),
             },
         )
         self.OVW_ALARM = BitfieldSpec(
             slice(0, 1),
             {
-                "NO_ALARM": bitarray(reverse_string("0")),
-                "ALARM": bitarray(reverse_string("1")),
+                "NO_ALARM": uint_to_bitarray(0b0, 1),
+                "ALARM": uint_to_bitarray(0b1, 1),
             },
         )
 
@@ -420,7 +418,7 @@ class AlarmHThReg(Ads866xRegister):  # Alarm hysteresis and high threshold
         data: Optional[bitarray] = None,
     ):
         if not data:
-            data = bitarray("00000000 00000000 00000000 00000000")
+            data = uint_to_bitarray(0, 32)
         super().__init__(address=24, data=data)
 
     def __post_init__(self):
@@ -428,10 +426,10 @@ class AlarmHThReg(Ads866xRegister):  # Alarm hysteresis and high threshold
         self.INP_ALARM_HYST = BitfieldSpec(
             slice(30, 32),
             {
-                "HYST_00": bitarray(reverse_string("00")),
-                "HYST_01": bitarray(reverse_string("01")),
-                "HYST_10": bitarray(reverse_string("10")),
-                "HYST_11": bitarray(reverse_string("11")),
+                "HYST_00": uint_to_bitarray(0b00, 2),
+                "HYST_01": uint_to_bitarray(0b01, 2),
+                "HYST_10": uint_to_bitarray(0b10, 2),
+                "HYST_11": uint_to_bitarray(0b11, 2),
             },
         )
         self.INP_ALARM_HIGH_TH = BitfieldSpec(
@@ -448,7 +446,7 @@ class AlarmLThReg(Ads866xRegister):  # Alarm low threshold
         data: Optional[bitarray] = None,
     ):
         if not data:
-            data = bitarray("00000000 00000000 00000000 00000000")
+            data = uint_to_bitarray(0, 32)
         super().__init__(address=28, data=data)
 
     def __post_init__(self):
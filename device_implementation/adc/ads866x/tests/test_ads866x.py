@@ -2,6 +2,8 @@ import unittest
 
 from bitarray import bitarray
 
+from util import bitarray_to_bytes, uint_to_bitarray
+
 from device_implementation.adc.ads866x import (
     Ads866x,
     Ads866xInputRange,
@@ -26,6 +28,11 @@ class TestAds866x(unittest.TestCase):
             st_op.get_command(), bitarray("0000000000000000 010101010 00 10000")
         )
 
+    def test_wire_representation(self):
+        cmd = ReadHword(addr=uint_to_bitarray(0x014, 9)).get_command()
+        self.assertEqual(cmd.endian(), "little")
+        self.assertEqual(bitarray_to_bytes(cmd), b"\xc8\x14\x00\x00")
+
     def test_register_data_modified(self):
         reg = DeviceIdReg()
         reg.data[reg.DEVICE_ADDR.slice] = bitarray("1010")
@@ -37,6 +44,16 @@ class TestAds866x(unittest.TestCase):
     def test_init(self):
         _ = Ads866x()
 
+    def test_constant_operations_shared_command(self):
+        self.assertIs(Nop().get_command(), Nop().get_command())
+        self.assertIs(ReadVoltage().get_command(), ReadVoltage().get_command())
+
+    def test_default_operation_request_shared(self):
+        adc = Ads866x()
+        self.assertIs(next(adc), next(adc))
+        self.assertEqual(next(adc).operation, Nop())
+        self.assertIs(adc._get_idle_operation_request(), next(adc))
+
     def test_initialize(self):
         adc = Ads866x()
         adc.initialize(callback=None, input_range=Ads866xInputRange.BIPOLAR_2V56)
@@ -66,6 +83,23 @@ class TestAds866x(unittest.TestCase):
         self.assertIsInstance(next(adc).operation, Nop)
         self.assertIsInstance(next(adc).operation, Nop)
 
+    def test_initialize_plan_cached(self):
+        adc = Ads866x()
+        adc.initialize(callback=None, input_range=Ads866xInputRange.BIPOLAR_2V56)
+        adc.initialize(callback=None, input_range=Ads866xInputRange.BIPOLAR_2V56)
+        self.assertEqual(len(adc._transfer_plans), 1)
+
+        first = [next(adc).operation for _ in range(18)]
+        second = [next(adc).operation for _ in range(18)]
+        self.assertEqual(first, second)
+        for op_first, op_second in zip(first, second):
+            self.assertIsNot(op_first, op_second)
+            self.assertIs(op_first.get_command(), op_second.get_command())
+        self.assertIsInstance(next(adc).operation, Nop)
+
+        adc.initialize(callback=None, input_range=Ads866xInputRange.UNIPOLAR_5V12)
+        self.assertEqual(len(adc._transfer_plans), 2)
+
     def test_read(self):
         adc = Ads866x()
         adc.initialize(callback=None, input_range=Ads866xInputRange.BIPOLAR_2V56)
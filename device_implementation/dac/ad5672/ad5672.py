@@ -4,8 +4,9 @@ Octal, 12-Bit nanoDAC+ with 2 ppm/°C Reference, SPI Interface
 Datasheet: https://www.analog.com/media/en/technical-documentation/data-sheets/ad5672r_5676r.pdf
 """
 
-from typing import Callable, Optional
+from typing import Any, Callable, Dict, List, Literal, Optional, Tuple, overload
 from math import floor
+from threading import Lock
 
 from util import uint_to_bitarray
 
@@ -17,35 +18,182 @@ from device_implementation.dac.ad5672.operations import (
     WriteInputAndDacRegister,
     LoadAllChannels,
 )
-from spi_elements.async_return import AsyncReturn
+from spi_elements.async_return import (
+    AsyncReturn,
+    create_async_return,
+    fail_callback,
+)
 from spi_elements.spi_operation_request_iterator import (
-    SequenceTransferOperationRequest,
+    OperationPriority,
     SingleTransferOperationRequest,
 )
+from spi_elements.transfer_plan import TransferPlanRequest
+
+
+class _CoalescedWriteCallback:
+    """Callback of a coalesced write, which calls the callbacks of all writes
+    superseded by the write (and of the write itself)."""
+
+    __slots__ = ("key", "callbacks")
+
+    def __init__(
+        self,
+        key: Tuple[int, OperationPriority],
+        callback: Optional[Callable[..., None]],
+    ) -> None:
+        self.key = key
+        self.callbacks: List[Callable[..., None]] = [callback] if callback else []
+
+    def __call__(self, response) -> None:
+        for callback in self.callbacks:
+            callback(response)
+
+    def fail(self, exception: BaseException) -> None:
+        for callback in self.callbacks:
+            fail_callback(callback, exception)
 
 
 class Ad5672(DacBase):
-    def __init__(self) -> None:
-        super().__init__()
+    def __init__(self, coalesce_writes: bool = False) -> None:
+        """Create the dac.
 
-    def _get_default_operation_request(self) -> SingleTransferOperationRequest:
-        return SingleTransferOperationRequest(
+        :param coalesce_writes: if True, a write() to a channel replaces a
+        pending write() to the same channel, which is not transferred yet. The
+        AsyncReturn of the superseded write() resolves, when the replacing
+        write() is transferred. Writes are not coalesced across other operation
+        requests, e.g. .load_all_channels(), or within a transaction().
+        """
+        super().__init__()
+        # The default operation request is shared by all idle cycles.
+        self._default_operation_request = SingleTransferOperationRequest(
             operation=Nop(),
             callback=None,
         )
 
+        self._coalesce_writes = coalesce_writes
+        # Pending writes by channel and priority, which can still be replaced.
+        # The locks are only used, if the writes are coalesced. The coalesce
+        # lock guards the pending writes and is never held while putting into
+        # the fifo, which may block the producer. The producer lock is only
+        # taken by producers and held across the put, such that a write is in
+        # the fifo before another producer coalesces into it or puts an
+        # operation request after it.
+        self._coalescable_writes: Dict[
+            Tuple[int, OperationPriority], SingleTransferOperationRequest
+        ] = {}
+        self._coalesce_lock = Lock()
+        self._producer_lock = Lock()
+
+    def _get_default_operation_request(self) -> SingleTransferOperationRequest:
+        return self._default_operation_request
+
+    def _get_idle_operation_request(self) -> SingleTransferOperationRequest:
+        # The Nop neither takes a response nor has a callback.
+        return self._default_operation_request
+
+    def _pop_unprocessed_operation_request(
+        self,
+    ) -> SingleTransferOperationRequest | None:
+        op_req = super()._pop_unprocessed_operation_request()
+        if op_req is not None and type(op_req.callback) is _CoalescedWriteCallback:
+            # The operation is read after the write is unregistered, i.e. it
+            # is not replaced anymore.
+            self._unregister_coalescable_write(op_req)
+        return op_req
+
+    def _drop_operation_requests(self, op_reqs: Any) -> None:
+        super()._drop_operation_requests(op_reqs)
+        # Writes must not be coalesced into a dropped write.
+        if isinstance(op_reqs, SingleTransferOperationRequest) and (
+            type(op_reqs.callback) is _CoalescedWriteCallback
+        ):
+            self._unregister_coalescable_write(op_reqs)
+
+    def _unregister_coalescable_write(
+        self, op_req: SingleTransferOperationRequest
+    ) -> None:
+        key = op_req.callback.key
+        with self._coalesce_lock:
+            if self._coalescable_writes.get(key) is op_req:
+                del self._coalescable_writes[key]
+
+    def _put_unprocessed_operation_request(
+        self, op_req: Any, priority: OperationPriority = OperationPriority.NORMAL
+    ) -> None:
+        if not self._coalesce_writes:
+            return super()._put_unprocessed_operation_request(op_req, priority)
+
+        with self._producer_lock:
+            # Any other operation request ends the coalescing of pending writes.
+            with self._coalesce_lock:
+                self._coalescable_writes.clear()
+            super()._put_unprocessed_operation_request(op_req, priority)
+
+    def _put_coalesced_write(
+        self,
+        addr: int,
+        operation: WriteInputRegister,
+        callback: Optional[Callable[..., None]],
+        priority: OperationPriority,
+    ) -> None:
+        """Replace the operation of the pending write to 'addr' with
+        'operation', or put a new write if there is no pending write."""
+        key = (addr, priority)
+        with self._producer_lock:
+            with self._coalesce_lock:
+                op_req = self._coalescable_writes.get(key)
+                if op_req is not None:
+                    op_req.operation = operation
+                    if callback:
+                        op_req.callback.callbacks.append(callback)
+                    return
+
+                # Registered before the put, such that the consumer can not
+                # pop the write before it is registered.
+                op_req = SingleTransferOperationRequest(
+                    operation=operation,
+                    callback=_CoalescedWriteCallback(key, callback),
+                )
+                self._coalescable_writes[key] = op_req
+
+            try:
+                super()._put_unprocessed_operation_request(op_req, priority)
+            except Exception:
+                self._unregister_coalescable_write(op_req)
+                raise
+
+    @overload
+    def nop(
+        self,
+        callback: Optional[Callable[..., None]] = None,
+        fire_and_forget: Literal[False] = False,
+    ) -> AsyncReturn: ...
+
+    @overload
+    def nop(
+        self,
+        callback: Optional[Callable[..., None]] = None,
+        *,
+        fire_and_forget: Literal[True],
+    ) -> None: ...
+
     def nop(
         self,
         callback: Optional[Callable[..., None]] = None,
-    ) -> AsyncReturn:
+        fire_and_forget: bool = False,
+    ) -> Optional[AsyncReturn]:
         """Perform no operation. Can be used to wait for a cycle to
-        synchoronize multiple spi_elements."""
-        ar = AsyncReturn(callback)
+        synchoronize multiple spi_elements.
+
+        :param fire_and_forget: if True, no AsyncReturn is created and None is
+        returned. The callback is still called with the response.
+        """
+        ar, ar_callback = create_async_return(callback, fire_and_forget)
 
         self._put_unprocessed_operation_request(
             SingleTransferOperationRequest(
                 operation=Nop(),
-                callback=ar.get_callback(),
+                callback=ar_callback,
             ),
         )
         return ar
@@ -56,19 +204,42 @@ class Ad5672(DacBase):
         ar = AsyncReturn(callback)
 
         self._put_unprocessed_operation_request(
-            SequenceTransferOperationRequest(
-                operation=Initialize(),
+            TransferPlanRequest(
+                plan=self._get_transfer_plan(Initialize, Initialize),
                 callback=ar.get_callback(),
             )
         )
         return ar
 
+    @overload
+    def write_and_load(
+        self,
+        callback: Optional[Callable[..., None]] = None,
+        addr: int | None = None,
+        voltage: float | None = None,
+        priority: OperationPriority = OperationPriority.NORMAL,
+        fire_and_forget: Literal[False] = False,
+    ) -> AsyncReturn: ...
+
+    @overload
     def write_and_load(
         self,
         callback: Optional[Callable[..., None]] = None,
         addr: int | None = None,
         voltage: float | None = None,
-    ) -> AsyncReturn:
+        priority: OperationPriority = OperationPriority.NORMAL,
+        *,
+        fire_and_forget: Literal[True],
+    ) -> None: ...
+
+    def write_and_load(
+        self,
+        callback: Optional[Callable[..., None]] = None,
+        addr: int | None = None,
+        voltage: float | None = None,
+        priority: OperationPriority = OperationPriority.NORMAL,
+        fire_and_forget: bool = False,
+    ) -> Optional[AsyncReturn]:
         """Write the quantized analog voltage to the dac with updating the
         analog output voltage. (Will not update other channels.)
 
@@ -76,14 +247,18 @@ class Ad5672(DacBase):
         :param voltage: the voltage that should be set at the channel.
         Constrained to the interval [0V, 5V]. The actual voltage is quantized
         and floored to the next quantization step resulting from the resolution
-        of the dac."""
+        of the dac.
+        :param priority: OperationPriority of the operation request.
+        :param fire_and_forget: if True, no AsyncReturn is created and None is
+        returned. The callback is still called with the response.
+        """
         if addr is None:
             raise ValueError("Address must not be None.")
         if voltage is None:
             raise ValueError("Voltage must not be None.")
         _ = self._check_addr(addr)
 
-        ar = AsyncReturn(callback)
+        ar, ar_callback = create_async_return(callback, fire_and_forget)
 
         self._put_unprocessed_operation_request(
             SingleTransferOperationRequest(
@@ -91,17 +266,41 @@ class Ad5672(DacBase):
                     addr=uint_to_bitarray(addr, 4),
                     data=uint_to_bitarray(self._voltage_to_dac_code(voltage), 12),
                 ),
-                callback=ar.get_callback(),
+                callback=ar_callback,
             ),
+            priority=priority,
         )
         return ar
 
+    @overload
+    def write(
+        self,
+        callback: Optional[Callable[..., None]] = None,
+        addr: int | None = None,
+        voltage: float | None = None,
+        priority: OperationPriority = OperationPriority.NORMAL,
+        fire_and_forget: Literal[False] = False,
+    ) -> AsyncReturn: ...
+
+    @overload
+    def write(
+        self,
+        callback: Optional[Callable[..., None]] = None,
+        addr: int | None = None,
+        voltage: float | None = None,
+        priority: OperationPriority = OperationPriority.NORMAL,
+        *,
+        fire_and_forget: Literal[True],
+    ) -> None: ...
+
     def write(
         self,
         callback: Optional[Callable[..., None]] = None,
         addr: int | None = None,
         voltage: float | None = None,
-    ) -> AsyncReturn:
+        priority: OperationPriority = OperationPriority.NORMAL,
+        fire_and_forget: bool = False,
+    ) -> Optional[AsyncReturn]:
         """Write the quantized analog voltage to the dac without updating the
         analog output voltage. To update all prior written voltages to the
         output use .load_all_channels().
@@ -110,38 +309,74 @@ class Ad5672(DacBase):
         :param voltage: the voltage that should be set at the channel.
         Constrained to the interval [0V, 5V]. The actual voltage is quantized
         and floored to the next quantization step resulting from the resolution
-        of the dac."""
+        of the dac.
+        :param priority: OperationPriority of the operation request.
+        :param fire_and_forget: if True, no AsyncReturn is created and None is
+        returned. The callback is still called with the response.
+        """
         if addr is None:
             raise ValueError(f"Address must not be None.")
         if voltage is None:
             raise ValueError("Voltage must not be None.")
         _ = self._check_addr(addr)
 
-        ar = AsyncReturn(callback)
+        ar, ar_callback = create_async_return(callback, fire_and_forget)
+        operation = WriteInputRegister(
+            addr=uint_to_bitarray(addr, 4),
+            data=uint_to_bitarray(self._voltage_to_dac_code(voltage), 12),
+        )
+
+        if self._coalesce_writes and not self._in_transaction():
+            self._put_coalesced_write(addr, operation, ar_callback, priority)
+            return ar
 
         self._put_unprocessed_operation_request(
             SingleTransferOperationRequest(
-                operation=WriteInputRegister(
-                    addr=uint_to_bitarray(addr, 4),
-                    data=uint_to_bitarray(self._voltage_to_dac_code(voltage), 12),
-                ),
-                callback=ar.get_callback(),
+                operation=operation,
+                callback=ar_callback,
             ),
+            priority=priority,
         )
         return ar
 
+    @overload
+    def load_all_channels(
+        self,
+        callback: Optional[Callable[..., None]] = None,
+        priority: OperationPriority = OperationPriority.NORMAL,
+        fire_and_forget: Literal[False] = False,
+    ) -> AsyncReturn: ...
+
+    @overload
+    def load_all_channels(
+        self,
+        callback: Optional[Callable[..., None]] = None,
+        priority: OperationPriority = OperationPriority.NORMAL,
+        *,
+        fire_and_forget: Literal[True],
+    ) -> None: ...
+
     def load_all_channels(
-        self, callback: Optional[Callable[..., None]] = None
-    ) -> AsyncReturn:
+        self,
+        callback: Optional[Callable[..., None]] = None,
+        priority: OperationPriority = OperationPriority.NORMAL,
+        fire_and_forget: bool = False,
+    ) -> Optional[AsyncReturn]:
         """Update all analog output voltages according to the data written
-        prior with .write()."""
-        ar = AsyncReturn(callback)
+        prior with .write().
+
+        :param priority: OperationPriority of the operation request.
+        :param fire_and_forget: if True, no AsyncReturn is created and None is
+        returned. The callback is still called with the response.
+        """
+        ar, ar_callback = create_async_return(callback, fire_and_forget)
 
         self._put_unprocessed_operation_request(
             SingleTransferOperationRequest(
                 operation=LoadAllChannels(),
-                callback=ar.get_callback(),
+                callback=ar_callback,
             ),
+            priority=priority,
         )
         return ar
 
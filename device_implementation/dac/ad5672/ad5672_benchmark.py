@@ -0,0 +1,66 @@
+"""Benchmark of a high-rate setpoint stream to an Ad5672 with and without
+coalescing of writes.
+
+Every tick the control loop writes three channels (target and limits) and
+requests a .load_all_channels() every 10 ticks, while the bus transfers one
+operation request per tick. Reported are the queue depth, the latency of the
+writes from the request until their AsyncReturn resolves and the time per
+tick.
+
+Usage:
+    python3 device_implementation/dac/ad5672/ad5672_benchmark.py
+"""
+
+from statistics import mean
+from time import perf_counter
+from typing import List, Tuple
+
+from device_implementation.dac.ad5672 import Ad5672
+
+TICKS = 1_000
+LOAD_INTERVAL = 10
+CHANNELS = (2, 6, 7)
+
+
+def setpoint_stream(coalesce_writes: bool) -> Tuple[int, int, float, float]:
+    """Return the maximum queue depth, the final queue depth, the mean
+    latency in ticks and the time per tick in seconds."""
+    dac = Ad5672(coalesce_writes=coalesce_writes)
+    tick = 0
+    latencies: List[int] = []
+    max_depth = 0
+
+    def done(requested: int):
+        def callback(_) -> None:
+            latencies.append(tick - requested)
+
+        return callback
+
+    def depth() -> int:
+        return sum(len(fifo) for fifo in dac._operation_requests)
+
+    start = perf_counter()
+    for tick in range(TICKS):
+        for i, addr in enumerate(CHANNELS):
+            dac.write(done(tick), addr=addr, voltage=(tick + i) % 50 / 10)
+        if tick % LOAD_INTERVAL == LOAD_INTERVAL - 1:
+            dac.load_all_channels()
+        max_depth = max(max_depth, depth())
+
+        op_req = next(dac)
+        if op_req.callback:
+            op_req.callback(op_req.operation.get_parsed_response())
+    t = (perf_counter() - start) / TICKS
+
+    return max_depth, depth(), mean(latencies), t
+
+
+if __name__ == "__main__":
+    print(
+        f"{'coalescing':<11} {'max depth':>10} {'final depth':>12} {'latency [ticks]':>16} {'per tick [us]':>14}"
+    )
+    for coalesce_writes in [False, True]:
+        max_depth, final_depth, latency, t = setpoint_stream(coalesce_writes)
+        print(
+            f"{str(coalesce_writes):<11} {max_depth:>10} {final_depth:>12} {latency:>16.1f} {t * 1e6:>14.2f}"
+        )
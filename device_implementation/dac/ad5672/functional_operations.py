@@ -2,9 +2,9 @@ from typing import Any, List
 
 from bitarray import bitarray
 
-from spi_operation import SequenceTransferOperation
+from spi_operation import SequenceTransferOperation, constant_operation
 import device_implementation.dac.ad5672.register_operations as op
-from util.util_str import reverse_string
+from util import uint_to_bitarray
 
 
 class Initialize(SequenceTransferOperation):
@@ -87,9 +87,7 @@ class Initialize(SequenceTransferOperation):
         # ad5672r detects this and distinguishes between falling *edges* and
         # low voltage *levels*.
 
-        ops.append(
-            op.WriteLoadDacMaskRegister(data=bitarray(reverse_string("11111111")))
-        )
+        ops.append(op.WriteLoadDacMaskRegister(data=uint_to_bitarray(0b11111111, 8)))
         ops.append(op.InternalReferenceSetup())
 
         super().__init__(ops)
@@ -109,8 +107,9 @@ class Initialize(SequenceTransferOperation):
         return None
 
 
+@constant_operation
 class LoadAllChannels(op.UpdateDacRegisters):
     def __init__(self):
         """Load input register contents to dac registers updating the analog
         voltage output for all channels."""
-        super().__init__(data=bitarray(reverse_string("11111111")))
+        super().__init__(data=uint_to_bitarray(0b11111111, 8))
@@ -2,9 +2,8 @@ from __future__ import annotations
 
 from typing import Any, Optional
 from bitarray import bitarray
-from util import reverse_string, concat_bitarray
-from spi_operation import SingleTransferOperation
-
+from util import uint_to_bitarray, concat_bitarray, FrameLayout, FrameTemplate
+from spi_operation import SingleTransferOperation, constant_operation
 
 # AD5672 WORD == 24 bit
 
@@ -12,6 +11,11 @@ from spi_operation import SingleTransferOperation
 class Ad5672SingleTransferOperation(SingleTransferOperation):
     """SingleTransferOperation of Ad5672 with its structure."""
 
+    layout = FrameLayout({"data_fill": 4, "data": 12, "addr": 4, "op": 4})
+    # Fixed fields of the operation. Child classes replace the template with
+    # their own, such that only the variable fields are patched per instance.
+    template = FrameTemplate(layout)
+
     def __init__(
         self,
         op: bitarray | None = None,
@@ -21,22 +25,23 @@ class Ad5672SingleTransferOperation(SingleTransferOperation):
         response: Optional[bitarray] = None,
         response_required: bool = True,
     ):
-        if not op:
-            op = bitarray(reverse_string("0000"))
-        if not addr:
-            addr = bitarray(reverse_string("0000"))
-        if not data:
-            data = bitarray(reverse_string("0000 00000000"))
-        if not data_fill:
-            data_fill = bitarray(reverse_string("0000"))
+        fields = {}
+        if op:
+            fields["op"] = op
+        if addr:
+            fields["addr"] = addr
+        if data:
+            fields["data"] = data
+        if data_fill:
+            fields["data_fill"] = data_fill
+
+        # The template checks the bitlength of the fields.
+        command = self.template.build(**fields)
+        if addr:
+            self.check_addr(addr)
 
         super().__init__(
-            command=concat_bitarray(
-                data_fill,
-                self.check_data(data),
-                self.check_addr(addr),
-                self.check_op(op),
-            ),
+            command=command,
             response=response,
             response_required=response_required,
         )
@@ -59,34 +64,31 @@ class Ad5672SingleTransferOperation(SingleTransferOperation):
 
         return None
 
-    def check_op(self, op: bitarray):
-        if len(op) != 4:
-            raise ValueError(f"Expected 4-bit op, but got {op=}")
-        return op
-
     def check_addr(self, addr: bitarray):
-        if len(addr) != 4:
-            raise ValueError(f"Expected 4-bit addr, but got {addr=}")
         if addr[3] == 1:
             raise ValueError(
                 f"Unknown DAC channel address {addr}. Address should be in the range 0x0 to 0x7."
             )
         return addr
 
-    def check_data(self, data: bitarray):
-        if len(data) != 12:
-            raise ValueError(f"Expected 12-bit data, but got {data=}")
-        return data
-
 
+@constant_operation
 class Nop(Ad5672SingleTransferOperation):
     """No operation (daisy chain)"""
 
+    template = FrameTemplate(
+        Ad5672SingleTransferOperation.layout, {"op": uint_to_bitarray(0b1111, 4)}
+    )
+
     def __init__(self):
-        super().__init__(op=bitarray(reverse_string("1111")), response_required=False)
+        super().__init__(response_required=False)
 
 
 class WriteInputRegister(Ad5672SingleTransferOperation):
+    template = FrameTemplate(
+        Ad5672SingleTransferOperation.layout, {"op": uint_to_bitarray(0b0001, 4)}
+    )
+
     def __init__(self, addr: bitarray, data: bitarray):
         """Write data to the input register of the dac channel specified by the address.
 
@@ -95,7 +97,6 @@ class WriteInputRegister(Ad5672SingleTransferOperation):
         """
 
         super().__init__(
-            op=bitarray(reverse_string("0001")),
             addr=addr,
             data=data,
             response_required=False,
@@ -103,6 +104,10 @@ class WriteInputRegister(Ad5672SingleTransferOperation):
 
 
 class UpdateDacRegisters(Ad5672SingleTransferOperation):
+    template = FrameTemplate(
+        Ad5672SingleTransferOperation.layout, {"op": uint_to_bitarray(0b0010, 4)}
+    )
+
     def __init__(self, data: bitarray):
         """Update the dac register with contents of input register for the dac
         channel(s) specified by the bits data[0:8]. Setting a bit in data[0:8]
@@ -112,14 +117,17 @@ class UpdateDacRegisters(Ad5672SingleTransferOperation):
         """
 
         super().__init__(
-            op=bitarray(reverse_string("0010")),
-            data=concat_bitarray(data[4:8], bitarray(reverse_string("00000000"))),
+            data=concat_bitarray(data[4:8], uint_to_bitarray(0b00000000, 8)),
             data_fill=data[0:4],
             response_required=False,
         )
 
 
 class WriteInputAndDacRegister(Ad5672SingleTransferOperation):
+    template = FrameTemplate(
+        Ad5672SingleTransferOperation.layout, {"op": uint_to_bitarray(0b0011, 4)}
+    )
+
     def __init__(self, addr: bitarray, data: bitarray):
         """Write data to the input register of the dac channel specified by the
         address and directly update the dac register to output the value.
@@ -129,38 +137,46 @@ class WriteInputAndDacRegister(Ad5672SingleTransferOperation):
         """
 
         super().__init__(
-            op=bitarray(reverse_string("0011")),
             addr=addr,
             data=data,
             response_required=False,
         )
 
 
+@constant_operation
 class SetDcEnMode(Ad5672SingleTransferOperation):
+    template = FrameTemplate(
+        Ad5672SingleTransferOperation.layout,
+        {"op": uint_to_bitarray(0b1000, 4), "data_fill": uint_to_bitarray(0b0001, 4)},
+    )
+
     def __init__(self):
         """Set daisychain enable mode (DCEN MODE) of Ad5672."""
-        super().__init__(
-            op=bitarray(reverse_string("1000")),
-            data=bitarray(reverse_string("0000 0000 0000")),
-            data_fill=bitarray(reverse_string("0001")),
-            response_required=False,
-        )
+        super().__init__(response_required=False)
 
 
 class ReadDacRegister(Ad5672SingleTransferOperation):
+    template = FrameTemplate(
+        Ad5672SingleTransferOperation.layout, {"op": uint_to_bitarray(0b1001, 4)}
+    )
+
     def __init__(self, addr: bitarray):
         """Read data from the dac register of the dac channel specified by the
         address.
 
         :param addr: 4-bit addr of dac channel, Valid range 0x0 to 0x7.
         """
-        super().__init__(op=bitarray(reverse_string("1001")), response_required=True)
+        super().__init__(response_required=True)
 
     def _parse_response(self, rsp: bitarray) -> Any:
         return rsp[0:16]
 
 
 class WriteLoadDacMaskRegister(Ad5672SingleTransferOperation):
+    template = FrameTemplate(
+        Ad5672SingleTransferOperation.layout, {"op": uint_to_bitarray(0b0101, 4)}
+    )
+
     def __init__(self, data: bitarray):
         """Write the load dac mask register (LDAC mask). Each bit of data[0:8]
         corresponds to a single dac channel. Setting the corresponding bit to
@@ -176,33 +192,38 @@ class WriteLoadDacMaskRegister(Ad5672SingleTransferOperation):
         :param data: 8-Bit data of ldac mask register, valid range 0x00 to 0xFF.
         """
         super().__init__(
-            op=bitarray(reverse_string("0101")),
-            data=concat_bitarray(data[4:8], bitarray(reverse_string("00000000"))),
+            data=concat_bitarray(data[4:8], uint_to_bitarray(0b00000000, 8)),
             data_fill=data[0:4],
             response_required=False,
         )
 
 
+@constant_operation
 class SoftwareReset(Ad5672SingleTransferOperation):
+    template = FrameTemplate(
+        Ad5672SingleTransferOperation.layout,
+        {
+            "op": uint_to_bitarray(0b0110, 4),
+            "data": uint_to_bitarray(0b0001_0010_0011, 12),
+            "data_fill": uint_to_bitarray(0b0100, 4),
+        },
+    )
+
     def __init__(self):
         """Perform a software reset of the dac."""
 
-        super().__init__(
-            op=bitarray(reverse_string("0110")),
-            addr=bitarray(reverse_string("0000")),
-            data=bitarray(reverse_string("0001 0010 0011")),
-            data_fill=bitarray(reverse_string("0100")),
-            response_required=False,
-        )
+        super().__init__(response_required=False)
 
 
+@constant_operation
 class InternalReferenceSetup(Ad5672SingleTransferOperation):
+    template = FrameTemplate(
+        Ad5672SingleTransferOperation.layout,
+        {"op": uint_to_bitarray(0b0111, 4), "data_fill": uint_to_bitarray(0b0100, 4)},
+    )
+
     def __init__(self):
         """Sets up the internal reference and amplifier gain to 2 for LFCSP and
         WLCSP packages. Operation is ignored for TLSSOP packaged ic."""
 
-        super().__init__(
-            op=bitarray(reverse_string("0111")),
-            data_fill=bitarray(reverse_string("0100")),
-            response_required=False,
-        )
+        super().__init__(response_required=False)
@@ -1,9 +1,30 @@
 import unittest
+import threading
+import time
 
 from bitarray import bitarray
 
+from util import bitarray_to_bytes, uint_to_bitarray
+
 from device_implementation.dac.ad5672 import Ad5672
 from device_implementation.dac.ad5672 import Ad5672SingleTransferOperation
+from device_implementation.dac.ad5672 import SoftwareReset, Nop, LoadAllChannels
+from device_implementation.dac.ad5672 import WriteInputRegister
+from spi_elements import FifoPolicy, OperationPriority
+
+
+def write_input_register(addr: int, voltage: float) -> WriteInputRegister:
+    return WriteInputRegister(
+        addr=uint_to_bitarray(addr, 4),
+        data=uint_to_bitarray(Ad5672()._voltage_to_dac_code(voltage), 12),
+    )
+
+
+def transfer(dac: Ad5672):
+    op_req = next(dac)
+    if op_req.callback:
+        op_req.callback(op_req.operation.get_parsed_response())
+    return op_req.operation
 
 
 class TestAds866x(unittest.TestCase):
@@ -15,3 +36,142 @@ class TestAds866x(unittest.TestCase):
             data_fill=bitarray("0000"),
         )
         self.assertEqual(st_op.get_command(), bitarray("0000 000100010001 1010 1111"))
+
+    def test_single_transfer_operation_invalid_fields(self):
+        with self.assertRaises(ValueError):
+            Ad5672SingleTransferOperation(op=bitarray("111"))
+        with self.assertRaises(ValueError):
+            Ad5672SingleTransferOperation(addr=bitarray("00001"))
+        with self.assertRaises(ValueError):  # channel out of range
+            Ad5672SingleTransferOperation(addr=bitarray("0001"))
+
+    def test_constant_operations_shared_command(self):
+        self.assertIs(Nop().get_command(), Nop().get_command())
+        self.assertIs(LoadAllChannels().get_command(), LoadAllChannels().get_command())
+
+    def test_default_operation_request_shared(self):
+        dac = Ad5672()
+        self.assertIs(next(dac), next(dac))
+        self.assertEqual(next(dac).operation, Nop())
+        self.assertIs(dac._get_idle_operation_request(), next(dac))
+
+    def test_wire_representation(self):
+        cmd = SoftwareReset().get_command()
+        self.assertEqual(cmd.endian(), "little")
+        self.assertEqual(bitarray_to_bytes(cmd), b"\x60\x12\x34")
+
+    def test_writes_not_coalesced_by_default(self):
+        dac = Ad5672()
+        dac.write(addr=1, voltage=1.0)
+        dac.write(addr=1, voltage=2.0)
+        self.assertEqual(transfer(dac), write_input_register(1, 1.0))
+        self.assertEqual(transfer(dac), write_input_register(1, 2.0))
+
+    def test_coalesce_writes(self):
+        dac = Ad5672(coalesce_writes=True)
+        ar_1 = dac.write(addr=1, voltage=1.0)
+        ar_2 = dac.write(addr=2, voltage=1.0)
+        ar_3 = dac.write(addr=1, voltage=3.0)
+        self.assertEqual(transfer(dac), write_input_register(1, 3.0))
+        self.assertTrue(ar_1.is_finished())
+        self.assertTrue(ar_3.is_finished())
+        self.assertFalse(ar_2.is_finished())
+        self.assertEqual(transfer(dac), write_input_register(2, 1.0))
+        self.assertTrue(ar_2.is_finished())
+        self.assertEqual(transfer(dac), Nop())
+
+    def test_coalesce_writes_not_across_other_operations(self):
+        dac = Ad5672(coalesce_writes=True)
+        dac.write(addr=1, voltage=1.0)
+        dac.load_all_channels()
+        dac.write(addr=1, voltage=2.0)
+        dac.write(addr=1, voltage=3.0)
+        self.assertEqual(transfer(dac), write_input_register(1, 1.0))
+        self.assertEqual(transfer(dac), LoadAllChannels())
+        self.assertEqual(transfer(dac), write_input_register(1, 3.0))
+        self.assertEqual(transfer(dac), Nop())
+
+    def test_coalesce_writes_not_after_transfer(self):
+        dac = Ad5672(coalesce_writes=True)
+        dac.write(addr=1, voltage=1.0)
+        self.assertEqual(transfer(dac), write_input_register(1, 1.0))
+        ar = dac.write(addr=1, voltage=2.0)
+        self.assertFalse(ar.is_finished())
+        self.assertEqual(transfer(dac), write_input_register(1, 2.0))
+        self.assertTrue(ar.is_finished())
+
+    def test_coalesce_writes_per_priority(self):
+        dac = Ad5672(coalesce_writes=True)
+        dac.write(addr=1, voltage=1.0)
+        dac.write(addr=1, voltage=2.0, priority=OperationPriority.HIGH)
+        dac.write(addr=1, voltage=3.0, priority=OperationPriority.HIGH)
+        self.assertEqual(transfer(dac), write_input_register(1, 3.0))
+        self.assertEqual(transfer(dac), write_input_register(1, 1.0))
+        self.assertEqual(transfer(dac), Nop())
+
+    def test_coalesce_writes_not_into_dropped_write(self):
+        dac = Ad5672(coalesce_writes=True)
+        dac.configure_fifo(maxsize=2, policy=FifoPolicy.DROP_OLDEST)
+        dac.write(addr=1, voltage=1.0)
+        dac.write(addr=2, voltage=1.0)
+        dac.write(addr=3, voltage=1.0)
+        dac.write(addr=1, voltage=2.0)
+        self.assertEqual(transfer(dac), write_input_register(3, 1.0))
+        self.assertEqual(transfer(dac), write_input_register(1, 2.0))
+        self.assertEqual(transfer(dac), Nop())
+        stats = dac.get_fifo_stats()[OperationPriority.NORMAL]
+        self.assertEqual(stats.dropped, 2)
+        self.assertEqual(stats.dequeued, 2)
+
+    def test_transaction_exceeding_maxsize_fails(self):
+        dac = Ad5672()
+        dac.configure_fifo(maxsize=2)
+        with self.assertRaises(ValueError):
+            with dac.transaction():
+                ars = [dac.write(addr=addr, voltage=1.0) for addr in range(3)]
+        for ar in ars:
+            self.assertIsInstance(ar.get_exception(), ValueError)
+        self.assertEqual(transfer(dac), Nop())
+
+    def test_fire_and_forget(self):
+        results = []
+        dac = Ad5672()
+        self.assertIsNone(dac.write(addr=1, voltage=1.0, fire_and_forget=True))
+        self.assertIsNone(dac.load_all_channels(results.append, fire_and_forget=True))
+        self.assertIsNone(next(dac).callback)
+        self.assertEqual(next(dac).callback, results.append)
+
+    def test_coalesce_writes_fire_and_forget(self):
+        dac = Ad5672(coalesce_writes=True)
+        dac.write(addr=1, voltage=1.0, fire_and_forget=True)
+        ar = dac.write(addr=1, voltage=2.0)
+        dac.write(addr=1, voltage=3.0, fire_and_forget=True)
+        self.assertEqual(transfer(dac), write_input_register(1, 3.0))
+        self.assertTrue(ar.is_finished())
+
+    def test_coalesce_writes_concurrent_producers(self):
+        dac = Ad5672(coalesce_writes=True)
+        fifo = dac._operation_requests[OperationPriority.NORMAL]
+        put = fifo.put
+        putting = threading.Event()
+
+        def slow_put(op_req):
+            # The put of the first write is preempted by the main thread.
+            if threading.current_thread() is not threading.main_thread():
+                putting.set()
+                time.sleep(0.1)
+            put(op_req)
+
+        fifo.put = slow_put
+        producer = threading.Thread(
+            target=dac.write, kwargs={"addr": 0, "voltage": 1.0}
+        )
+        producer.start()
+        putting.wait()
+        dac.write(addr=0, voltage=2.0)
+        dac.load_all_channels()
+        producer.join()
+
+        self.assertEqual(transfer(dac), write_input_register(0, 2.0))
+        self.assertEqual(transfer(dac), LoadAllChannels())
+        self.assertEqual(transfer(dac), Nop())
@@ -8,7 +8,8 @@ from functools import partial
 from bitarray import bitarray
 from util.util_bitarray import uint_to_bitarray
 
-from spi_elements.async_return import AsyncReturn
+from spi_elements.async_return import AsyncReturn, ChainedCallback
+from spi_elements.spi_operation_request_iterator import OperationPriority
 from spi_elements.aggregate_operation_request_iterator import (
     AggregateOperationRequestIterator,
 )
@@ -37,6 +38,10 @@ class Pss(AggregateOperationRequestIterator):
     conf_lower_current_limit_addr: int = 6
     conf_upper_current_limit_addr: int = 7
 
+    # Cycles after the reset of the configuration dac, before the adcs are
+    # initialized.
+    dac_reset_cycles: int = 3
+
     _pss_min_voltage_set: float = 0.0  # V
     _pss_max_voltage_set: float = 5.0  # V
     _pss_zero_offset_current: float = 25.0  # A
@@ -73,13 +78,16 @@ class Pss(AggregateOperationRequestIterator):
 
         responses = []
 
-        def collect_ops_responses(response: Any):
+        def collect_response(response: Any):
             responses.append(response)
             if len(responses) == len(sub_ar) and sequence_callback:
                 sequence_return = None
                 sequence_callback(sequence_return)
             return None
 
+        # The request fails, if any of its operation requests is dropped.
+        collect_ops_responses = ChainedCallback(collect_response, ar.fail)
+
         sub_ar = [
             self.get_conf_dac().nop(callback=collect_ops_responses),
             self.get_curr_adc().nop(callback=collect_ops_responses),
@@ -99,59 +107,69 @@ class Pss(AggregateOperationRequestIterator):
 
         responses = []
 
-        def collect_ops_responses(response: Any):
+        def collect_response(response: Any):
             responses.append(response)
             if len(responses) == len(sub_ar) and sequence_callback:
                 sequence_return = None
                 sequence_callback(sequence_return)
             return None
 
-        # Add a delay for the conf DAC reset to finish before transimitting
-        # init sequence for adc
-        for _ in range(3):
-            _ = self.get_curr_adc().nop()
-            _ = self.get_volt_adc().nop()
-
-        sub_ar = [
-            self.get_conf_dac().initialize(callback=collect_ops_responses),
-            self.get_curr_adc().initialize(
-                callback=collect_ops_responses,
-                input_range=Ads866xInputRange.UNIPOLAR_5V12,
-            ),
-            self.get_curr_adc().write_gpo(
-                callback=collect_ops_responses,
-                gpo_val=Ads866xGpoVal.HIGH,
-            ),
-            self.get_volt_adc().initialize(
-                callback=collect_ops_responses,
-                input_range=Ads866xInputRange.UNIPOLAR_5V12,
-            ),
-            self.get_volt_adc().write_gpo(
-                callback=collect_ops_responses,
-                gpo_val=Ads866xGpoVal.HIGH,
-            ),
-            self.output_disconnect(
-                callback=collect_ops_responses,
-            ),
-            self.write_config(
-                callback=collect_ops_responses,
-                tracking_mode=PssTrackingMode.voltage,
-                target_voltage=0.0,
-                target_current=0.0,
-                lower_voltage_limit=0.0,
-                upper_voltage_limit=5.0,
-                lower_current_limit=-20.0,
-                upper_current_limit=+20.0,
-            ),
-        ]
+        # The request fails, if any of its operation requests is dropped.
+        collect_ops_responses = ChainedCallback(collect_response, ar.fail)
+
+        # The operation requests of all SpiElements are put into their fifos
+        # at once.
+        with self.transaction():
+            # Add a delay for the conf DAC reset to finish before transimitting
+            # init sequence for adc. The mark is reached in the cycle of the
+            # first operation of the conf DAC initialization, i.e. the delay
+            # counts from this call, whenever the Pss is (re-)initialized.
+            dac_reset = self.get_conf_dac().mark_cycle()
+            self.get_curr_adc().delay(dac_reset, cycles=Pss.dac_reset_cycles)
+            self.get_volt_adc().delay(dac_reset, cycles=Pss.dac_reset_cycles)
+
+            sub_ar = [
+                self.get_conf_dac().initialize(callback=collect_ops_responses),
+                self.get_curr_adc().initialize(
+                    callback=collect_ops_responses,
+                    input_range=Ads866xInputRange.UNIPOLAR_5V12,
+                ),
+                self.get_curr_adc().write_gpo(
+                    callback=collect_ops_responses,
+                    gpo_val=Ads866xGpoVal.HIGH,
+                ),
+                self.get_volt_adc().initialize(
+                    callback=collect_ops_responses,
+                    input_range=Ads866xInputRange.UNIPOLAR_5V12,
+                ),
+                self.get_volt_adc().write_gpo(
+                    callback=collect_ops_responses,
+                    gpo_val=Ads866xGpoVal.HIGH,
+                ),
+                self.output_disconnect(
+                    callback=collect_ops_responses,
+                ),
+                self.write_config(
+                    callback=collect_ops_responses,
+                    tracking_mode=PssTrackingMode.voltage,
+                    target_voltage=0.0,
+                    target_current=0.0,
+                    lower_voltage_limit=0.0,
+                    upper_voltage_limit=5.0,
+                    lower_current_limit=-20.0,
+                    upper_current_limit=+20.0,
+                ),
+            ]
         return ar
 
     def read_output(
         self,
         callback: Optional[Callable[..., None]] = None,
+        priority: OperationPriority = OperationPriority.NORMAL,
     ) -> AsyncReturn:
         """Read the output voltage and current of the power supply sink.
 
+        :param priority: OperationPriority of the operation requests.
         :return: tuple of voltage and current. (voltage: float, current: float)
         """
 
@@ -166,7 +184,7 @@ class Pss(AggregateOperationRequestIterator):
 
         responses = [{"data": None, "called": False}, {"data": None, "called": False}]
 
-        def collect_ops_responses(response: Any, id: int):
+        def collect_response(response: Any, id: int):
             responses[id]["data"] = response
             responses[id]["called"] = True
 
@@ -178,8 +196,17 @@ class Pss(AggregateOperationRequestIterator):
                 sequence_callback(sequence_return)
             return None
 
-        self.get_volt_adc().read(callback=partial(collect_ops_responses, id=0))
-        self.get_curr_adc().read(callback=partial(collect_ops_responses, id=1))
+        # The request fails, if any of its operation requests is dropped.
+        self.get_volt_adc().read(
+            callback=ChainedCallback(partial(collect_response, id=0), ar.fail),
+            priority=priority,
+            fire_and_forget=True,
+        )
+        self.get_curr_adc().read(
+            callback=ChainedCallback(partial(collect_response, id=1), ar.fail),
+            priority=priority,
+            fire_and_forget=True,
+        )
         return ar
 
     def write_config(
@@ -281,61 +308,79 @@ class Pss(AggregateOperationRequestIterator):
 
         ar = AsyncReturn(callback)
 
-        if tracking_mode == PssTrackingMode.voltage:
-            _ = self.get_conf_dac().write(
-                addr=Pss.conf_refselect_addr,
-                voltage=0.0,
-            )
-        if tracking_mode == PssTrackingMode.current:
-            _ = self.get_conf_dac().write(
-                addr=Pss.conf_refselect_addr,
-                voltage=5.0,
-            )
-        if target_voltage:
-            _ = self.get_conf_dac().write(
-                addr=Pss.conf_target_voltage_addr,
-                voltage=conf_voltage_to_adc_voltage(target_voltage),
-            )
-        if target_current:
-            _ = self.get_conf_dac().write(
-                addr=Pss.conf_target_current_addr,
-                voltage=conf_current_to_adc_voltage(target_current),
-            )
-        if upper_voltage_limit:
-            _ = self.get_conf_dac().write(
-                addr=Pss.conf_upper_voltage_limit_addr,
-                voltage=conf_voltage_to_adc_voltage(upper_voltage_limit),
-            )
-        if lower_voltage_limit:
-            _ = self.get_conf_dac().write(
-                addr=Pss.conf_lower_voltage_limit_addr,
-                voltage=conf_voltage_to_adc_voltage(lower_voltage_limit),
-            )
-        if upper_current_limit:
-            _ = self.get_conf_dac().write(
-                addr=Pss.conf_upper_current_limit_addr,
-                voltage=conf_current_to_adc_voltage(upper_current_limit),
-            )
-        if lower_current_limit:
-            _ = self.get_conf_dac().write(
-                addr=Pss.conf_lower_current_limit_addr,
-                voltage=conf_current_to_adc_voltage(lower_current_limit),
-            )
+        # All writes are put into the fifo of the dac at once, such that the
+        # configuration is not interleaved with operation requests of other
+        # threads.
+        with self.get_conf_dac().transaction():
+            if tracking_mode == PssTrackingMode.voltage:
+                self.get_conf_dac().write(
+                    addr=Pss.conf_refselect_addr,
+                    voltage=0.0,
+                    fire_and_forget=True,
+                )
+            if tracking_mode == PssTrackingMode.current:
+                self.get_conf_dac().write(
+                    addr=Pss.conf_refselect_addr,
+                    voltage=5.0,
+                    fire_and_forget=True,
+                )
+            if target_voltage:
+                self.get_conf_dac().write(
+                    addr=Pss.conf_target_voltage_addr,
+                    voltage=conf_voltage_to_adc_voltage(target_voltage),
+                    fire_and_forget=True,
+                )
+            if target_current:
+                self.get_conf_dac().write(
+                    addr=Pss.conf_target_current_addr,
+                    voltage=conf_current_to_adc_voltage(target_current),
+                    fire_and_forget=True,
+                )
+            if upper_voltage_limit:
+                self.get_conf_dac().write(
+                    addr=Pss.conf_upper_voltage_limit_addr,
+                    voltage=conf_voltage_to_adc_voltage(upper_voltage_limit),
+                    fire_and_forget=True,
+                )
+            if lower_voltage_limit:
+                self.get_conf_dac().write(
+                    addr=Pss.conf_lower_voltage_limit_addr,
+                    voltage=conf_voltage_to_adc_voltage(lower_voltage_limit),
+                    fire_and_forget=True,
+                )
+            if upper_current_limit:
+                self.get_conf_dac().write(
+                    addr=Pss.conf_upper_current_limit_addr,
+                    voltage=conf_current_to_adc_voltage(upper_current_limit),
+                    fire_and_forget=True,
+                )
+            if lower_current_limit:
+                self.get_conf_dac().write(
+                    addr=Pss.conf_lower_current_limit_addr,
+                    voltage=conf_current_to_adc_voltage(lower_current_limit),
+                    fire_and_forget=True,
+                )
 
-        self.get_conf_dac().load_all_channels(callback=ar.get_callback())
+            self.get_conf_dac().load_all_channels(callback=ar.get_callback())
         return ar
 
     def output_connect(
         self,
         callback: Optional[Callable[..., None]] = None,
+        priority: OperationPriority = OperationPriority.NORMAL,
     ) -> AsyncReturn:
-        """Connect the output of the PowerSupplySink."""
+        """Connect the output of the PowerSupplySink.
+
+        :param priority: OperationPriority of the operation request, e.g.
+        OperationPriority.HIGH to connect on the next bus cycle.
+        """
         ar = AsyncReturn(callback)
 
         self.get_conf_dac().write_and_load(
             callback=ar.get_callback(),
             addr=Pss.conf_output_addr,
             voltage=5.0,
+            priority=priority,
         )
 
         return ar
@@ -343,14 +388,21 @@ class Pss(AggregateOperationRequestIterator):
     def output_disconnect(
         self,
         callback: Optional[Callable[..., None]] = None,
+        priority: OperationPriority = OperationPriority.NORMAL,
     ) -> AsyncReturn:
-        """Disconnect the output of the PowerSupplySink."""
+        """Disconnect the output of the PowerSupplySink.
+
+        :param priority: OperationPriority of the operation request, e.g.
+        OperationPriority.HIGH to disconnect on the next bus cycle, before
+        other pending operation requests.
+        """
         ar = AsyncReturn(callback)
 
         self.get_conf_dac().write_and_load(
             callback=ar.get_callback(),
             addr=Pss.conf_output_addr,
             voltage=0.0,
+            priority=priority,
         )
 
         return ar
@@ -0,0 +1,205 @@
+"""Cycle benchmark of a Pss over the Virtual SpiMaster.
+
+A cycle is processed like SpiClient._transfer_spi_channel() processes it, but
+without the ipc to the SpiServer: the next operation request is taken from the
+Pss, its command is converted to bytes, transferred by the Virtual SpiMaster
+and the received bytes are converted back and handed to the operation request
+of the previous cycle (one cycle delay of the response).
+
+- idle: cycles of default operation requests (nop) only.
+- read_output: a Pss.read_output() is requested before every cycle, which
+  includes the construction of the operations.
+- write_config: a Pss.write_config() is requested and all of its cycles are
+  processed.
+
+The bus cycles of compound operations are counted until all operation
+requests are transferred (responses are not processed):
+
+- initialize: Pss.initialize() before the first cycle, after idle cycles and
+  behind pending Pss.read_output() requests.
+- write_config: Pss.write_config().
+
+The allocations are measured with tracemalloc in steady state: the bytes
+retained per call (e.g. by a returned or queued operation request) and the
+peak of bytes allocated during a call.
+
+Usage:
+    python3 device_implementation/pss/pss_benchmark.py
+"""
+
+from statistics import median
+from timeit import repeat
+from typing import Any, Callable, List, Tuple
+import tracemalloc
+
+from util import bitarray_to_bytes, bytes_to_bitarray
+from spi_master.virtual import Virtual
+from spi_elements.spi_operation_request_iterator import SingleTransferOperationRequest
+from device_implementation.pss.pss import Pss, PssTrackingMode
+
+
+class PssCycle:
+    def __init__(self) -> None:
+        self.pss = Pss()
+        self.spi_master = Virtual(transfer_func=lambda cs, buf: bytearray(len(buf)))
+        self.spi_master.init()
+        self._delay_buffer: List[SingleTransferOperationRequest | None] = [None]
+
+    def __call__(self) -> None:
+        new_op_req = next(self.pss)
+
+        tx = bitarray_to_bytes(new_op_req.operation.get_command())
+        rx = bytes_to_bitarray(self.spi_master.transfer(0, tx))
+
+        old_op_req = self._delay_buffer[0]
+        if old_op_req:
+            if old_op_req.operation.get_response_required():
+                old_op_req.operation.set_response(rx)
+            if old_op_req.callback:
+                old_op_req.callback(old_op_req.operation.get_parsed_response())
+
+        self._delay_buffer[0] = new_op_req
+
+    def run_until_idle(self) -> int:
+        """Process cycles until no operation request is pending and the
+        response of the last one is processed.
+
+        :return: number of processed cycles
+        """
+        cycles = 0
+        while any(
+            spi_element.has_pending_operation_request()
+            for spi_element in self.pss._operation_request_iterators
+        ):
+            self()
+            cycles += 1
+        self()
+        return cycles + 1
+
+
+def best_of(stmt, number: int) -> float:
+    """Return the best time per call in seconds."""
+    return min(repeat(stmt, number=number, repeat=9)) / number
+
+
+def allocated_bytes(func: Callable[[], Any], number: int) -> Tuple[float, float]:
+    """Return the bytes retained per call and the median peak bytes allocated
+    during a call."""
+    results: List[Any] = [None] * number
+    peaks: List[int] = [0] * number
+    func()
+
+    tracemalloc.start()
+    start, _ = tracemalloc.get_traced_memory()
+    for i in range(number):
+        before, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        results[i] = func()
+        _, peak = tracemalloc.get_traced_memory()
+        peaks[i] = peak - before
+    end, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return (end - start) / number, median(peaks)
+
+
+def benchmark_cycles() -> None:
+    number = 2_000
+
+    # Pss.initialize() is not part of the benchmark, because it verifies the
+    # register contents, which are not emulated by the Virtual SpiMaster.
+    cycle = PssCycle()
+
+    def read_output() -> int:
+        cycle.pss.read_output()
+        return cycle.run_until_idle()
+
+    def write_config() -> int:
+        cycle.pss.write_config(
+            tracking_mode=PssTrackingMode.voltage,
+            target_voltage=2.5,
+            lower_current_limit=-10.0,
+            upper_current_limit=10.0,
+        )
+        return cycle.run_until_idle()
+
+    print(f"{'workload':<14} {'cycles':>7} {'per cycle [us]':>15}")
+    print(f"{'idle':<14} {1:>7} {best_of(cycle, number) * 1e6:>15.2f}")
+    for name, workload in [
+        ("read_output", read_output),
+        ("write_config", write_config),
+    ]:
+        cycles = workload()
+        t = best_of(workload, number) / cycles
+        print(f"{name:<14} {cycles:>7} {t * 1e6:>15.2f}")
+
+
+def count_cycles(pss: Pss) -> int:
+    """Return the number of cycles until all operation requests are taken."""
+    cycles = 0
+    while pss.has_pending_operation_request():
+        next(pss)
+        cycles += 1
+    return cycles
+
+
+def benchmark_schedules() -> None:
+    def initialize(idle_cycles: int, read_outputs: int) -> int:
+        pss = Pss()
+        for _ in range(idle_cycles):
+            next(pss)
+        for _ in range(read_outputs):
+            pss.read_output()
+        pss.initialize()
+        return count_cycles(pss)
+
+    def write_config() -> int:
+        pss = Pss()
+        pss.write_config(
+            tracking_mode=PssTrackingMode.voltage,
+            target_voltage=2.5,
+            lower_current_limit=-10.0,
+            upper_current_limit=10.0,
+        )
+        return count_cycles(pss)
+
+    print(f"{'schedule':<34} {'cycles':>7}")
+    for name, cycles in [
+        ("initialize", initialize(0, 0)),
+        ("initialize after 10 idle cycles", initialize(10, 0)),
+        ("initialize after 4 read_output", initialize(0, 4)),
+        ("write_config", write_config()),
+    ]:
+        print(f"{name:<34} {cycles:>7}")
+
+
+def benchmark_allocations() -> None:
+    number = 1_000
+
+    cycle = PssCycle()
+    dac = cycle.pss.get_conf_dac()
+    adc = cycle.pss.get_volt_adc()
+
+    def adc_read() -> SingleTransferOperationRequest:
+        adc.read()
+        return adc._pop_unprocessed_operation_request()
+
+    workloads = [
+        ("Ad5672 idle", lambda: next(dac)),
+        ("Ads866x idle", lambda: next(adc)),
+        ("Ads866x read", adc_read),
+        ("Pss idle cycle", cycle),
+    ]
+
+    print(f"{'workload':<16} {'retained [B/call]':>18} {'peak [B/call]':>14}")
+    for name, workload in workloads:
+        retained, peak = allocated_bytes(workload, number)
+        print(f"{name:<16} {retained:>18.0f} {peak:>14.0f}")
+
+
+if __name__ == "__main__":
+    benchmark_cycles()
+    print()
+    benchmark_schedules()
+    print()
+    benchmark_allocations()
@@ -0,0 +1,170 @@
+import unittest
+from typing import List
+
+from bitarray import bitarray
+
+from util import bitarray_to_bytes, bytes_to_bitarray, uint_to_bitarray
+from spi_master.virtual import Virtual
+from spi_elements import FifoFullError, FifoPolicy, OperationPriority
+from device_implementation.dac.ad5672 import Initialize, WriteInputAndDacRegister
+from device_implementation.pss.pss import Pss, PssTrackingMode
+
+
+class PssBus:
+    """Transfers the frames of a Pss with the Virtual SpiMaster and records
+    the 24-bit frames of the configuration dac."""
+
+    def __init__(self) -> None:
+        self.pss = Pss()
+        self.dac_frames: List[bitarray] = []
+        self.spi_master = Virtual(transfer_func=self._transfer)
+        self.spi_master.init()
+
+    def _transfer(self, cs: int, buf: bytearray) -> bytearray:
+        _ = cs
+        self.dac_frames.append(bytes_to_bitarray(buf)[0:24])
+        return bytearray(len(buf))
+
+    def cycle(self, n: int = 1) -> None:
+        for _ in range(n):
+            op_req = next(self.pss)
+            self.spi_master.transfer(
+                0, bitarray_to_bytes(op_req.operation.get_command())
+            )
+
+    def cycles_until_disconnect(self, max_cycles: int = 100) -> int:
+        """Return the number of cycles until the dac frame of
+        Pss.output_disconnect() is transferred."""
+        disconnect = WriteInputAndDacRegister(
+            addr=uint_to_bitarray(Pss.conf_output_addr, 4),
+            data=uint_to_bitarray(0, 12),
+        ).get_command()
+        for cycles in range(1, max_cycles + 1):
+            self.cycle()
+            if self.dac_frames[-1] == disconnect:
+                return cycles
+        raise RuntimeError(f"output_disconnect() not transferred in {max_cycles=}")
+
+    def write_config(self) -> None:
+        self.pss.write_config(
+            tracking_mode=PssTrackingMode.voltage,
+            target_voltage=2.5,
+            lower_current_limit=-10.0,
+            upper_current_limit=10.0,
+        )
+
+
+class TestPssPriority(unittest.TestCase):
+    def test_disconnect_normal_priority(self):
+        bus = PssBus()
+        for _ in range(10):
+            bus.write_config()
+        backlog = len(
+            bus.pss.get_conf_dac()._operation_requests[OperationPriority.NORMAL]
+        )
+        bus.pss.output_disconnect()
+        self.assertEqual(bus.cycles_until_disconnect(), backlog + 1)
+
+    def test_disconnect_high_priority(self):
+        bus = PssBus()
+        for _ in range(10):
+            bus.write_config()
+        backlog = len(
+            bus.pss.get_conf_dac()._operation_requests[OperationPriority.NORMAL]
+        )
+        bus.cycle(3)
+        bus.pss.output_disconnect(priority=OperationPriority.HIGH)
+        self.assertEqual(bus.cycles_until_disconnect(), 1)
+
+        # The remaining backlog is processed afterwards.
+        bus.cycle(backlog - 3)
+        self.assertFalse(bus.pss.get_conf_dac().has_pending_operation_request())
+
+    def test_disconnect_worst_case_latency(self):
+        # A started sequence is not split, i.e. the worst-case latency is the
+        # length of the longest sequence of the dac.
+        sequence_len = len(Initialize())
+        for started in range(sequence_len):
+            bus = PssBus()
+            bus.pss.get_conf_dac().initialize()
+            bus.write_config()
+            bus.cycle(started)
+            bus.pss.output_disconnect(priority=OperationPriority.HIGH)
+            latency = bus.cycles_until_disconnect()
+            if started == 0:
+                self.assertEqual(latency, 1)
+            else:
+                self.assertEqual(latency, sequence_len - started + 1)
+            self.assertLessEqual(latency, sequence_len)
+
+
+class TestPssIdleCycle(unittest.TestCase):
+    def test_idle_cycle_cached(self):
+        pss = Pss()
+        op_req = next(pss)
+        self.assertIs(next(pss), op_req)
+        self.assertIsNone(op_req.callback)
+        self.assertFalse(op_req.operation.get_response_required())
+
+    def test_idle_cycle_after_request(self):
+        pss = Pss()
+        idle_op_req = next(pss)
+        ar = pss.read_output()
+        op_req = next(pss)
+        self.assertIsNot(op_req, idle_op_req)
+        self.assertEqual(len(op_req.operation.get_command()), 88)
+        op_req.operation.set_response(uint_to_bitarray(0, 88))
+        op_req.callback(op_req.operation.get_parsed_response())
+        self.assertIs(next(pss), idle_op_req)
+        self.assertTrue(ar.is_finished())
+
+
+class TestPssInitialize(unittest.TestCase):
+    def cycles_until_adc_initialize(self, pss: Pss) -> int:
+        """Return the number of cycles before the first operation of the
+        initialization of the adcs."""
+        adc_nop = pss.get_curr_adc()._get_default_operation_request().operation
+        for cycles in range(100):
+            if next(pss).operation.get_command()[24:56] != adc_nop.get_command():
+                return cycles
+        raise RuntimeError("Adcs not initialized")
+
+    def test_adcs_initialized_after_dac_reset(self):
+        pss = Pss()
+        pss.initialize()
+        self.assertEqual(self.cycles_until_adc_initialize(pss), Pss.dac_reset_cycles)
+
+    def test_delay_after_idle_cycles(self):
+        pss = Pss()
+        for _ in range(10):
+            next(pss)
+        pss.initialize()
+        self.assertEqual(self.cycles_until_adc_initialize(pss), Pss.dac_reset_cycles)
+
+    def test_delay_on_reinitialize(self):
+        pss = Pss()
+        pss.initialize()
+        while pss.has_pending_operation_request():
+            next(pss)
+        pss.initialize()
+        self.assertEqual(self.cycles_until_adc_initialize(pss), Pss.dac_reset_cycles)
+
+    def test_rejected_initialize_is_atomic(self):
+        pss = Pss()
+        pss.get_conf_dac().configure_fifo(maxsize=3, policy=FifoPolicy.REJECT)
+        with self.assertRaises(ValueError):
+            pss.initialize()
+        for spi_element in [pss.get_conf_dac(), pss.get_curr_adc(), pss.get_volt_adc()]:
+            self.assertFalse(spi_element.has_pending_operation_request())
+
+    def test_rejected_transaction_is_atomic(self):
+        pss = Pss()
+        pss.get_curr_adc().configure_fifo(maxsize=1, policy=FifoPolicy.REJECT)
+        pss.get_curr_adc().nop()
+        with self.assertRaises(FifoFullError):
+            with pss.transaction():
+                dac_ar = pss.get_conf_dac().nop()
+                adc_ar = pss.get_curr_adc().nop()
+        self.assertIsInstance(dac_ar.get_exception(), FifoFullError)
+        self.assertIsInstance(adc_ar.get_exception(), FifoFullError)
+        self.assertFalse(pss.get_conf_dac().has_pending_operation_request())
@@ -0,0 +1,87 @@
+"""Benchmark of 100k register writes to the Ad5672 and Ads866x.
+
+- WriteInputRegister, WriteHword, WriteWord: construction of the operation.
+- WriteVerifyWord, Ads866x Initialize: construction of nested sequences.
+- Ad5672.write(): request of a write including the conversion of the
+  voltage, the AsyncReturn and the operation request, which is taken from the
+  fifo again afterwards.
+- Pss.write_config(): request of a configuration (five dac transfers), whose
+  operation requests are taken from the fifo again afterwards.
+
+Usage:
+    python3 device_implementation/register_operations_benchmark.py
+"""
+
+from timeit import repeat
+
+from util import uint_to_bitarray
+from device_implementation.dac.ad5672 import Ad5672, WriteInputRegister
+from device_implementation.pss.pss import Pss, PssTrackingMode
+from device_implementation.adc.ads866x import (
+    Initialize,
+    Ads866xInputRange,
+    WriteHword,
+    WriteWord,
+    WriteVerifyWord,
+)
+
+
+def best_of(stmt, number: int) -> float:
+    """Return the best time per call in seconds."""
+    return min(repeat(stmt, number=number, repeat=5)) / number
+
+
+if __name__ == "__main__":
+    addr = uint_to_bitarray(3, 4)
+    data = uint_to_bitarray(0xABC, 12)
+
+    hword_addr = uint_to_bitarray(0x014, 9)
+    hword_data = uint_to_bitarray(0xBEEF, 16)
+    word_data = uint_to_bitarray(0xDEADBEEF, 32)
+
+    dac = Ad5672()
+
+    def write() -> None:
+        dac.write(addr=3, voltage=2.5)
+        next(dac)
+
+    pss = Pss()
+    pss_dac = pss.get_conf_dac()
+
+    def write_config() -> None:
+        pss.write_config(
+            tracking_mode=PssTrackingMode.voltage,
+            target_voltage=2.5,
+            lower_current_limit=-10.0,
+            upper_current_limit=10.0,
+        )
+        while pss_dac.has_pending_operation_request():
+            next(pss_dac)
+
+    # (name, workload, number of calls per measurement)
+    workloads = [
+        (
+            "WriteInputRegister",
+            lambda: WriteInputRegister(addr=addr, data=data),
+            100_000,
+        ),
+        ("Ad5672.write()", write, 100_000),
+        ("Pss.write_config()", write_config, 10_000),
+        ("WriteHword", lambda: WriteHword(addr=hword_addr, data=hword_data), 100_000),
+        ("WriteWord", lambda: WriteWord(addr=hword_addr, data=word_data), 10_000),
+        (
+            "WriteVerifyWord",
+            lambda: WriteVerifyWord(addr=hword_addr, data=word_data),
+            1_000,
+        ),
+        (
+            "Ads866x Initialize",
+            lambda: Initialize(Ads866xInputRange.UNIPOLAR_5V12),
+            100,
+        ),
+    ]
+
+    print(f"{'workload':<20} {'per call [us]':>14} {'100k calls [s]':>15}")
+    for name, workload, number in workloads:
+        t = best_of(workload, number)
+        print(f"{name:<20} {t * 1e6:>14.2f} {t * 100_000:>15.3f}")
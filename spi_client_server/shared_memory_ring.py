@@ -0,0 +1,201 @@
+from __future__ import annotations
+
+from multiprocessing import Semaphore
+import os
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any, Callable, Dict, List
+
+# Layout of the shared memory:
+#
+# [counters]: uint64 counters, each on its own cache line (see below)
+# [lengths]:  uint32 length of the datagram in every slot
+# [slots]:    'slots' slots of 'slot_size' bytes
+#
+# The head is only written by the producer and the tail only by the consumer.
+# A slot is written before the head is incremented and read before the tail is
+# incremented, therefore no lock is required for a single producer and a single
+# consumer.
+_cache_line = 64
+_head = 0 * _cache_line // 8  # number of datagrams put
+_tail = 1 * _cache_line // 8  # number of datagrams got
+_counters_size = 2 * _cache_line
+
+# Number of polls of the counters, before a waiting endpoint blocks on its
+# semaphore. A response of the SpiServer is usually available within the spin.
+# On a single cpu the spin only delays the other process.
+_spin_count = 200 if (os.cpu_count() or 1) > 1 else 0
+
+
+class SharedMemoryRing:
+    """Ring of fixed-size slots in shared memory, which transports datagrams
+    from a single producer to a single consumer (in the same or another
+    process).
+
+    The semaphores count the datagrams (not_empty) and the free slots
+    (not_full): every put and get acquires one and releases the other, which
+    also orders the accesses to the slots and counters of both processes. A
+    semaphore only makes a syscall, if an endpoint blocks or is woken, i.e.
+    not as long as the ring is neither empty (consumer) nor full (producer).
+    A waiting endpoint polls the counters for a short time, before it blocks.
+
+    The ring is created by the owning process and passed to the other process
+    by pickling, e.g. as argument of multiprocessing.Process.
+    """
+
+    def __init__(self, slots: int = 16, slot_size: int = 4096) -> None:
+        """Create the ring in new shared memory.
+
+        :param slots: number of datagrams, which can be put without a get.
+        :param slot_size: maximum size of a datagram in bytes.
+        """
+        if slots < 1 or slot_size < 1:
+            raise ValueError(f"Expected positive {slots=} and {slot_size=}")
+
+        self._slots = slots
+        self._slot_size = slot_size
+        self._shm = SharedMemory(
+            create=True, size=_counters_size + slots * (4 + slot_size)
+        )
+        self._not_empty = Semaphore(0)
+        self._not_full = Semaphore(slots)
+        self._owner = True
+        self._attach()
+
+    def _attach(self) -> None:
+        self._closed = False
+        buf = self._shm.buf
+        lengths_end = _counters_size + 4 * self._slots
+        self._counters = buf[:_counters_size].cast("Q")
+        self._lengths = buf[_counters_size:lengths_end].cast("I")
+        self._payloads: List[memoryview] = [
+            buf[offset : offset + self._slot_size]
+            for offset in range(
+                lengths_end,
+                lengths_end + self._slots * self._slot_size,
+                self._slot_size,
+            )
+        ]
+
+    def __getstate__(self) -> Dict[str, Any]:
+        return {
+            "slots": self._slots,
+            "slot_size": self._slot_size,
+            "shm": self._shm,
+            "not_empty": self._not_empty,
+            "not_full": self._not_full,
+        }
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self._slots = state["slots"]
+        self._slot_size = state["slot_size"]
+        self._shm = state["shm"]
+        self._not_empty = state["not_empty"]
+        self._not_full = state["not_full"]
+        self._owner = False
+        self._attach()
+
+    def __len__(self) -> int:
+        """Returns the number of datagrams in the ring."""
+        return self._counters[_head] - self._counters[_tail]
+
+    def __repr__(self) -> str:
+        return f"SharedMemoryRing: name={self._shm.name}, slots={self._slots}, slot_size={self._slot_size}, datagrams={len(self)}"
+
+    def get_slot_size(self) -> int:
+        return self._slot_size
+
+    def close(self) -> None:
+        """Release the shared memory. The owner also destroys it. Endpoints
+        blocked by another thread of this process raise an EOFError, therefore
+        the other process must not use the ring anymore."""
+        if getattr(self, "_closed", True):
+            return
+        self._detach()
+        if self._owner:
+            self._shm.unlink()
+        self._not_empty.release()
+        self._not_full.release()
+
+    def __del__(self) -> None:
+        self._detach()
+
+    def _detach(self) -> None:
+        # The views must be released, before the shared memory can be closed.
+        if getattr(self, "_closed", True):
+            return
+        for view in (*self._payloads, self._counters, self._lengths):
+            view.release()
+        self._closed = True
+        self._shm.close()
+
+    def put(self, *buffers: bytes | bytearray | memoryview) -> None:
+        """Put the concatenation of the buffers as a datagram into the ring
+        (producer). The buffers are copied into the slot directly. Blocks
+        while the ring is full.
+
+        :raises EOFError: if the ring is closed by another thread meanwhile.
+        """
+        n = sum(map(len, buffers))
+        if n > self._slot_size:
+            raise ValueError(
+                f"Expected datagram of at most {self._slot_size} bytes, but got {n} bytes"
+            )
+
+        try:
+            counters = self._counters
+            head = counters[_head]
+            if head - counters[_tail] >= self._slots:
+                self._spin(lambda: head - counters[_tail] < self._slots)
+            self._acquire(self._not_full)
+
+            i = head % self._slots
+            payload = self._payloads[i]
+            offset = 0
+            for buffer in buffers:
+                payload[offset : offset + len(buffer)] = buffer
+                offset += len(buffer)
+            self._lengths[i] = n
+
+            counters[_head] = head + 1
+            self._not_empty.release()
+        except ValueError:  # views released by close()
+            if self._closed:
+                raise EOFError("SharedMemoryRing closed") from None
+            raise
+
+    def get(self) -> bytearray:
+        """Get the next datagram from the ring (consumer). Blocks while the
+        ring is empty.
+
+        :raises EOFError: if the ring is closed by another thread meanwhile.
+        """
+        try:
+            counters = self._counters
+            tail = counters[_tail]
+            if counters[_head] == tail:
+                self._spin(lambda: counters[_head] != tail)
+            self._acquire(self._not_empty)
+
+            i = tail % self._slots
+            datagram = bytearray(self._payloads[i][: self._lengths[i]])
+
+            counters[_tail] = tail + 1
+            self._not_full.release()
+            return datagram
+        except ValueError:  # views released by close()
+            if self._closed:
+                raise EOFError("SharedMemoryRing closed") from None
+            raise
+
+    def _spin(self, ready: Callable[[], bool]) -> None:
+        """Poll the counters, until 'ready' or for _spin_count polls."""
+        for _ in range(_spin_count):
+            if ready():
+                return
+
+    def _acquire(self, semaphore: Any) -> None:
+        """Acquire the semaphore of a datagram (consumer) or a free slot
+        (producer), blocking until the other endpoint released it."""
+        semaphore.acquire()
+        if self._closed:  # released by close()
+            raise EOFError("SharedMemoryRing closed while waiting")
@@ -0,0 +1,65 @@
+"""Benchmark of the frames per second between the SpiClient and the SpiServer
+process versus the number of frames per batch, i.e. per round trip. The frames
+are Pss frames (11 B) on alternating chip selects, which the SpiServer
+transfers with a Virtual SpiMaster.
+
+Usage:
+    python3 spi_client_server/spi_batch_benchmark.py
+"""
+
+from os import urandom
+from time import perf_counter
+from typing import Callable, List, Tuple
+
+from spi_client_server.spi_driver_ipc import (
+    pack_server_batch_command,
+    pack_server_command,
+    unpack_server_batch_response,
+    unpack_server_response,
+)
+from spi_client_server.spi_server import SpiServer
+from spi_client_server.spi_transport import (
+    SpiTransport,
+    PipeTransport,
+    SharedMemoryTransport,
+)
+from spi_master.virtual.virtual import Virtual
+
+
+def frames_per_second(transport: SpiTransport, batch_size: int, number: int) -> float:
+    frames = [(cs % 2, bytearray(urandom(11))) for cs in range(batch_size)]
+
+    def round_trip() -> None:
+        if batch_size == 1:
+            transport.client_write(*pack_server_command(*frames[0]))
+            unpack_server_response(transport.client_read())
+        else:
+            transport.client_write(*pack_server_batch_command(frames))
+            unpack_server_batch_response(transport.client_read())
+
+    with SpiServer(Virtual(), transport):
+        transport.open_client()
+        try:
+            for _ in range(number // 10):  # warm up
+                round_trip()
+            t = perf_counter()
+            for _ in range(number):
+                round_trip()
+            t = perf_counter() - t
+        finally:
+            transport.close_client()
+    return number * batch_size / t
+
+
+if __name__ == "__main__":
+    transports: List[Tuple[str, Callable[[], SpiTransport]]] = [
+        ("pipe", PipeTransport),
+        ("shared memory", SharedMemoryTransport),
+    ]
+
+    print(f"{'transport':<14} {'batch':>6} {'frames/s':>10}")
+    for transport_name, create_transport in transports:
+        for batch_size in [1, 2, 4, 8, 16, 32]:
+            transport = create_transport()
+            fps = frames_per_second(transport, batch_size, 20_000 // batch_size)
+            print(f"{transport_name:<14} {batch_size:>6} {fps:>10.0f}")
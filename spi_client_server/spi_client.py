@@ -1,18 +1,19 @@
 from dataclasses import dataclass
-from typing import Callable, List, Sequence, Optional
+from typing import List, Sequence, Optional, Tuple
+import heapq
 import time
 import threading
 from bitarray import bitarray
 
 from spi_elements.spi_operation_request_iterator import SingleTransferOperationRequest
-from util import reverse_string
+from util import bitarray_to_bytes, bytes_to_bitarray
 from spi_client_server.spi_driver_ipc import (
-    b64_client_ipc as ipc,
-    client_read_pipe_end,
-    client_write_pipe_end,
+    pack_server_batch_command,
     pack_server_command,
+    unpack_server_batch_response,
     unpack_server_response,
 )
+from spi_client_server.spi_pipeline import SpiPipeline
 from spi_client_server.spi_server import SpiServer
 from spi_elements import SpiOperationRequestIteratorBase
 
@@ -23,46 +24,98 @@ class SpiChannel:
     transfer_interval: float
     cs: int
     pre_transfer_channel_initialization: Optional[Sequence[bitarray]] = None
+    # Maximum number of frames transferred per interval, while the iterator
+    # has a pending operation request (backlog). 1 transfers a single frame
+    # per interval, e.g. for delays in cycles, which require wall-clock time.
+    max_batch_frames: int = 1
 
 
 class SpiClient:
-    """Automatic SpiClient, which instantiates its own SpiServer to send SpiCommands to."""
+    """Automatic SpiClient, which instantiates its own SpiServer to send SpiCommands to.
 
-    def __init__(self, spi_server: SpiServer, spi_channels: List[SpiChannel]) -> None:
+    The SpiClient communicates with the SpiServer process via the SpiTransport
+    of the SpiServer, which is selected when constructing the SpiServer.
+
+    The frames of all SpiChannels, which are due at the same time, and the
+    backlog of a SpiChannel (see SpiChannel.max_batch_frames) are sent to the
+    SpiServer as a single batch, i.e. in a single round trip.
+
+    With a pipeline_window, the SpiClient does not wait for the response of a
+    batch before sending the next one (see SpiPipeline). The callbacks of the
+    operation requests are then called by the reader thread of the pipeline.
+
+    By default every SpiChannel is transferred by a thread of its own. With
+    single_thread, a single thread schedules all SpiChannels by a heap of
+    their deadlines, i.e. the number of threads does not grow with the number
+    of SpiChannels. A transfer, which is later than the transfer_interval of
+    its SpiChannel, is a missed deadline (see get_missed_deadlines()).
+    """
+
+    def __init__(
+        self,
+        spi_server: SpiServer,
+        spi_channels: List[SpiChannel],
+        pipeline_window: int = 0,
+        single_thread: bool = False,
+    ) -> None:
+        """:param spi_server: SpiServer, whose process is started.
+        :param spi_channels: SpiChannels, which are transferred cyclically.
+        :param pipeline_window: maximum number of batches in flight, 0 waits
+        for the response of every batch.
+        :param single_thread: schedule all SpiChannels by a single thread
+        instead of a thread per SpiChannel.
+        """
         self._spi_server_lock = threading.Lock()
         if len(spi_channels) < 1:
             raise ValueError("At least one SpiChannel must be specified.")
         else:
             self._spi_channels = list(enumerate(spi_channels))
-            self._spi_channel_threads = [
-                self._create_cyclic_locking_thread(
-                    lambda: self._transfer_spi_channel(spi_channel, ch_id),
-                    spi_channel.transfer_interval,
-                )
-                for (ch_id, spi_channel) in self._spi_channels
-            ]
+            # Time of the next transfer of each SpiChannel (time.perf_counter()).
+            self._spi_channels_deadline: List[float] = [0.0] * len(spi_channels)
+            self._spi_channels_missed_deadlines: List[int] = [0] * len(spi_channels)
+            if single_thread:
+                self._spi_channel_threads = [self._create_scheduler_thread()]
+            else:
+                self._spi_channel_threads = [
+                    self._create_cyclic_locking_thread(ch_id)
+                    for (ch_id, _) in self._spi_channels
+                ]
             self._spi_channel_threads_run_flag = False
             self._spi_channels_delay_buffer: List[
                 SingleTransferOperationRequest | None
             ] = [None] * len(self._spi_channels)
         self._spi_server = spi_server
+        self._transport = spi_server.get_transport()
         self._spi_server.start_server_process()
-        client_write_pipe_end.open()
-        client_read_pipe_end.open()
+        self._transport.open_client(self._spi_server.server_process_running)
 
         for ch in spi_channels:
             if ch.pre_transfer_channel_initialization is not None:
                 self._initialize_spi_channel(ch)
 
+        self._pipeline: Optional[SpiPipeline] = None
+        if pipeline_window:
+            self._pipeline = SpiPipeline(self._transport, pipeline_window)
+            self._pipeline.start()
+
     def __del__(self):
         self._spi_server.stop_server_process()
-        client_write_pipe_end.close()
-        client_read_pipe_end.close()
+        self._transport.close_client()
+        self._spi_server.close()
 
     def get_spi_server(self) -> SpiServer:
         return self._spi_server
 
+    def get_missed_deadlines(self) -> List[int]:
+        """Returns the number of missed deadlines per SpiChannel, i.e. of the
+        transfers, which were later than the transfer_interval of the
+        SpiChannel. The transfer_interval is not caught up, but restarted at
+        the late transfer."""
+        return list(self._spi_channels_missed_deadlines)
+
     def start_cyclic_spi_channel_transfer(self) -> None:
+        now = time.perf_counter()
+        self._spi_channels_deadline[:] = [now] * len(self._spi_channels)
         self._spi_channel_threads_run_flag = True
         for ch in self._spi_channel_threads:
             ch.start()
@@ -71,34 +124,98 @@ class SpiClient:
         self._spi_channel_threads_run_flag = False
         for ch in self._spi_channel_threads:
             ch.join()
+        if self._pipeline is not None:
+            self._pipeline.flush()
 
-    def _create_cyclic_locking_thread(
-        self, func: Callable[[], None], interval: float
-    ) -> threading.Thread:
+    def _create_cyclic_locking_thread(self, ch_id: int) -> threading.Thread:
         def cyclic_locking_wrapper():
-            last_time = time.perf_counter()
+            deadlines = self._spi_channels_deadline
             while self._spi_channel_threads_run_flag:
                 with self._spi_server_lock:
-                    func()
-                current_time = time.perf_counter()
-                sleep_time = interval - (current_time - last_time)
+                    # The SpiChannel is skipped, if it was transferred with the
+                    # batch of another SpiChannel, which was due in the meantime.
+                    if deadlines[ch_id] <= time.perf_counter():
+                        self._transfer_due_spi_channels()
+                sleep_time = deadlines[ch_id] - time.perf_counter()
                 if sleep_time > 0:
                     time.sleep(sleep_time)
-                last_time = current_time
 
         return threading.Thread(target=cyclic_locking_wrapper, daemon=True)
 
+    def _create_scheduler_thread(self) -> threading.Thread:
+        def scheduler():
+            deadlines = self._spi_channels_deadline
+            # (deadline, ch_id) of every SpiChannel, the next one on top.
+            heap = [(deadlines[ch_id], ch_id) for ch_id, _ in self._spi_channels]
+            heapq.heapify(heap)
+            while self._spi_channel_threads_run_flag:
+                sleep_time = heap[0][0] - time.perf_counter()
+                if sleep_time > 0:
+                    time.sleep(sleep_time)
+                    continue
+                with self._spi_server_lock:
+                    ch_ids = self._transfer_due_spi_channels()
+                # The due SpiChannels are the ones with the earliest deadlines.
+                for _ in ch_ids:
+                    heapq.heappop(heap)
+                for ch_id in ch_ids:
+                    heapq.heappush(heap, (deadlines[ch_id], ch_id))
+
+        return threading.Thread(target=scheduler, daemon=True)
+
     def _write_to_spi_server(self, cs: int, buf: bytearray) -> None:
-        return ipc.write(pack_server_command(cs, buf))
+        return self._transport.client_write(*pack_server_command(cs, buf))
+
+    def _read_from_spi_server(self) -> memoryview:
+        return unpack_server_response(self._transport.client_read())
+
+    def _transfer_due_spi_channels(self) -> List[int]:
+        """Transfer the frames of all SpiChannels, which are due, in a single
+        batch and advance their deadlines by their transfer_interval.
+
+        :return: ch_id of the SpiChannels, which were due.
+        """
+        now = time.perf_counter()
+        deadlines = self._spi_channels_deadline
+        ch_ids: List[int] = []
+        op_reqs: List[Tuple[int, SingleTransferOperationRequest]] = []
+        for ch_id, spi_channel in self._spi_channels:
+            if deadlines[ch_id] > now:
+                continue
+            ch_ids.append(ch_id)
+            deadlines[ch_id] += spi_channel.transfer_interval
+            if deadlines[ch_id] < now:
+                self._spi_channels_missed_deadlines[ch_id] += 1
+                deadlines[ch_id] = now
 
-    def _read_from_spi_server(self) -> bytearray:
-        return unpack_server_response(ipc.read())
+            op_req_it = spi_channel.spi_operation_request_iterator
+            op_reqs.append((ch_id, next(op_req_it)))
+            for _ in range(spi_channel.max_batch_frames - 1):
+                if not op_req_it.has_pending_operation_request():
+                    break
+                op_reqs.append((ch_id, next(op_req_it)))
 
-    def _transfer_spi_channel(self, spi_channel: SpiChannel, ch_id: int) -> None:
-        new_op_req = next(spi_channel.spi_operation_request_iterator)
+        frames = [
+            (self._spi_channels[ch_id][1].cs, op_req.operation.get_command())
+            for ch_id, op_req in op_reqs
+        ]
 
-        rx = self._transfer_spi_data(spi_channel.cs, new_op_req.operation.get_command())
+        def process_responses(rxs: List[bitarray]) -> None:
+            for (ch_id, op_req), rx in zip(op_reqs, rxs):
+                self._process_spi_channel_response(ch_id, op_req, rx)
 
+        if self._pipeline is not None:
+            self._pipeline.transfer(frames, process_responses)
+        else:
+            process_responses(self._transfer_spi_data_batch(frames))
+        return ch_ids
+
+    def _process_spi_channel_response(
+        self, ch_id: int, new_op_req: SingleTransferOperationRequest, rx: bitarray
+    ) -> None:
+        """The response of a transfer belongs to the previous operation request
+        of the SpiChannel, 'new_op_req' receives the response of the next
+        transfer."""
         old_op_req = self._spi_channels_delay_buffer[ch_id]
         if old_op_req:
             if old_op_req.operation.get_response_required():
@@ -114,11 +231,27 @@ class SpiClient:
         return
 
     def _transfer_spi_data(self, cs: int, data: bitarray) -> bitarray:
-        tx: bytearray = bytearray(data[::-1].tobytes())
+        tx: bytearray = bitarray_to_bytes(data)
         self._write_to_spi_server(cs, tx)
 
-        rx: bytearray = self._read_from_spi_server()
-        return bitarray(reverse_string("".join(format(byte, "08b") for byte in rx)))
+        rx = self._read_from_spi_server()
+        return bytes_to_bitarray(rx)
+
+    def _transfer_spi_data_batch(
+        self, frames: Sequence[Tuple[int, bitarray]]
+    ) -> List[bitarray]:
+        """Transfer the frames (cs, data) back-to-back in a single round trip
+        to the SpiServer."""
+        if len(frames) == 1:
+            return [self._transfer_spi_data(*frames[0])]
+
+        self._transport.client_write(
+            *pack_server_batch_command(
+                [(cs, bitarray_to_bytes(data)) for cs, data in frames]
+            )
+        )
+        rxs = unpack_server_batch_response(self._transport.client_read())
+        return [bytes_to_bitarray(rx) for rx in rxs]
 
     def _initialize_spi_channel(self, spi_channel: SpiChannel) -> None:
         if spi_channel.pre_transfer_channel_initialization is None:
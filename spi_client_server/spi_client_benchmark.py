@@ -0,0 +1,56 @@
+"""Benchmark of the per cycle cpu cost of the conversion between the bitarray
+of an operation and the bytes transferred by SpiClient._transfer_spi_data(),
+against the previous implementation, which formatted and parsed strings.
+
+Usage:
+    python3 spi_client_server/spi_client_benchmark.py
+"""
+
+from os import urandom
+from timeit import repeat
+
+from bitarray import bitarray
+
+from util import reverse_string, bitarray_to_bytes, bytes_to_bitarray
+
+
+def bitarray_to_bytes_str(data: bitarray) -> bytearray:
+    return bytearray(data[::-1].tobytes())
+
+
+def bytes_to_bitarray_str(rx: bytearray) -> bitarray:
+    return bitarray(reverse_string("".join(format(byte, "08b") for byte in rx)))
+
+
+def best_of(stmt, number: int) -> float:
+    """Return the best time per call in seconds."""
+    return min(repeat(stmt, number=number, repeat=5)) / number
+
+
+if __name__ == "__main__":
+    # (name, frame length in bytes)
+    frames = [("1 B", 1), ("Pss (11 B)", 11), ("1 KiB", 1024)]
+
+    print(
+        f"{'frame':<12} {'direction':<10} {'str [us]':>10} {'bytes [us]':>11} {'speedup':>8}"
+    )
+    for name, nbytes in frames:
+        number = max(100, 100_000 // nbytes)
+        rx = bytearray(urandom(nbytes))
+        data = bytes_to_bitarray(rx)
+        if data != bytes_to_bitarray_str(rx) or bitarray_to_bytes(data) != rx:
+            raise RuntimeError(f"Mismatch of conversion for {name}")
+
+        # The previous implementation operated on frames with default endianness.
+        data_str = bitarray(data, endian="big")
+        t_str = best_of(lambda: bitarray_to_bytes_str(data_str), number)
+        t_bytes = best_of(lambda: bitarray_to_bytes(data), number)
+        print(
+            f"{name:<12} {'tx':<10} {t_str * 1e6:>10.2f} {t_bytes * 1e6:>11.2f} {t_str / t_bytes:>7.1f}x"
+        )
+
+        t_str = best_of(lambda: bytes_to_bitarray_str(rx), number)
+        t_bytes = best_of(lambda: bytes_to_bitarray(rx), number)
+        print(
+            f"{name:<12} {'rx':<10} {t_str * 1e6:>10.2f} {t_bytes * 1e6:>11.2f} {t_str / t_bytes:>7.1f}x"
+        )
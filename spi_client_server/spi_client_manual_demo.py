@@ -15,9 +15,6 @@ if __name__ == "__main__":
     )
 
     from spi_client_server.spi_driver_ipc import (
-        b64_client_ipc as ipc,
-        client_read_pipe_end,
-        client_write_pipe_end,
         pack_server_command,
         unpack_server_response,
     )
@@ -34,23 +31,25 @@ if __name__ == "__main__":
         return bytearray.fromhex(hex_string)
 
     with SpiServer(ArduinoSpi()) as spi_server:
-        with client_write_pipe_end:
-            with client_read_pipe_end:
+        transport = spi_server.get_transport()
+        transport.open_client()
 
-                cs = 0
+        cs = 0
 
-                try:
-                    while True:
-                        user_input = input("Enter hexstring or 'exit': ")
-                        if user_input.lower() == "exit":
-                            print("Exiting program.")
-                            break
-                        tx_bytearray = hex_string_to_bytearray(user_input)
+        try:
+            while True:
+                user_input = input("Enter hexstring or 'exit': ")
+                if user_input.lower() == "exit":
+                    print("Exiting program.")
+                    break
+                tx_bytearray = hex_string_to_bytearray(user_input)
 
-                        ipc.write(pack_server_command(cs, tx_bytearray))
-                        rx_bytearray = unpack_server_response(ipc.read())
+                transport.client_write(*pack_server_command(cs, tx_bytearray))
+                rx_bytearray = unpack_server_response(transport.client_read())
 
-                        print(f"TX: {tx_bytearray.hex()}, RX: {rx_bytearray.hex()}")
+                print(f"TX: {tx_bytearray.hex()}, RX: {rx_bytearray.hex()}")
 
-                except KeyboardInterrupt:
-                    print("SIGINT: Exiting program.")
+        except KeyboardInterrupt:
+            print("SIGINT: Exiting program.")
+        finally:
+            transport.close_client()
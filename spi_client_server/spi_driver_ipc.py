@@ -3,10 +3,20 @@ from python_xp_named_pipe.base64_encoder_decoder import (
     Base64DatagrammeEncoderDecoder as B64,
 )
 
-from typing import Tuple
+from contextlib import contextmanager
+from struct import Struct
+from typing import Callable, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+import errno
+import os
+import time
 
-client_to_server_pipe: NamedPipe = NamedPipe("./client_to_server")
-server_to_client_pipe: NamedPipe = NamedPipe("./server_to_client")
+Buffer = bytes | bytearray | memoryview
+
+client_to_server_path = "./client_to_server"
+server_to_client_path = "./server_to_client"
+
+client_to_server_pipe: NamedPipe = NamedPipe(client_to_server_path)
+server_to_client_pipe: NamedPipe = NamedPipe(server_to_client_path)
 
 client_read_pipe_end = ReadPipeEnd(server_to_client_pipe)
 client_write_pipe_end = WritePipeEnd(client_to_server_pipe)
@@ -24,18 +34,235 @@ b64_server_ipc = B64(
     write_func=server_write_pipe_end.write,
 )
 
+# Every datagram between SpiClient and SpiServer is a fixed header followed by
+# the raw payload. The header is (little endian):
+#
+# length (uint32): number of bytes of the payload
+# seq (uint32):    sequence number of the command, echoed by the response
+# cs (uint8):      chip select of the transfer
+# flags (uint8):   FRAME_FLAG_*
+frame_header = Struct("<IIBB")
+
+# The payload is a batch of frames (header and payload each), which are
+# transferred back-to-back. The response is a batch of their responses.
+FRAME_FLAG_BATCH = 0x01
+
+
+class FrameHeader(NamedTuple):
+    length: int
+    seq: int
+    cs: int
+    flags: int
+
+
+def pack_frame_header(length: int, cs: int = 0, seq: int = 0, flags: int = 0) -> bytes:
+    return frame_header.pack(length, seq, cs, flags)
+
+
+def unpack_frame(datagram: Buffer) -> Tuple[FrameHeader, memoryview]:
+    """Split a datagram into its header and a view of its payload.
+
+    :raises ValueError: if the datagram is shorter than its header or length.
+    """
+    view = memoryview(datagram)
+    if len(view) < frame_header.size:
+        raise ValueError(f"Expected frame header, but got {len(view)} bytes")
+    header = FrameHeader._make(frame_header.unpack_from(view))
+    payload = view[frame_header.size :]
+    if len(payload) != header.length:
+        raise ValueError(
+            f"Expected payload of {header.length} bytes, but got {len(payload)} bytes"
+        )
+    return header, payload
+
+
+class FramedStream:
+    """Framed datagrams on a pair of file descriptors of a byte stream, e.g.
+    the ends of the named pipes.
+
+    A datagram is written with a single os.writev() of its buffers, i.e. the
+    header and the payload are not joined. A datagram is read with
+    os.readv() into a reusable buffer, which only grows for larger datagrams.
+    """
+
+    def __init__(self, read_fd: int, write_fd: int) -> None:
+        self._read_fd = read_fd
+        self._write_fd = write_fd
+        self._rx = bytearray(frame_header.size + 64)
+
+    def write(self, *buffers: Buffer) -> None:
+        n = os.writev(self._write_fd, buffers)
+        total = sum(map(len, buffers))
+        if n < total:  # interrupted, write the remainder
+            remainder = memoryview(bytearray().join(buffers))[n:]
+            while remainder:
+                remainder = remainder[os.write(self._write_fd, remainder) :]
+
+    def read(self) -> memoryview:
+        """Read the next datagram. The view is valid until the next read."""
+        self._readinto(memoryview(self._rx)[: frame_header.size])
+        length = frame_header.size + frame_header.unpack_from(self._rx)[0]
+        if length > len(self._rx):
+            header = self._rx[: frame_header.size]
+            self._rx = bytearray(length)
+            self._rx[: frame_header.size] = header
+        view = memoryview(self._rx)[:length]
+        self._readinto(view[frame_header.size :])
+        return view
+
+    def close(self) -> None:
+        os.close(self._read_fd)
+        os.close(self._write_fd)
+
+    def _readinto(self, view: memoryview) -> None:
+        while view:
+            n = os.readv(self._read_fd, [view])
+            if n == 0:
+                raise EOFError("Named pipe closed by the other process")
+            view = view[n:]
+
+
+@contextmanager
+def create_fifos(*paths: str) -> Iterator[None]:
+    """Context manager, which creates the named pipes at 'paths' (replacing
+    stale ones of a previous SpiServer process) and removes them on exit."""
+    for path in paths:
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            pass
+        os.mkfifo(path)
+    try:
+        yield
+    finally:
+        for path in paths:
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+
+
+def open_fifo(
+    path: str,
+    flags: int,
+    timeout: float = 10.0,
+    server_running: Optional[Callable[[], bool]] = None,
+) -> int:
+    """Open the named pipe at 'path', which is created by the SpiServer
+    process (see create_fifos()). Waits until the named pipe exists and, if
+    it is opened for writing, until the SpiServer opened it for reading.
+
+    A named pipe is opened for writing non-blocking, such that the wait can be
+    given up, and set to blocking afterwards. A named pipe is opened for
+    reading blocking, once it exists, because a read without a writer returns
+    EOF. It must only be opened, when the SpiServer opens the other end next,
+    i.e. after the named pipe, which the SpiServer opens first.
+
+    :param timeout: in seconds to wait for the SpiServer.
+    :param server_running: returns False, if the SpiServer process stopped,
+    e.g. SpiServer.server_process_running().
+    :raises TimeoutError: if the named pipe is not opened after 'timeout'.
+    :raises RuntimeError: if the SpiServer process stopped.
+    """
+    if flags & os.O_ACCMODE != os.O_RDONLY:
+        flags |= os.O_NONBLOCK
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            fd = os.open(path, flags)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            # ENXIO: opened for writing, but the SpiServer is not reading yet.
+            if e.errno != errno.ENXIO:
+                raise
+        else:
+            os.set_blocking(fd, True)
+            return fd
+
+        if server_running is not None and not server_running():
+            raise RuntimeError(f"SpiServer process stopped before opening {path=}")
+        if time.monotonic() > deadline:
+            raise TimeoutError(f"Named pipe {path=} not opened after {timeout=}")
+        time.sleep(0.001)
+
+
+def pack_server_command(
+    cs: int, buf: Buffer, seq: int = 0, flags: int = 0
+) -> Tuple[bytes, Buffer]:
+    """Returns the buffers of the datagram of a command, which are written by
+    a single write of the SpiTransport."""
+    return pack_frame_header(len(buf), cs, seq, flags), buf
+
+
+def unpack_server_command(cmd: Buffer) -> Tuple[int, bytearray]:
+    header, payload = unpack_frame(cmd)
+    return header.cs, bytearray(payload)
+
+
+def pack_server_response(
+    buf: Buffer, cs: int = 0, seq: int = 0
+) -> Tuple[bytes, Buffer]:
+    return pack_frame_header(len(buf), cs, seq), buf
+
+
+def unpack_server_response(response: Buffer) -> memoryview:
+    """Returns a view of the payload of the response."""
+    _, payload = unpack_frame(response)
+    return payload
+
+
+def pack_batch(
+    frames: Sequence[Tuple[int, Buffer]], seq: int = 0, flags: int = 0
+) -> List[Buffer]:
+    """Returns the buffers of a datagram, whose payload is a batch of the
+    frames (cs, payload)."""
+    buffers: List[Buffer] = [b""]
+    length = 0
+    for cs, buf in frames:
+        buffers += pack_frame_header(len(buf), cs), buf
+        length += frame_header.size + len(buf)
+    buffers[0] = pack_frame_header(length, 0, seq, flags | FRAME_FLAG_BATCH)
+    return buffers
+
+
+def unpack_batch(payload: memoryview) -> List[Tuple[FrameHeader, memoryview]]:
+    """Split the payload of a batch into the headers and views of the payloads
+    of its frames.
 
-def pack_server_command(cs: int, buf: bytearray) -> bytearray:
-    return bytearray(cs.to_bytes(1, "big", signed=False) + buf)
+    :raises ValueError: if a frame exceeds the payload.
+    """
+    frames: List[Tuple[FrameHeader, memoryview]] = []
+    offset = 0
+    while offset < len(payload):
+        start = offset + frame_header.size
+        if start > len(payload):
+            raise ValueError(f"Expected frame header at {offset=} of batch")
+        header = FrameHeader._make(frame_header.unpack_from(payload, offset))
+        offset = start + header.length
+        if offset > len(payload):
+            raise ValueError(f"Expected payload of {header.length} bytes in batch")
+        frames.append((header, payload[start:offset]))
+    return frames
 
 
-def unpack_server_command(cmd: bytearray) -> Tuple[int, bytearray]:
-    return cmd[0], cmd[1:]
+def pack_server_batch_command(
+    frames: Sequence[Tuple[int, Buffer]], seq: int = 0
+) -> List[Buffer]:
+    """Returns the buffers of the datagram of a batch of commands (cs, buf),
+    which the SpiServer transfers back-to-back."""
+    return pack_batch(frames, seq)
 
 
-def pack_server_response(buf: bytearray) -> bytearray:
-    return buf
+def pack_server_batch_response(
+    frames: Sequence[Tuple[int, Buffer]], seq: int = 0
+) -> List[Buffer]:
+    return pack_batch(frames, seq)
 
 
-def unpack_server_response(response: bytearray) -> bytearray:
-    return response
+def unpack_server_batch_response(response: Buffer) -> List[memoryview]:
+    """Returns views of the payloads of the responses of a batch."""
+    header, payload = unpack_frame(response)
+    if not header.flags & FRAME_FLAG_BATCH:
+        raise ValueError("Expected response of a batch")
+    return [rx for _, rx in unpack_batch(payload)]
@@ -0,0 +1,160 @@
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+import threading
+import traceback
+from bitarray import bitarray
+
+from util import bitarray_to_bytes, bytes_to_bitarray
+from spi_client_server.spi_driver_ipc import (
+    FRAME_FLAG_BATCH,
+    pack_server_batch_command,
+    pack_server_command,
+    unpack_batch,
+    unpack_frame,
+)
+from spi_client_server.spi_transport import SpiTransport
+
+_seq_mask = 0xFFFFFFFF
+
+
+class SpiPipeline:
+    """Pipelined transfers to the SpiServer: up to 'window' commands are in
+    flight, such that the SpiServer transfers the next command on the bus,
+    while the responses of the previous commands are parsed and the next
+    commands are prepared.
+
+    Every command has a sequence number, which the SpiServer echoes in its
+    response. A reader thread matches the responses to the commands and calls
+    their callbacks. The SpiServer executes the commands in the order they
+    were sent, therefore the frames of a chip select are transferred and their
+    callbacks are called in the order of transfer().
+
+    If the reader thread stops, because of a malformed response or a response
+    to an unknown command, the pipeline fails: transfer() and flush() raise a
+    RuntimeError instead of waiting for responses, which never arrive.
+
+    An exception of a callback does not stop the reader thread. The first one
+    is recorded and raised by the next flush().
+    """
+
+    def __init__(self, transport: SpiTransport, window: int = 8) -> None:
+        """:param transport: SpiTransport, whose client endpoint is open.
+        :param window: maximum number of commands in flight.
+        """
+        if window < 1:
+            raise ValueError(f"Expected positive window, but got {window=}")
+
+        self._transport = transport
+        self._window = window
+        # Guards the number of commands in flight (until their callbacks
+        # returned) and the error, which stopped the reader thread.
+        self._condition = threading.Condition()
+        self._pending = 0
+        self._error: Optional[BaseException] = None
+        self._callback_error: Optional[BaseException] = None
+        self._write_lock = threading.Lock()
+        self._seq = 0
+        self._in_flight: Dict[int, Callable[[List[bitarray]], None]] = {}
+        self._reader: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        self._reader = threading.Thread(target=self._read_responses, daemon=True)
+        self._reader.start()
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait until no command is in flight and all callbacks returned.
+
+        :return: False, if the timeout expired before.
+        :raises RuntimeError: if the pipeline failed with commands in flight or
+        a callback raised an exception since the last flush().
+        """
+        with self._condition:
+            if not self._condition.wait_for(
+                lambda: not self._pending or self._error is not None, timeout
+            ):
+                return False
+            if self._pending:
+                raise RuntimeError(
+                    f"SpiPipeline failed with {self._pending} commands in flight"
+                ) from self._error
+            callback_error, self._callback_error = self._callback_error, None
+            if callback_error is not None:
+                raise RuntimeError("SpiPipeline callback failed") from callback_error
+            return True
+
+    def get_in_flight(self) -> int:
+        return len(self._in_flight)
+
+    def transfer(
+        self,
+        frames: Sequence[Tuple[int, bitarray]],
+        callback: Callable[[List[bitarray]], None],
+    ) -> None:
+        """Send the frames (cs, data) as a single command and return without
+        waiting for the response. Blocks while 'window' commands are in flight.
+
+        :param callback: called by the reader thread with the responses of the
+        frames.
+        :raises RuntimeError: if the pipeline failed.
+        """
+        with self._condition:
+            self._condition.wait_for(
+                lambda: self._pending < self._window or self._error is not None
+            )
+            if self._error is not None:
+                raise RuntimeError("SpiPipeline failed") from self._error
+            self._pending += 1
+
+        # The write lock is not the condition, such that the reader thread is
+        # not blocked by a write, which waits for the SpiServer.
+        with self._write_lock:
+            seq = self._seq
+            self._seq = (seq + 1) & _seq_mask
+            self._in_flight[seq] = callback
+            try:
+                if len(frames) == 1:
+                    cs, data = frames[0]
+                    buffers = pack_server_command(cs, bitarray_to_bytes(data), seq)
+                else:
+                    buffers = pack_server_batch_command(
+                        [(cs, bitarray_to_bytes(data)) for cs, data in frames], seq
+                    )
+                self._transport.client_write(*buffers)
+            except BaseException:
+                del self._in_flight[seq]
+                self._complete()
+                raise
+
+    def _complete(self) -> None:
+        with self._condition:
+            self._pending -= 1
+            self._condition.notify_all()
+
+    def _fail(self, error: BaseException) -> None:
+        with self._condition:
+            self._error = error
+            self._condition.notify_all()
+
+    def _read_responses(self) -> None:
+        try:
+            while True:
+                header, payload = unpack_frame(self._transport.client_read())
+                if header.flags & FRAME_FLAG_BATCH:
+                    rxs = [bytes_to_bitarray(rx) for _, rx in unpack_batch(payload)]
+                else:
+                    rxs = [bytes_to_bitarray(payload)]
+
+                callback = self._in_flight.pop(header.seq)
+                try:
+                    callback(rxs)
+                except Exception as e:
+                    with self._condition:
+                        if self._callback_error is None:
+                            self._callback_error = e
+                finally:
+                    self._complete()
+        except (EOFError, OSError) as e:  # client endpoint or SpiServer closed
+            self._fail(e)
+        except (ValueError, KeyError) as e:  # malformed response or unknown seq
+            print("SpiPipeline: reader thread stopped")
+            traceback.print_exc()
+            self._fail(e)
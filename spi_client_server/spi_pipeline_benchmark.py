@@ -0,0 +1,68 @@
+"""Benchmark of the frames per second between the SpiClient and the SpiServer
+process versus the window of the SpiPipeline, i.e. the number of commands in
+flight. The frames are Pss frames (11 B) on alternating chip selects, which
+the SpiServer transfers with a Virtual SpiMaster.
+
+A window of 1 is a round trip per frame, as without the pipeline.
+
+Usage:
+    python3 spi_client_server/spi_pipeline_benchmark.py
+"""
+
+from os import urandom
+from time import perf_counter
+from typing import Callable, List, Tuple
+
+from bitarray import bitarray
+
+from spi_client_server.spi_pipeline import SpiPipeline
+from spi_client_server.spi_server import SpiServer
+from spi_client_server.spi_transport import (
+    SpiTransport,
+    PipeTransport,
+    SharedMemoryTransport,
+)
+from spi_master.virtual.virtual import Virtual
+
+
+def frames_per_second(transport: SpiTransport, window: int, number: int) -> float:
+    frames: List[Tuple[int, bitarray]] = []
+    for cs in range(2):
+        data = bitarray()
+        data.frombytes(urandom(11))
+        frames.append((cs, data))
+
+    def discard(rxs: List[bitarray]) -> None:
+        pass
+
+    with SpiServer(Virtual(), transport):
+        transport.open_client()
+        try:
+            pipeline = SpiPipeline(transport, window)
+            pipeline.start()
+            for i in range(number // 10):  # warm up
+                pipeline.transfer([frames[i % 2]], discard)
+            pipeline.flush()
+
+            t = perf_counter()
+            for i in range(number):
+                pipeline.transfer([frames[i % 2]], discard)
+            pipeline.flush()
+            t = perf_counter() - t
+        finally:
+            transport.close_client()
+    return number / t
+
+
+if __name__ == "__main__":
+    transports: List[Tuple[str, Callable[[], SpiTransport]]] = [
+        ("pipe", PipeTransport),
+        ("shared memory", lambda: SharedMemoryTransport(slots=32)),
+    ]
+
+    print(f"{'transport':<14} {'window':>6} {'frames/s':>10}")
+    for transport_name, create_transport in transports:
+        for window in [1, 2, 4, 8, 16]:
+            transport = create_transport()
+            fps = frames_per_second(transport, window, 20_000)
+            print(f"{transport_name:<14} {window:>6} {fps:>10.0f}")
@@ -0,0 +1,96 @@
+"""Benchmark of the scheduling of the SpiChannels of a SpiClient by a thread
+per SpiChannel versus a single thread (SpiClient(single_thread=True)), for 1,
+8 and 32 SpiChannels, which are transferred with a Virtual SpiMaster.
+
+The SpiChannels have transfer intervals of 5 to 12 ms, such that they are not
+all due at the same time.
+
+- jitter: deviation of the time between two transfers of a SpiChannel from
+  its transfer_interval (median and p99 over all SpiChannels).
+- cpu: cpu time of the SpiClient process per second of wall-clock time.
+- missed: number of missed deadlines (see SpiClient.get_missed_deadlines()).
+
+Usage:
+    python3 spi_client_server/spi_scheduler_benchmark.py
+"""
+
+from time import perf_counter, process_time, sleep
+from typing import Callable, List, Optional, Tuple
+
+from bitarray import bitarray
+
+from spi_client_server.spi_client import SpiClient, SpiChannel
+from spi_client_server.spi_server import SpiServer
+from spi_client_server.spi_transport import SharedMemoryTransport
+from spi_elements.async_return import AsyncReturn
+from spi_elements.spi_element_base import SpiElementBase, SingleTransferOperationRequest
+from spi_master.virtual.virtual import Virtual
+from spi_operation import SingleTransferOperation
+
+
+class TimestampSpiElement(SpiElementBase):
+    """SpiElement, which records the time of every cycle."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.timestamps: List[float] = []
+        self._default_operation_request = SingleTransferOperationRequest(
+            operation=SingleTransferOperation(bitarray(88)), callback=None
+        )
+
+    def __next__(self) -> SingleTransferOperationRequest:
+        self.timestamps.append(perf_counter())
+        return super().__next__()
+
+    def _get_default_operation_request(self) -> SingleTransferOperationRequest:
+        return self._default_operation_request
+
+    def nop(self, callback: Optional[Callable[..., None]] = None) -> AsyncReturn:
+        return AsyncReturn(callback)
+
+
+def schedule(
+    channels: int, single_thread: bool, duration: float
+) -> Tuple[List[float], float, int]:
+    """Return the sorted jitters in seconds, the cpu time per second and the
+    number of missed deadlines."""
+    spi_elements = [TimestampSpiElement() for _ in range(channels)]
+    spi_channels = [
+        SpiChannel(spi_element, transfer_interval=0.005 + 0.001 * (cs % 8), cs=cs)
+        for cs, spi_element in enumerate(spi_elements)
+    ]
+    transport = SharedMemoryTransport()
+    server = SpiServer(Virtual(), transport)
+    client = SpiClient(server, spi_channels, single_thread=single_thread)
+
+    t, cpu = perf_counter(), process_time()
+    client.start_cyclic_spi_channel_transfer()
+    sleep(duration)
+    client.stop_cyclic_spi_channel_transfer()
+    t, cpu = perf_counter() - t, process_time() - cpu
+    missed = sum(client.get_missed_deadlines())
+
+    server.close()
+
+    jitters: List[float] = []
+    for spi_channel, spi_element in zip(spi_channels, spi_elements):
+        timestamps = spi_element.timestamps
+        jitters += (
+            abs(b - a - spi_channel.transfer_interval)
+            for a, b in zip(timestamps, timestamps[1:])
+        )
+    return sorted(jitters), cpu / t, missed
+
+
+if __name__ == "__main__":
+    print(
+        f"{'channels':>8} {'scheduler':<10} {'median [us]':>12} {'p99 [us]':>10} {'cpu [%]':>8} {'missed':>7}"
+    )
+    for channels in [1, 8, 32]:
+        for scheduler, single_thread in [("threads", False), ("single", True)]:
+            jitters, cpu, missed = schedule(channels, single_thread, 2.0)
+            median = jitters[len(jitters) // 2]
+            p99 = jitters[len(jitters) * 99 // 100]
+            print(
+                f"{channels:>8} {scheduler:<10} {median * 1e6:>12.1f} {p99 * 1e6:>10.1f} {cpu * 100:>8.1f} {missed:>7}"
+            )
@@ -1,22 +1,29 @@
 from spi_client_server.spi_driver_ipc import (
-    client_to_server_pipe,
-    server_to_client_pipe,
-    server_read_pipe_end,
-    server_write_pipe_end,
-    b64_server_ipc as ipc,
+    FRAME_FLAG_BATCH,
+    pack_server_batch_response,
     pack_server_response,
-    unpack_server_command,
+    unpack_batch,
+    unpack_frame,
 )
+from spi_client_server.spi_transport import SpiTransport, PipeTransport
 from spi_master.spi_master_base import SpiMasterBase
 
+from typing import Optional
 import multiprocessing
 import signal
 import os
 
 
 class SpiServer:
-    def __init__(self, spi_master: SpiMasterBase) -> None:
+    def __init__(
+        self, spi_master: SpiMasterBase, transport: Optional[SpiTransport] = None
+    ) -> None:
+        """:param spi_master: SpiMaster, which is used by the server process.
+        :param transport: SpiTransport to the SpiClient, PipeTransport if None.
+        It is closed by close().
+        """
         self._spi_master: SpiMasterBase = spi_master
+        self._transport: SpiTransport = transport or PipeTransport()
         self._subprocess = None
         return
 
@@ -25,7 +32,7 @@ class SpiServer:
 
     def __exit__(self, exc_type, exc_val, exc_tb) -> None:
         _, _, _ = exc_type, exc_val, exc_tb
-        return self.stop_server_process()
+        return self.close()
 
     def start_server_process(self):
         self._subprocess = multiprocessing.Process(target=self.setup)
@@ -41,30 +48,52 @@ class SpiServer:
             self._subprocess.join()
             self._subprocess = None
 
+    def close(self) -> None:
+        """Stop the server process and release the resources of the
+        SpiTransport (see SpiTransport.close()), which is owned by the
+        SpiServer, even if it was passed to __init__(). The SpiServer can not
+        be started again."""
+        self.stop_server_process()
+        self._transport.close()
+
     def server_process_running(self) -> bool:
-        if self._subprocess:
-            return True
-        else:
-            return False
+        """Returns True, if the server process is started and alive."""
+        return self._subprocess is not None and self._subprocess.is_alive()
+
+    def get_transport(self) -> SpiTransport:
+        return self._transport
 
     def setup(self):
-        with client_to_server_pipe:
-            with server_to_client_pipe:
-                with server_read_pipe_end:
-                    with server_write_pipe_end:
-                        self._spi_master.init()
-                        return self.run()
+        with self._transport.server_endpoint():
+            self._spi_master.init()
+            return self.run()
 
     def transfer(self, cs: int, buf: bytearray) -> bytearray:
         return self._spi_master.transfer(cs, buf)
 
     def run(self):
+        transport = self._transport
         try:
             while True:
-                ipc_read = ipc.read()
-                cs, spi_tx = unpack_server_command(ipc_read)
-                spi_rx = self._spi_master.transfer(cs, spi_tx)
-                ipc.write(pack_server_response(spi_rx))
+                header, spi_tx = unpack_frame(transport.server_read())
+                if header.flags & FRAME_FLAG_BATCH:
+                    self._run_batch(header.seq, spi_tx)
+                    continue
+                spi_rx = self._spi_master.transfer(header.cs, bytearray(spi_tx))
+                transport.server_write(
+                    *pack_server_response(spi_rx, header.cs, header.seq)
+                )
 
         except KeyboardInterrupt:
             print("SpiServer: SIGINT")
+        except EOFError:
+            print("SpiServer: SpiClient closed the transport")
+
+    def _run_batch(self, seq: int, batch: memoryview) -> None:
+        """Transfer the frames of a batch back-to-back and write their
+        responses as a single batch."""
+        responses = [
+            (header.cs, self._spi_master.transfer(header.cs, bytearray(spi_tx)))
+            for header, spi_tx in unpack_batch(batch)
+        ]
+        self._transport.server_write(*pack_server_batch_response(responses, seq))
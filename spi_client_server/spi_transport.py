@@ -0,0 +1,208 @@
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from typing import Callable, Iterator, Optional
+import os
+
+from spi_client_server.spi_driver_ipc import (
+    Buffer,
+    FramedStream,
+    create_fifos,
+    open_fifo,
+    client_to_server_path,
+    server_to_client_path,
+    client_to_server_pipe,
+    server_to_client_pipe,
+    client_read_pipe_end,
+    client_write_pipe_end,
+    server_read_pipe_end,
+    server_write_pipe_end,
+    b64_client_ipc,
+    b64_server_ipc,
+)
+from spi_client_server.shared_memory_ring import SharedMemoryRing
+
+
+class SpiTransport(ABC):
+    """Transport of the datagrams between the SpiClient and the SpiServer
+    process. Each direction has a single writer and a single reader.
+
+    A datagram is written as the concatenation of one or more buffers, such
+    that a transport may copy the parts of a datagram without joining them.
+    A datagram, which is read, is valid until the next read of the endpoint.
+    """
+
+    @abstractmethod
+    def open_client(self, server_running: Optional[Callable[[], bool]] = None) -> None:
+        """Open the client endpoint (SpiClient process).
+
+        :param server_running: returns False, if the SpiServer process
+        stopped, such that a transport waiting for the server endpoint gives
+        up, e.g. SpiServer.server_process_running().
+        """
+        pass
+
+    @abstractmethod
+    def close_client(self) -> None:
+        pass
+
+    @abstractmethod
+    @contextmanager
+    def server_endpoint(self) -> Iterator[None]:
+        """Context manager, which opens the server endpoint (SpiServer
+        process) and closes it on exit."""
+        pass
+
+    @abstractmethod
+    def client_write(self, *buffers: Buffer) -> None:
+        pass
+
+    @abstractmethod
+    def client_read(self) -> Buffer:
+        pass
+
+    @abstractmethod
+    def server_write(self, *buffers: Buffer) -> None:
+        pass
+
+    @abstractmethod
+    def server_read(self) -> Buffer:
+        pass
+
+    def close(self) -> None:
+        """Release the resources of the transport. Called by SpiServer.close(),
+        after the SpiServer process stopped. A closed transport can be closed
+        again."""
+        pass
+
+
+class PipeTransport(SpiTransport):
+    """Transport via the named pipes of spi_driver_ipc with binary framed
+    datagrams (FramedStream).
+
+    Platforms without os.writev() and os.readv() (Windows) fall back to the
+    base64 encoded datagrams of python_xp_named_pipe.
+    """
+
+    def __init__(self) -> None:
+        self._framed = hasattr(os, "writev") and hasattr(os, "readv")
+        self._client_ipc: Optional[FramedStream] = None
+        self._server_ipc: Optional[FramedStream] = None
+
+    def open_client(self, server_running: Optional[Callable[[], bool]] = None) -> None:
+        if not self._framed:
+            client_write_pipe_end.open()
+            client_read_pipe_end.open()
+            return
+
+        # Opened in the same order as by the server, such that the blocking
+        # opens of the named pipes do not deadlock.
+        write_fd = open_fifo(
+            client_to_server_path, os.O_WRONLY, server_running=server_running
+        )
+        try:
+            read_fd = open_fifo(
+                server_to_client_path, os.O_RDONLY, server_running=server_running
+            )
+        except BaseException:
+            os.close(write_fd)
+            raise
+        self._client_ipc = FramedStream(read_fd, write_fd)
+
+    def close_client(self) -> None:
+        if not self._framed:
+            client_write_pipe_end.close()
+            client_read_pipe_end.close()
+            return
+
+        if self._client_ipc is not None:
+            self._client_ipc.close()
+            self._client_ipc = None
+
+    @contextmanager
+    def server_endpoint(self) -> Iterator[None]:
+        if not self._framed:
+            with client_to_server_pipe:
+                with server_to_client_pipe:
+                    with server_read_pipe_end:
+                        with server_write_pipe_end:
+                            yield
+            return
+
+        # The named pipes are created (and removed) by the server, which opens
+        # them blocking, i.e. until the SpiClient opened the other end.
+        with create_fifos(client_to_server_path, server_to_client_path):
+            read_fd = os.open(client_to_server_path, os.O_RDONLY)
+            try:
+                write_fd = os.open(server_to_client_path, os.O_WRONLY)
+            except BaseException:
+                os.close(read_fd)
+                raise
+            self._server_ipc = FramedStream(read_fd, write_fd)
+            try:
+                yield
+            finally:
+                self._server_ipc.close()
+                self._server_ipc = None
+
+    def client_write(self, *buffers: Buffer) -> None:
+        if self._client_ipc is not None:
+            return self._client_ipc.write(*buffers)
+        b64_client_ipc.write(bytearray().join(buffers))
+
+    def client_read(self) -> Buffer:
+        if self._client_ipc is not None:
+            return self._client_ipc.read()
+        return b64_client_ipc.read()
+
+    def server_write(self, *buffers: Buffer) -> None:
+        if self._server_ipc is not None:
+            return self._server_ipc.write(*buffers)
+        b64_server_ipc.write(bytearray().join(buffers))
+
+    def server_read(self) -> Buffer:
+        if self._server_ipc is not None:
+            return self._server_ipc.read()
+        return b64_server_ipc.read()
+
+
+class SharedMemoryTransport(SpiTransport):
+    """Transport via a pair of SharedMemoryRing. The datagrams are copied into
+    the slots of the rings directly, neither encoded nor passed through the
+    kernel.
+
+    The rings are created by the constructor, therefore the transport must be
+    created before the SpiServer process is started.
+    """
+
+    def __init__(self, slots: int = 4, slot_size: int = 4096) -> None:
+        """:param slots: number of datagrams buffered per direction.
+        :param slot_size: maximum size of a datagram in bytes.
+        """
+        self._client_to_server = SharedMemoryRing(slots, slot_size)
+        self._server_to_client = SharedMemoryRing(slots, slot_size)
+
+    def open_client(self, server_running: Optional[Callable[[], bool]] = None) -> None:
+        pass
+
+    def close_client(self) -> None:
+        pass
+
+    @contextmanager
+    def server_endpoint(self) -> Iterator[None]:
+        yield
+
+    def client_write(self, *buffers: Buffer) -> None:
+        self._client_to_server.put(*buffers)
+
+    def client_read(self) -> Buffer:
+        return self._server_to_client.get()
+
+    def server_write(self, *buffers: Buffer) -> None:
+        self._server_to_client.put(*buffers)
+
+    def server_read(self) -> Buffer:
+        return self._client_to_server.get()
+
+    def close(self) -> None:
+        self._client_to_server.close()
+        self._server_to_client.close()
@@ -0,0 +1,65 @@
+"""Benchmark of the round trip latency between the SpiClient and the SpiServer
+process per SpiTransport: a command is written to the server, which transfers
+it with a Virtual SpiMaster and writes the response back.
+
+- PipeTransport: named pipes with binary framed datagrams.
+- SharedMemoryTransport: a pair of SharedMemoryRing.
+
+Usage:
+    python3 spi_client_server/spi_transport_benchmark.py
+"""
+
+from os import urandom
+from time import perf_counter
+from typing import Callable, List, Tuple
+
+from spi_client_server.spi_driver_ipc import pack_server_command, unpack_server_response
+from spi_client_server.spi_server import SpiServer
+from spi_client_server.spi_transport import (
+    SpiTransport,
+    PipeTransport,
+    SharedMemoryTransport,
+)
+from spi_master.virtual.virtual import Virtual
+
+
+def round_trips(transport: SpiTransport, tx: bytearray, number: int) -> List[float]:
+    """Return the sorted round trip times in seconds."""
+    times: List[float] = [0.0] * number
+    with SpiServer(Virtual(), transport):
+        transport.open_client()
+        try:
+            for _ in range(number // 10):  # warm up
+                transport.client_write(*pack_server_command(0, tx))
+                unpack_server_response(transport.client_read())
+
+            for i in range(number):
+                t = perf_counter()
+                transport.client_write(*pack_server_command(0, tx))
+                unpack_server_response(transport.client_read())
+                times[i] = perf_counter() - t
+        finally:
+            transport.close_client()
+    return sorted(times)
+
+
+if __name__ == "__main__":
+    # (name, frame length in bytes)
+    frames = [("Pss (11 B)", 11), ("1 KiB", 1024)]
+    transports: List[Tuple[str, Callable[[], SpiTransport]]] = [
+        ("pipe", PipeTransport),
+        ("shared memory", SharedMemoryTransport),
+    ]
+    number = 5_000
+
+    print(f"{'frame':<12} {'transport':<14} {'median [us]':>12} {'p99 [us]':>10}")
+    for name, nbytes in frames:
+        tx = bytearray(urandom(nbytes))
+        for transport_name, create_transport in transports:
+            transport = create_transport()
+            times = round_trips(transport, tx, number)
+            median = times[number // 2]
+            p99 = times[number * 99 // 100]
+            print(
+                f"{name:<12} {transport_name:<14} {median * 1e6:>12.1f} {p99 * 1e6:>10.1f}"
+            )
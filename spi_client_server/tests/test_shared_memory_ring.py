@@ -0,0 +1,91 @@
+import unittest
+import multiprocessing
+import threading
+
+from spi_client_server.shared_memory_ring import SharedMemoryRing
+
+
+def produce(ring: SharedMemoryRing, n: int) -> None:
+    for i in range(n):
+        ring.put(i.to_bytes(2, "big"))
+
+
+class TestSharedMemoryRing(unittest.TestCase):
+    def setUp(self):
+        self.ring = SharedMemoryRing(slots=4, slot_size=16)
+
+    def tearDown(self):
+        self.ring.close()
+
+    def test_put_get(self):
+        self.ring.put(bytearray(b"\x01\x02\x03"))
+        self.assertEqual(len(self.ring), 1)
+        self.assertEqual(self.ring.get(), bytearray(b"\x01\x02\x03"))
+        self.assertEqual(len(self.ring), 0)
+
+    def test_put_buffers_concatenated(self):
+        self.ring.put(b"\x01", bytearray(b"\x02\x03"), memoryview(b"\x04"))
+        self.assertEqual(self.ring.get(), bytearray(b"\x01\x02\x03\x04"))
+
+    def test_empty_datagram(self):
+        self.ring.put(b"")
+        self.assertEqual(self.ring.get(), bytearray())
+
+    def test_datagram_too_large(self):
+        with self.assertRaises(ValueError):
+            self.ring.put(bytes(17))
+        self.assertEqual(len(self.ring), 0)
+
+    def test_invalid_size(self):
+        with self.assertRaises(ValueError):
+            SharedMemoryRing(slots=0)
+
+    def test_order_wraparound(self):
+        for i in range(10):
+            self.ring.put(i.to_bytes(2, "big"))
+            self.ring.put((i + 100).to_bytes(2, "big"))
+            self.assertEqual(int.from_bytes(self.ring.get(), "big"), i)
+            self.assertEqual(int.from_bytes(self.ring.get(), "big"), i + 100)
+
+    def test_blocking_producer_and_consumer(self):
+        n = 100
+        received = []
+
+        def consume():
+            for _ in range(n):
+                received.append(int.from_bytes(self.ring.get(), "big"))
+
+        consumer = threading.Thread(target=consume)
+        consumer.start()
+        for i in range(n):
+            self.ring.put(i.to_bytes(2, "big"))
+        consumer.join(timeout=5)
+        self.assertFalse(consumer.is_alive())
+        self.assertEqual(received, list(range(n)))
+
+    def test_other_process(self):
+        n = 1000
+        producer = multiprocessing.Process(target=produce, args=(self.ring, n))
+        producer.start()
+        received = [int.from_bytes(self.ring.get(), "big") for _ in range(n)]
+        producer.join(timeout=10)
+        self.assertEqual(received, list(range(n)))
+
+    def test_close_wakes_consumer(self):
+        errors = []
+
+        def consume():
+            try:
+                self.ring.get()
+            except EOFError as e:
+                errors.append(e)
+
+        consumer = threading.Thread(target=consume)
+        consumer.start()
+        consumer.join(timeout=0.05)
+        self.ring.close()
+        consumer.join(timeout=5)
+        self.assertFalse(consumer.is_alive())
+        self.assertEqual(len(errors), 1)
+        with self.assertRaises(EOFError):
+            self.ring.put(b"")
@@ -2,14 +2,15 @@ import unittest
 import time
 
 from bitarray import bitarray
-from typing import Any, Callable, Optional
+from typing import Any, Callable, List, Optional
 
 from util import reverse_string
 from spi_client_server.spi_client import SpiClient, SpiChannel
 from spi_client_server.spi_server import SpiServer
+from spi_client_server.spi_transport import SharedMemoryTransport
 from spi_master.virtual.virtual import Virtual
 from spi_elements.spi_element_base import SpiElementBase, SingleTransferOperationRequest
-from spi_elements.async_return import AsyncReturn
+from spi_elements.async_return import AsyncReturn, wait_all
 from spi_operation import SingleTransferOperation
 
 
@@ -54,6 +55,13 @@ def myCallback(*args) -> None:
     return None
 
 
+def transfer_all_spi_channels(client: SpiClient) -> List[int]:
+    """Make all SpiChannels due and transfer them once."""
+    deadlines = client._spi_channels_deadline
+    deadlines[:] = [time.perf_counter()] * len(deadlines)
+    return client._transfer_due_spi_channels()
+
+
 class TestSpiClient(unittest.TestCase):
     def test_spi_client_init(self):
         server = SpiServer(Virtual())
@@ -68,8 +76,115 @@ class TestSpiClient(unittest.TestCase):
         client.start_cyclic_spi_channel_transfer()
         self.assertTrue(client._spi_channel_threads_run_flag)
         self.assertTrue(client._spi_channel_threads[0].is_alive())
-        time.sleep(0.5)
 
         client.stop_cyclic_spi_channel_transfer()
         self.assertFalse(client._spi_channel_threads_run_flag)
         self.assertFalse(client._spi_channel_threads[0].is_alive())
+
+    def test_spi_client_shared_memory_transport(self):
+        transport = SharedMemoryTransport()
+        server = SpiServer(Virtual(), transport)
+        spi_element = TestSpiElement()
+        spi_channels = [SpiChannel(spi_element, transfer_interval=0.01, cs=0)]
+
+        client = SpiClient(server, spi_channels)
+        self.assertIs(client._transport, transport)
+        ar = spi_element.nop()
+
+        client.start_cyclic_spi_channel_transfer()
+        self.assertEqual(ar.wait(timeout=10), 42)
+        client.stop_cyclic_spi_channel_transfer()
+
+        server.stop_server_process()
+        transport.close()
+
+    def test_spi_client_batch_backlog(self):
+        transport = SharedMemoryTransport()
+        server = SpiServer(Virtual(), transport)
+        first = TestSpiElement()
+        second = TestSpiElement()
+        spi_channels = [
+            SpiChannel(first, transfer_interval=60, cs=0, max_batch_frames=8),
+            SpiChannel(second, transfer_interval=60, cs=1),
+        ]
+
+        client = SpiClient(server, spi_channels)
+        first_ars = [first.nop() for _ in range(5)]
+        second_ars = [second.nop() for _ in range(2)]
+
+        # Both channels are due once: the backlog of the first channel is
+        # transferred in the same batch, the second channel transfers a
+        # single frame. The response to the last frame of a channel arrives
+        # with its next transfer.
+        self.assertEqual(transfer_all_spi_channels(client), [0, 1])
+        self.assertEqual([ar.is_finished() for ar in first_ars], [True] * 4 + [False])
+        self.assertEqual([ar.is_finished() for ar in second_ars], [False, False])
+
+        server.stop_server_process()
+        transport.close()
+
+    def test_spi_client_pipeline(self):
+        transport = SharedMemoryTransport()
+        server = SpiServer(Virtual(), transport)
+        spi_element = TestSpiElement()
+        spi_channels = [SpiChannel(spi_element, transfer_interval=0.01, cs=0)]
+
+        client = SpiClient(server, spi_channels, pipeline_window=4)
+        ars = [spi_element.nop() for _ in range(5)]
+
+        # The response to the fifth frame arrives with the sixth transfer.
+        for _ in range(6):
+            transfer_all_spi_channels(client)
+        self.assertTrue(client._pipeline.flush(timeout=10))
+        self.assertEqual(client._pipeline.get_in_flight(), 0)
+        self.assertTrue(all(ar.is_finished() for ar in ars))
+
+        server.stop_server_process()
+        transport.close()
+
+    def test_spi_client_single_thread(self):
+        transport = SharedMemoryTransport()
+        server = SpiServer(Virtual(), transport)
+        spi_elements = [TestSpiElement() for _ in range(8)]
+        spi_channels = [
+            SpiChannel(spi_element, transfer_interval=0.01 * (1 + cs % 3), cs=cs)
+            for cs, spi_element in enumerate(spi_elements)
+        ]
+
+        client = SpiClient(server, spi_channels, single_thread=True)
+        self.assertEqual(len(client._spi_channel_threads), 1)
+        ars = [spi_element.nop() for spi_element in spi_elements]
+
+        client.start_cyclic_spi_channel_transfer()
+        self.assertEqual(wait_all(ars, timeout=10), [42] * len(ars))
+        client.stop_cyclic_spi_channel_transfer()
+        self.assertFalse(client._spi_channel_threads[0].is_alive())
+
+        server.stop_server_process()
+        transport.close()
+
+    def test_spi_client_missed_deadlines(self):
+        transport = SharedMemoryTransport()
+        server = SpiServer(Virtual(), transport)
+        spi_channels = [
+            SpiChannel(TestSpiElement(), transfer_interval=1, cs=0),
+            SpiChannel(TestSpiElement(), transfer_interval=60, cs=1),
+            SpiChannel(TestSpiElement(), transfer_interval=60, cs=2),
+        ]
+
+        client = SpiClient(server, spi_channels, single_thread=True)
+        # The first SpiChannel is more than its transfer_interval late, the
+        # second one is late by less than its transfer_interval and the third
+        # one is not due.
+        now = time.perf_counter()
+        client._spi_channels_deadline[:] = [now - 5, now - 5, now + 60]
+        self.assertEqual(client._transfer_due_spi_channels(), [0, 1])
+        self.assertEqual(client.get_missed_deadlines(), [1, 0, 0])
+
+        deadlines = client._spi_channels_deadline
+        self.assertGreaterEqual(deadlines[0], now)  # restarted at the transfer
+        self.assertEqual(deadlines[1], now - 5 + 60)
+        self.assertEqual(deadlines[2], now + 60)
+
+        server.stop_server_process()
+        transport.close()
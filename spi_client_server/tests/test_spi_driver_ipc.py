@@ -0,0 +1,135 @@
+import unittest
+import os
+import tempfile
+
+from spi_client_server.spi_driver_ipc import (
+    FRAME_FLAG_BATCH,
+    FramedStream,
+    create_fifos,
+    open_fifo,
+    frame_header,
+    pack_frame_header,
+    unpack_frame,
+    pack_server_command,
+    unpack_server_command,
+    pack_server_response,
+    unpack_server_response,
+    pack_server_batch_command,
+    pack_server_batch_response,
+    unpack_batch,
+    unpack_server_batch_response,
+)
+
+
+class TestFraming(unittest.TestCase):
+    def test_pack_unpack_frame(self):
+        datagram = bytearray().join(
+            (pack_frame_header(3, cs=2, seq=7, flags=1), b"\x01\x02\x03")
+        )
+        self.assertEqual(len(datagram), frame_header.size + 3)
+        header, payload = unpack_frame(datagram)
+        self.assertEqual(
+            (header.length, header.seq, header.cs, header.flags), (3, 7, 2, 1)
+        )
+        self.assertEqual(bytes(payload), b"\x01\x02\x03")
+
+    def test_unpack_frame_invalid_length(self):
+        with self.assertRaises(ValueError):
+            unpack_frame(b"\x00")
+        with self.assertRaises(ValueError):
+            unpack_frame(pack_frame_header(3) + b"\x01")
+
+    def test_server_command(self):
+        cmd = bytearray().join(pack_server_command(5, bytearray(b"\xab\xcd")))
+        self.assertEqual(unpack_server_command(cmd), (5, bytearray(b"\xab\xcd")))
+
+    def test_server_response(self):
+        rsp = bytearray().join(pack_server_response(bytearray(b"\xab\xcd")))
+        self.assertEqual(bytes(unpack_server_response(rsp)), b"\xab\xcd")
+
+
+@unittest.skipUnless(hasattr(os, "writev"), "requires os.writev() and os.readv()")
+class TestFramedStream(unittest.TestCase):
+    def setUp(self):
+        read_fd, write_fd = os.pipe()
+        self.stream = FramedStream(read_fd, write_fd)
+
+    def tearDown(self):
+        self.stream.close()
+
+    def test_write_read(self):
+        for n in [0, 1, 11, 1000]:
+            payload = bytes(range(256)) * 4
+            self.stream.write(*pack_server_command(1, payload[:n], seq=n))
+            header, rx = unpack_frame(self.stream.read())
+            self.assertEqual((header.cs, header.seq), (1, n))
+            self.assertEqual(bytes(rx), payload[:n])
+
+
+class TestBatch(unittest.TestCase):
+    def test_pack_unpack_batch(self):
+        frames = [(1, b"\x01\x02"), (2, b""), (3, b"\x03")]
+        datagram = bytearray().join(pack_server_batch_command(frames, seq=4))
+        header, payload = unpack_frame(datagram)
+        self.assertTrue(header.flags & FRAME_FLAG_BATCH)
+        self.assertEqual(header.seq, 4)
+        self.assertEqual(
+            [(h.cs, bytes(p)) for h, p in unpack_batch(payload)],
+            frames,
+        )
+
+    def test_unpack_batch_invalid(self):
+        payload = memoryview(pack_frame_header(3, cs=1) + b"\x01")
+        with self.assertRaises(ValueError):
+            unpack_batch(payload)
+        with self.assertRaises(ValueError):
+            unpack_batch(memoryview(b"\x00"))
+
+    def test_server_batch_response(self):
+        frames = [(1, b"\x01\x02"), (2, b"\x03")]
+        rsp = bytearray().join(pack_server_batch_response(frames))
+        self.assertEqual(
+            [bytes(rx) for rx in unpack_server_batch_response(rsp)],
+            [b"\x01\x02", b"\x03"],
+        )
+
+    def test_server_batch_response_not_batch(self):
+        rsp = bytearray().join(pack_server_response(b"\x01"))
+        with self.assertRaises(ValueError):
+            unpack_server_batch_response(rsp)
+
+
+@unittest.skipUnless(hasattr(os, "mkfifo"), "requires os.mkfifo()")
+class TestOpenFifo(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.dir.name, "fifo")
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def test_create_fifos(self):
+        with open(self.path, "w"):  # stale file of a previous server
+            pass
+        with create_fifos(self.path):
+            self.assertTrue(os.path.exists(self.path))
+            read_fd = os.open(self.path, os.O_RDONLY | os.O_NONBLOCK)
+            write_fd = open_fifo(self.path, os.O_WRONLY, timeout=1.0)
+            os.set_blocking(read_fd, True)
+            os.write(write_fd, b"\x01")
+            self.assertEqual(os.read(read_fd, 1), b"\x01")
+            os.close(read_fd)
+            os.close(write_fd)
+        self.assertFalse(os.path.exists(self.path))
+
+    def test_timeout(self):
+        with self.assertRaises(TimeoutError):
+            open_fifo(self.path, os.O_RDONLY, timeout=0.01)
+        with create_fifos(self.path):
+            # Not opened for reading by the server.
+            with self.assertRaises(TimeoutError):
+                open_fifo(self.path, os.O_WRONLY, timeout=0.01)
+
+    def test_server_stopped(self):
+        with self.assertRaises(RuntimeError):
+            open_fifo(self.path, os.O_WRONLY, server_running=lambda: False)
@@ -0,0 +1,161 @@
+import unittest
+import threading
+
+from util import bytes_to_bitarray
+from spi_client_server.spi_driver_ipc import pack_server_response
+from spi_client_server.spi_pipeline import SpiPipeline
+from spi_client_server.spi_server import SpiServer
+from spi_client_server.spi_transport import SharedMemoryTransport
+from spi_master.virtual.virtual import Virtual
+
+
+def echo(cs: int, buf: bytearray) -> bytearray:
+    return bytearray([cs]) + buf[1:]
+
+
+class TestSpiPipelineInit(unittest.TestCase):
+    def test_invalid_window(self):
+        transport = SharedMemoryTransport()
+        with self.assertRaises(ValueError):
+            SpiPipeline(transport, window=0)
+        transport.close()
+
+
+class TestSpiPipeline(unittest.TestCase):
+    def setUp(self):
+        self.transport = SharedMemoryTransport(slots=16)
+        self.server = SpiServer(Virtual(transfer_func=echo), self.transport)
+        self.server.start_server_process()
+        self.transport.open_client()
+
+    def tearDown(self):
+        self.server.stop_server_process()
+        self.transport.close_client()
+        self.transport.close()
+
+    def frame(self, n: int):
+        return bytes_to_bitarray(bytearray([0, n]))
+
+    def test_order_per_cs(self):
+        pipeline = SpiPipeline(self.transport, window=4)
+        pipeline.start()
+        responses = []
+        for n in range(50):
+            pipeline.transfer(
+                [(n % 3, self.frame(n))], lambda rxs: responses.extend(rxs)
+            )
+        self.assertTrue(pipeline.flush(timeout=5))
+        self.assertEqual(pipeline.get_in_flight(), 0)
+        self.assertEqual(
+            responses,
+            [bytes_to_bitarray(bytearray([n % 3, n])) for n in range(50)],
+        )
+
+    def test_batch(self):
+        pipeline = SpiPipeline(self.transport, window=2)
+        pipeline.start()
+        responses = []
+        pipeline.transfer(
+            [(1, self.frame(1)), (2, self.frame(2))], lambda rxs: responses.append(rxs)
+        )
+        self.assertTrue(pipeline.flush(timeout=5))
+        self.assertEqual(
+            responses,
+            [
+                [
+                    bytes_to_bitarray(bytearray([1, 1])),
+                    bytes_to_bitarray(bytearray([2, 2])),
+                ]
+            ],
+        )
+
+    def test_window_bounded(self):
+        pipeline = SpiPipeline(self.transport, window=2)
+        pipeline.start()
+        release = threading.Event()
+        in_flight = []
+
+        def blocking_callback(rxs):
+            release.wait()
+
+        for n in range(2):
+            pipeline.transfer([(0, self.frame(n))], blocking_callback)
+        third = threading.Thread(
+            target=pipeline.transfer, args=([(0, self.frame(2))], in_flight.append)
+        )
+        third.start()
+        third.join(timeout=0.2)
+        self.assertTrue(third.is_alive())
+
+        release.set()
+        third.join(timeout=5)
+        self.assertFalse(third.is_alive())
+        self.assertTrue(pipeline.flush(timeout=5))
+        self.assertEqual(len(in_flight), 1)
+
+    def test_callback_error(self):
+        pipeline = SpiPipeline(self.transport, window=2)
+        pipeline.start()
+        responses = []
+
+        def failing_callback(rxs):
+            raise ValueError("callback failed")
+
+        pipeline.transfer([(0, self.frame(0))], failing_callback)
+        pipeline.transfer([(0, self.frame(1))], responses.extend)
+        with self.assertRaises(RuntimeError) as cm:
+            pipeline.flush(timeout=5)
+        self.assertIsInstance(cm.exception.__cause__, ValueError)
+
+        # The reader thread continues and the error is raised once.
+        self.assertEqual(responses, [bytes_to_bitarray(bytearray([0, 1]))])
+        pipeline.transfer([(0, self.frame(2))], responses.extend)
+        self.assertTrue(pipeline.flush(timeout=5))
+        self.assertEqual(len(responses), 2)
+
+
+class TestSpiPipelineFailure(unittest.TestCase):
+    """The test acts as the SpiServer on the server endpoint of the transport."""
+
+    def setUp(self):
+        self.transport = SharedMemoryTransport(slots=4)
+        self.pipeline = SpiPipeline(self.transport, window=1)
+        self.pipeline.start()
+
+    def tearDown(self):
+        self.transport.close()
+
+    def start_blocked_transfer(self):
+        blocked = []
+
+        def transfer():
+            try:
+                self.pipeline.transfer([(0, bytes_to_bitarray(b"\x01"))], print)
+            except RuntimeError as e:
+                blocked.append(e)
+
+        # The window is full, the transfer waits until the pipeline fails.
+        self.pipeline.transfer([(0, bytes_to_bitarray(b"\x00"))], print)
+        thread = threading.Thread(target=transfer)
+        thread.start()
+        return thread, blocked
+
+    def test_unknown_seq(self):
+        thread, blocked = self.start_blocked_transfer()
+        self.transport.server_write(*pack_server_response(b"\x00", seq=42))
+        thread.join(timeout=5)
+        self.assertFalse(thread.is_alive())
+        self.assertEqual(len(blocked), 1)
+        with self.assertRaises(RuntimeError):
+            self.pipeline.flush(timeout=5)
+        with self.assertRaises(RuntimeError):
+            self.pipeline.transfer([(0, bytes_to_bitarray(b"\x02"))], print)
+
+    def test_malformed_response(self):
+        thread, blocked = self.start_blocked_transfer()
+        self.transport.server_write(b"\x00")
+        thread.join(timeout=5)
+        self.assertFalse(thread.is_alive())
+        self.assertEqual(len(blocked), 1)
+        with self.assertRaises(RuntimeError):
+            self.pipeline.flush(timeout=5)
@@ -1,7 +1,13 @@
-from async_return import AsyncReturn
-from spi_operation_request_iterator import (
+from spi_elements.async_return import AsyncReturn, gather, wait_all
+from spi_elements.spi_operation_request_iterator import (
     SpiOperationRequestIteratorBase,
     SingleTransferOperationRequest,
+    OperationPriority,
+    CycleMark,
 )
-from spi_element_base import SpiElementBase
-from aggregate_operation_request_iterator import AggregateOperationRequestIterator
+from spi_elements.spi_element_base import SpiElementBase
+from spi_elements.aggregate_operation_request_iterator import (
+    AggregateOperationRequestIterator,
+)
+from spi_elements.transfer_plan import TransferPlan, TransferPlanRequest
+from spi_elements.request_fifo import FifoFullError, FifoPolicy, RequestFifoStats
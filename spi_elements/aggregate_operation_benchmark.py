@@ -0,0 +1,64 @@
+"""Benchmark of the cycle of an AggregateOperationRequestIterator over daisy
+chains of 3 to 256 SpiElements.
+
+The chain repeats the layout of a Pss: an Ad5672 (24 bit) followed by two
+Ads866x (32 bit each). A cycle is processed like SpiClient processes it: the
+aggregate operation request is taken from the chain, its response is set and
+its callback splits the response into the responses of the SpiElements.
+
+- next: construction of the aggregate operation request.
+- split: parsing of the response of the aggregate operation.
+- cycle: both of the above and the callback of the SpiElements.
+
+Usage:
+    python3 spi_elements/aggregate_operation_benchmark.py
+"""
+
+from timeit import repeat
+from typing import Callable, Optional
+
+from util import uint_to_bitarray
+from spi_elements.async_return import AsyncReturn
+from spi_elements.aggregate_operation_request_iterator import (
+    AggregateOperationRequestIterator,
+)
+from device_implementation.dac.ad5672 import Ad5672
+from device_implementation.adc.ads866x import Ads866x
+
+
+class Chain(AggregateOperationRequestIterator):
+    def __init__(self, n: int) -> None:
+        super().__init__([Ad5672() if i % 3 == 0 else Ads866x() for i in range(n)])
+
+    def nop(self, callback: Optional[Callable[..., None]] = None) -> AsyncReturn:
+        return AsyncReturn(callback)
+
+
+def best_of(stmt, number: int) -> float:
+    """Return the best time per call in seconds."""
+    return min(repeat(stmt, number=number, repeat=9)) / number
+
+
+def benchmark_chain(n: int) -> None:
+    chain = Chain(n)
+    op_req = next(chain)
+    operation = op_req.operation
+    response = uint_to_bitarray(0, operation.get_bitlength())
+    operation.set_response(response)
+    number = max(20_000 // n, 100)
+
+    def cycle() -> None:
+        op_req = next(chain)
+        op_req.operation.set_response(response)
+        op_req.callback(op_req.operation.get_parsed_response())
+
+    t_next = best_of(lambda: next(chain), number)
+    t_split = best_of(operation.get_parsed_response, number)
+    t_cycle = best_of(cycle, number)
+    print(f"{n:>8} {t_next * 1e6:>10.2f} {t_split * 1e6:>10.2f} {t_cycle * 1e6:>10.2f}")
+
+
+if __name__ == "__main__":
+    print(f"{'elements':>8} {'next [us]':>10} {'split [us]':>10} {'cycle [us]':>10}")
+    for n in [3, 8, 32, 128, 256]:
+        benchmark_chain(n)
@@ -1,8 +1,11 @@
-from typing import Any, List, Sequence
+from contextlib import ExitStack, contextmanager
+from typing import Any, Iterator, List, Optional, Sequence, Tuple
 from bitarray import bitarray
-from itertools import accumulate
 
+from util import FrameLayout
 from spi_operation import SingleTransferOperation
+from spi_elements.async_return import fail_callback
+from spi_elements.request_fifo import RequestFifo
 from spi_elements.spi_operation_request_iterator import (
     SpiOperationRequestIteratorBase,
     SingleTransferOperationRequest,
@@ -17,17 +20,39 @@ from spi_elements.spi_operation_request_iterator import (
 
 
 class AggregateOperation(SingleTransferOperation):
-    def __init__(self, ops: List[SingleTransferOperation]) -> None:
+    def __init__(
+        self,
+        ops: List[SingleTransferOperation],
+        layout: Optional[FrameLayout] = None,
+        response_required: bool = True,
+    ) -> None:
+        """Aggregate the operations into a single transfer ([0] == LSB).
+
+        :param ops: operations of the SpiElements of the daisy chain.
+        :param layout: FrameLayout of the bitlengths of 'ops', which is computed
+        from 'ops' if not given. A ValueError is raised, if an operation does
+        not match its field of the layout.
+        :param response_required: False, if none of 'ops' takes a response.
+        """
+        if layout is None:
+            layout = FrameLayout([op.get_bitlength() for op in ops])
         self._ops = ops
-        cmd = sum([op.get_command() for op in ops], bitarray())
-        super().__init__(cmd)
+        self._layout = layout
+        cmd = layout.assemble(*[op.get_command() for op in ops])
+        super().__init__(cmd, response_required=response_required)
+
+    def get_layout(self) -> FrameLayout:
+        return self._layout
 
     def _parse_response(self, rsp: bitarray) -> Any:
-        bitlens = [op.get_bitlength() for op in self._ops]
-        offsets = list(accumulate(bitlens, initial=0))
-        return tuple(
-            rsp[offset : offset + bitlen] for offset, bitlen in zip(offsets, bitlens)
-        )
+        """Split the response into the responses of the operations by the
+        precomputed slices of the layout.
+
+        The responses are copies: zero-copy views (bitarray(buffer=...)) of
+        byte aligned fields are slower to create than slices of the small
+        fields of a daisy chain and would prevent resizing of 'rsp'.
+        """
+        return tuple(map(rsp.__getitem__, self._layout.get_slices()))
 
 
 class AggregateOperationRequestIterator(SpiOperationRequestIteratorBase):
@@ -35,11 +60,98 @@ class AggregateOperationRequestIterator(SpiOperationRequestIteratorBase):
         self, operation_request_iterators: Sequence[SpiOperationRequestIteratorBase]
     ) -> None:
         self._operation_request_iterators = operation_request_iterators
+        self._layout: Optional[FrameLayout] = None
+        self._idle_operation_request: Optional[SingleTransferOperationRequest] = None
+        self._idle_operation_request_created = False
+        # Idle cycles, which are not counted by the aggregated iterators yet.
+        self._idle_cycles = 0
 
     def __next__(self) -> SingleTransferOperationRequest:
         return self._get_default_operation_request()
 
+    @contextmanager
+    def _batch(self, puts: List[Tuple[RequestFifo, List[Any]]]) -> Iterator[None]:
+        """Collect the batches of all aggregated iterators, such that the
+        transaction() puts the operation requests of the calling thread into
+        the fifos of all SpiElements at once, or into none of them."""
+        with ExitStack() as stack:
+            for op_req_it in self._operation_request_iterators:
+                stack.enter_context(op_req_it._batch(puts))
+            yield
+
+    def has_pending_operation_request(self) -> bool:
+        """Returns True, if any aggregated iterator may return another
+        operation request than its default operation request."""
+        for op_req_it in self._operation_request_iterators:
+            if op_req_it.has_pending_operation_request():
+                return True
+        return False
+
+    def _count_idle_cycles(self, cycles: int) -> None:
+        self._idle_cycles += cycles
+
+    def _get_idle_operation_request(self) -> Optional[SingleTransferOperationRequest]:
+        """Get the operation request of an idle cycle, i.e. of a cycle in which
+        all aggregated iterators return their default operation request.
+
+        If the idle operation requests of all aggregated iterators are
+        constant, the aggregated idle operation request is created once and
+        returned for every idle cycle. It neither takes a response nor has a
+        callback, therefore an idle cycle does not create any objects.
+        """
+        if not self._idle_operation_request_created:
+            op_reqs = [
+                op_req_it._get_idle_operation_request()
+                for op_req_it in self._operation_request_iterators
+            ]
+            if all(op_req is not None for op_req in op_reqs):
+                self._idle_operation_request = SingleTransferOperationRequest(
+                    operation=AggregateOperation(
+                        [op_req.operation for op_req in op_reqs],
+                        self.get_layout(),
+                        response_required=False,
+                    ),
+                )
+            self._idle_operation_request_created = True
+        return self._idle_operation_request
+
+    def get_layout(self) -> FrameLayout:
+        """Returns the FrameLayout of the daisy chain, i.e. the bitlength of
+        the operations of every aggregated iterator ([0] == LSB).
+
+        The layout of a daisy chain never changes, therefore it is computed
+        once from the default operation requests of the aggregated iterators
+        and every aggregated operation must match it.
+        """
+        if self._layout is None:
+            self._layout = FrameLayout(
+                [
+                    self._get_bitlength(op_req_it)
+                    for op_req_it in self._operation_request_iterators
+                ]
+            )
+        return self._layout
+
+    @staticmethod
+    def _get_bitlength(op_req_it: SpiOperationRequestIteratorBase) -> int:
+        # The default operation request of an aggregate takes the operation
+        # requests of its aggregated iterators, therefore its layout is used.
+        if isinstance(op_req_it, AggregateOperationRequestIterator):
+            return op_req_it.get_layout().get_bitlength()
+        return op_req_it._get_default_operation_request().operation.get_bitlength()
+
     def _get_default_operation_request(self) -> SingleTransferOperationRequest:
+        idle_op_req = self._get_idle_operation_request()
+        if idle_op_req is not None and not self.has_pending_operation_request():
+            self._idle_cycles += 1
+            return idle_op_req
+
+        if self._idle_cycles:
+            for op_req_it in self._operation_request_iterators:
+                op_req_it._count_idle_cycles(self._idle_cycles)
+            self._idle_cycles = 0
+
+        layout = self._layout or self.get_layout()
         operation_requests = [
             next(op_req_it) for op_req_it in self._operation_request_iterators
         ]
@@ -52,9 +164,17 @@ class AggregateOperationRequestIterator(SpiOperationRequestIteratorBase):
                     op_req.callback(op_req.operation.get_parsed_response())
             return None
 
+        try:
+            operation = AggregateOperation(
+                [op_req.operation for op_req in operation_requests], layout
+            )
+        except ValueError as exception:
+            # The operation requests are popped already and never transferred.
+            for op_req in operation_requests:
+                fail_callback(op_req.callback, exception)
+            raise
+
         return SingleTransferOperationRequest(
-            operation=AggregateOperation(
-                [op_req.operation for op_req in operation_requests]
-            ),
+            operation=operation,
             callback=process_sub_operation_requests,
         )
@@ -1,47 +1,339 @@
-from typing import Any, Callable, Optional
+from __future__ import annotations
+
+from typing import (
+    Any,
+    Callable,
+    Generator,
+    Iterable,
+    List,
+    Optional,
+    Protocol,
+    Tuple,
+    runtime_checkable,
+)
+import asyncio
+import concurrent.futures
 import threading
+import time
+
+# Protects the lazily created event and the done callbacks of all
+# AsyncReturns. The critical sections are a few instructions only, therefore a
+# single lock is shared instead of allocating a lock per AsyncReturn.
+_lock = threading.Lock()
+
+
+def _call_soon_threadsafe(
+    loop: asyncio.AbstractEventLoop, callback: Callable[..., None], *args: Any
+) -> None:
+    """Schedule the callback on the event loop, unless the loop is closed, in
+    which case nobody is awaiting the result anymore. Called by the thread
+    resolving the AsyncReturn, which must not fail because of a closed loop."""
+    try:
+        loop.call_soon_threadsafe(callback, *args)
+    except RuntimeError:
+        pass
 
 
 class AsyncReturn:
+    """Result of a request to a SpiElement, which is resolved by the thread
+    processing the operation requests (e.g. the SpiClient).
+
+    The result can be waited for by a blocking wait(), awaited in a coroutine
+    (resolved on the event loop of the awaiting coroutine) or converted into a
+    concurrent.futures.Future with to_future().
+
+    An AsyncReturn is created for almost every request, but most of them are
+    never waited for. Therefore it only consists of its slots: the
+    threading.Event is created by the first wait() and the list of done
+    callbacks by the first add_done_callback().
+
+    An AsyncReturn, whose operation request is never processed (e.g. dropped
+    by FifoPolicy.DROP_OLDEST), is failed with an exception instead of its
+    result. The exception is raised by wait(), get_result() and await, and set
+    on the Future of to_future().
+    """
+
+    __slots__ = (
+        "_callback",
+        "_result",
+        "_exception",
+        "_finished",
+        "_event",
+        "_done_callbacks",
+    )
+
     def __init__(self, ext_callback: Optional[Callable[..., None]] = None) -> None:
         self._callback = ext_callback
-        self._callback_finished = threading.Event()
-        self._result = None
-
-    def _wrap_callback(
-        self, callback: Optional[Callable[..., None]]
-    ) -> Callable[..., None]:
-        def wrapper(*args) -> None:
-            if len(args) == 1:
-                self._result = args[0]
-            else:
-                self._result = args
-            if callback:
-                _ = callback(*args)
-            self._callback_finished.set()
-            return None
+        self._result: Any = None
+        self._exception: Optional[BaseException] = None
+        self._finished = False
+        self._event: Optional[threading.Event] = None
+        self._done_callbacks: Optional[List[Callable[[AsyncReturn], None]]] = None
+
+    def _resolve(self, *args) -> None:
+        if self._exception is not None:  # failed before, see fail()
+            return
+        if len(args) == 1:
+            self._result = args[0]
+        else:
+            self._result = args
+        if self._callback:
+            _ = self._callback(*args)
+        self._finish()
+
+    def fail(self, exception: BaseException) -> None:
+        """Finish the AsyncReturn with 'exception' instead of a result, e.g.
+        if its operation request is dropped. The callback passed to __init__()
+        is not called, as there is no response, but failed (see
+        fail_callback()), such that an AsyncReturn resolved by it fails too."""
+        if self._finished:
+            return
+        self._exception = exception
+        self._finish()
+        fail_callback(self._callback, exception)
+
+    # The AsyncReturn is the callback of its operation request itself, see
+    # get_callback(). It therefore is a FailableCallback without allocating a
+    # callback object per request.
+    __call__ = _resolve
 
-        return wrapper
+    def _finish(self) -> None:
+        with _lock:
+            self._finished = True
+            event, done_callbacks = self._event, self._done_callbacks
+            self._done_callbacks = None
+        if event is not None:
+            event.set()
+        if done_callbacks is not None:
+            for done_callback in done_callbacks:
+                done_callback(self)
 
-    def wait(self) -> Any:
-        self._callback_finished.wait()
-        return self._result
+    def add_done_callback(self, fn: Callable[[AsyncReturn], None]) -> None:
+        """Call 'fn' with this AsyncReturn, when the result is available.
 
-    def get_callback(self) -> Callable[..., None]:
-        return self._wrap_callback(self._callback)
+        'fn' is called by the thread resolving the AsyncReturn, or immediately
+        by the calling thread, if the result is already available. It must not
+        block, because it delays the processing of operation requests.
+        """
+        with _lock:
+            if not self._finished:
+                if self._done_callbacks is None:
+                    self._done_callbacks = [fn]
+                else:
+                    self._done_callbacks.append(fn)
+                return
+        fn(self)
+
+    def wait(self, timeout: Optional[float] = None) -> Any:
+        """Block until the result is available and return it.
+
+        :param timeout: in seconds, None to wait forever.
+        :raises TimeoutError: if the result is not available after 'timeout'.
+        :raises Exception: the exception, with which the AsyncReturn failed.
+        """
+        if self._finished:
+            return self.get_result()
+
+        with _lock:
+            event = self._event
+            if event is None and not self._finished:
+                event = self._event = threading.Event()
+        if event is not None and not event.wait(timeout):
+            raise TimeoutError(f"AsyncReturn: Result not available after {timeout=}")
+        return self.get_result()
+
+    def get_callback(self) -> AsyncReturn:
+        """Return the callback of the operation request, which resolves the
+        AsyncReturn with the response (after calling the callback passed to
+        __init__()). The callback is the AsyncReturn itself, a
+        FailableCallback, which fails the AsyncReturn in fail_callback()."""
+        return self
 
     def is_finished(self) -> bool:
-        return self._callback_finished.is_set()
+        return self._finished
+
+    def get_exception(self) -> Optional[BaseException]:
+        """Returns the exception, with which the AsyncReturn failed, or None."""
+        return self._exception
 
     def get_result(self) -> Any:
         if self.is_finished():
+            if self._exception is not None:
+                raise self._exception
             return self._result
         else:
             raise RuntimeError("AsyncReturn: Result not available yet.")
 
     def get_result_after_wait(self) -> Any:
-        self.wait()
-        return self._result
+        return self.wait()
+
+    def to_future(self) -> concurrent.futures.Future:
+        """Return a concurrent.futures.Future, which is resolved with the
+        result of this AsyncReturn."""
+        future: concurrent.futures.Future = concurrent.futures.Future()
+        future.set_running_or_notify_cancel()
+
+        def set_result(ar: AsyncReturn) -> None:
+            if ar._exception is not None:
+                future.set_exception(ar._exception)
+            else:
+                future.set_result(ar._result)
+
+        self.add_done_callback(set_result)
+        return future
+
+    def __await__(self) -> Generator[Any, None, Any]:
+        """Await the result in a coroutine without blocking the event loop.
+        The awaiting task is resumed on its event loop by
+        loop.call_soon_threadsafe()."""
+        if self.is_finished():
+            return self.get_result()
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+
+        def set_result(ar: AsyncReturn) -> None:
+            if future.done():  # e.g. cancelled awaiting task
+                return
+            if ar._exception is not None:
+                future.set_exception(ar._exception)
+            else:
+                future.set_result(ar._result)
+
+        self.add_done_callback(lambda ar: _call_soon_threadsafe(loop, set_result, ar))
+        return (yield from future.__await__())
 
     def __repr__(self) -> str:
-        return f"AsyncReturn(is_finished={self._callback_finished.is_set()}, result={self._result}, callback={self._callback})"
+        return f"AsyncReturn(is_finished={self._finished}, result={self._result}, exception={self._exception!r}, callback={self._callback})"
+
+
+@runtime_checkable
+class FailableCallback(Protocol):
+    """Callback of an operation request, which is failed by fail_callback(),
+    if the operation request is never processed, e.g. an AsyncReturn (see
+    AsyncReturn.get_callback()) or a ChainedCallback."""
+
+    def __call__(self, *args: Any) -> Any: ...
+
+    def fail(self, exception: BaseException) -> None: ...
+
+
+class ChainedCallback:
+    """FailableCallback, which calls 'callback' with the response and 'fail'
+    with the exception, if its operation request is never processed. Used by
+    requests, whose AsyncReturn is resolved by a function of the responses of
+    several operation requests."""
+
+    __slots__ = ("_callback", "_fail")
+
+    def __init__(
+        self, callback: Callable[..., None], fail: Callable[[BaseException], None]
+    ) -> None:
+        self._callback = callback
+        self._fail = fail
+
+    def __call__(self, *args: Any) -> None:
+        self._callback(*args)
+
+    def fail(self, exception: BaseException) -> None:
+        self._fail(exception)
+
+
+def fail_callback(
+    callback: Optional[Callable[..., None]], exception: BaseException
+) -> None:
+    """Fail the AsyncReturn(s) resolved by the callback of an operation
+    request, which is never processed.
+
+    The callback is failed, if it is a FailableCallback. Other callbacks, e.g.
+    of fire-and-forget requests, are not called.
+    """
+    if isinstance(callback, FailableCallback):
+        callback.fail(exception)
+
+
+def create_async_return(
+    callback: Optional[Callable[..., None]] = None, fire_and_forget: bool = False
+) -> Tuple[Optional[AsyncReturn], Optional[Callable[..., None]]]:
+    """Create the AsyncReturn of a request and the callback of its operation
+    request.
+
+    :param callback: called with the response of the request.
+    :param fire_and_forget: if True, no AsyncReturn is created. The request
+    returns None and the operation request calls 'callback' directly (or
+    nothing, if it is None).
+    :return: tuple of the AsyncReturn (or None) and the callback for the
+    operation request.
+    """
+    if fire_and_forget:
+        return None, callback
+    ar = AsyncReturn(callback)
+    return ar, ar
+
+
+def wait_all(
+    async_returns: Iterable[AsyncReturn], timeout: Optional[float] = None
+) -> List[Any]:
+    """Block until all AsyncReturns are resolved and return their results in
+    order.
+
+    :param timeout: in seconds for all AsyncReturns, None to wait forever.
+    :raises TimeoutError: if not all results are available after 'timeout'.
+    :raises Exception: the exception of the first failed AsyncReturn.
+    """
+    async_returns = list(async_returns)
+    if timeout is None:
+        return [ar.wait() for ar in async_returns]
+
+    deadline = time.monotonic() + timeout
+    results = []
+    for ar in async_returns:
+        try:
+            results.append(ar.wait(max(deadline - time.monotonic(), 0)))
+        except TimeoutError:
+            raise TimeoutError(
+                f"AsyncReturn: {len(async_returns) - len(results)} of {len(async_returns)} results not available after {timeout=}"
+            ) from None
+    return results
+
+
+async def gather(
+    *async_returns: AsyncReturn, timeout: Optional[float] = None
+) -> List[Any]:
+    """Await all AsyncReturns and return their results in order. Like
+    asyncio.gather(), but the AsyncReturns do not need to be wrapped into
+    tasks.
+
+    :param timeout: in seconds for all AsyncReturns, None to wait forever.
+    :raises TimeoutError: if not all results are available after 'timeout'.
+    :raises Exception: the exception of the first failed AsyncReturn.
+    """
+    loop = asyncio.get_running_loop()
+    future = loop.create_future()
+    results: List[Any] = [None] * len(async_returns)
+    pending = len(async_returns)
+
+    def set_result(i: int, ar: AsyncReturn) -> None:
+        nonlocal pending
+        if future.done():
+            return
+        if ar._exception is not None:
+            return future.set_exception(ar._exception)
+        results[i] = ar._result
+        pending -= 1
+        if pending == 0:
+            future.set_result(results)
+
+    if not pending:
+        return results
+    for i, ar in enumerate(async_returns):
+        ar.add_done_callback(
+            lambda ar, i=i: _call_soon_threadsafe(loop, set_result, i, ar)
+        )
+
+    try:
+        return await asyncio.wait_for(future, timeout)
+    except asyncio.TimeoutError:
+        raise TimeoutError(
+            f"AsyncReturn: {pending} of {len(async_returns)} results not available after {timeout=}"
+        ) from None
@@ -0,0 +1,109 @@
+"""Benchmark of the AsyncReturn per enqueued operation request.
+
+- AsyncReturn: creation of an AsyncReturn and its callback, which is called
+  once (as by the SpiClient), without anybody waiting for the result.
+- Ad5672.write / Ads866x.read: request, which is taken from the fifo and whose
+  callback is called (as by the SpiClient).
+- fire_and_forget: the same requests, for which no AsyncReturn is created.
+- Pss.write_config: 8 writes and a load_all_channels of the conf dac.
+
+The allocations are measured with tracemalloc: the peak of bytes allocated
+during a call.
+
+Usage:
+    python3 spi_elements/async_return_benchmark.py
+"""
+
+from statistics import median
+from timeit import repeat
+from typing import Any, Callable, List, Tuple
+import tracemalloc
+
+from util import uint_to_bitarray
+from spi_elements.async_return import AsyncReturn
+from spi_elements.spi_element_base import SpiElementBase
+from device_implementation.dac.ad5672 import Ad5672
+from device_implementation.adc.ads866x import Ads866x
+from device_implementation.pss.pss import Pss, PssTrackingMode
+
+
+def best_of(stmt, number: int) -> float:
+    """Return the best time per call in seconds."""
+    return min(repeat(stmt, number=number, repeat=9)) / number
+
+
+def peak_bytes(func: Callable[[], Any], number: int) -> float:
+    """Return the median peak bytes allocated during a call."""
+    peaks: List[int] = [0] * number
+    func()
+
+    tracemalloc.start()
+    for i in range(number):
+        before, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+        peaks[i] = peak - before
+    tracemalloc.stop()
+    return median(peaks)
+
+
+def drain(spi_element: SpiElementBase) -> None:
+    while spi_element.has_pending_operation_request():
+        op_req = next(spi_element)
+        operation = op_req.operation
+        if operation.get_response_required():
+            operation.set_response(uint_to_bitarray(0, len(operation.get_command())))
+        if op_req.callback:
+            op_req.callback(op_req.operation.get_parsed_response())
+
+
+def workloads() -> List[Tuple[str, Callable[[], Any]]]:
+    dac = Ad5672()
+    adc = Ads866x()
+    pss = Pss()
+
+    def async_return() -> None:
+        AsyncReturn().get_callback()(None)
+
+    def dac_write(**kwargs) -> None:
+        dac.write(addr=1, voltage=1.0, **kwargs)
+        drain(dac)
+
+    def adc_read(**kwargs) -> None:
+        adc.read(**kwargs)
+        drain(adc)
+
+    def pss_write_config() -> None:
+        pss.write_config(
+            tracking_mode=PssTrackingMode.voltage,
+            target_voltage=2.5,
+            target_current=1.0,
+            lower_voltage_limit=0.5,
+            upper_voltage_limit=4.5,
+            lower_current_limit=-10.0,
+            upper_current_limit=10.0,
+        )
+        drain(pss.get_conf_dac())
+
+    return [
+        ("AsyncReturn", async_return),
+        ("Ad5672.write", dac_write),
+        ("  fire_and_forget", lambda: dac_write(fire_and_forget=True)),
+        ("Ads866x.read", adc_read),
+        ("  fire_and_forget", lambda: adc_read(fire_and_forget=True)),
+        ("Pss.write_config", pss_write_config),
+    ]
+
+
+if __name__ == "__main__":
+    print(f"{'workload':<18} {'time [us/call]':>15} {'peak [B/call]':>14}")
+    for name, workload in workloads():
+        try:
+            workload()
+        except TypeError:  # fire_and_forget not supported
+            print(f"{name:<18} {'n/a':>15} {'n/a':>14}")
+            continue
+        t = best_of(workload, 5_000)
+        peak = peak_bytes(workload, 1_000)
+        print(f"{name:<18} {t * 1e6:>15.2f} {peak:>14.0f}")
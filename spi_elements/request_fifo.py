@@ -0,0 +1,303 @@
+from __future__ import annotations
+
+from collections import deque
+from contextlib import ExitStack
+from dataclasses import dataclass
+from enum import Enum
+from math import ceil
+from threading import Condition, Lock
+from time import perf_counter
+from typing import (
+    Callable,
+    Deque,
+    Generic,
+    Iterable,
+    NoReturn,
+    Optional,
+    Tuple,
+    TypeVar,
+)
+
+T = TypeVar("T")
+
+# Number of most recent dequeues, from which the percentiles of the time in
+# queue are computed.
+_time_in_queue_samples = 1024
+
+
+class FifoPolicy(Enum):
+    """Behavior of a RequestFifo with a maxsize, if a put does not fit."""
+
+    BLOCK = "block"  # wait until the consumer made room
+    DROP_OLDEST = "drop_oldest"  # drop the oldest requests to make room
+    REJECT = "reject"  # raise a FifoFullError
+
+
+class FifoFullError(RuntimeError):
+    """Raised by a put into a full RequestFifo with FifoPolicy.REJECT."""
+
+
+@dataclass(frozen=True)
+class RequestFifoStats:
+    """Snapshot of the counters of a RequestFifo. Times are in seconds and
+    None, if no request has been dequeued yet."""
+
+    depth: int
+    high_water_mark: int
+    enqueued: int
+    dequeued: int
+    dropped: int
+    rejected: int
+    time_in_queue_p50: Optional[float]
+    time_in_queue_p90: Optional[float]
+    time_in_queue_p99: Optional[float]
+    time_in_queue_max: Optional[float]
+
+
+class RequestFifo(Generic[T]):
+    """Fifo of operation requests with any number of producers and a single
+    consumer, i.e. the thread which iterates the SpiElement.
+
+    Producers are serialized by a lock, such that the requests of a put_many()
+    are not interleaved with the requests of other producers. The consumer
+    does not take a lock: deque.append(), deque.extend() and deque.popleft()
+    are thread-safe. An empty fifo is signalled by returning None instead of
+    raising an exception. The consumer only takes the lock to wake producers,
+    which are blocked by a full fifo.
+
+    The number of requests can be limited by a maxsize (0 == unlimited), in
+    which case the FifoPolicy decides what happens to a put, that does not
+    fit. A put_many() is never split, i.e. it must not exceed the maxsize.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 0,
+        policy: FifoPolicy = FifoPolicy.BLOCK,
+        on_drop: Optional[Callable[[T], None]] = None,
+        on_reject: Optional[Callable[[T, BaseException], None]] = None,
+    ) -> None:
+        """Create an empty fifo.
+
+        :param maxsize: maximum number of requests, 0 for no limit.
+        :param policy: FifoPolicy if a put does not fit into the fifo.
+        :param on_drop: called with every request dropped by the policy
+        FifoPolicy.DROP_OLDEST (by the producer, while holding the lock).
+        :param on_reject: called with every request of a put, which is not
+        appended, and the exception raised by the put, i.e. a FifoFullError
+        (FifoPolicy.REJECT) or a ValueError (put exceeding the maxsize).
+        """
+        self._requests: Deque[Tuple[float, T]] = deque()
+        self._put_lock = Lock()
+        self._not_full = Condition(self._put_lock)
+        self._waiting_producers = 0
+        self._on_drop = on_drop
+        self._on_reject = on_reject
+        self.set_maxsize(maxsize, policy)
+
+        self._high_water_mark = 0
+        self._enqueued = 0
+        self._dequeued = 0
+        self._dropped = 0
+        self._rejected = 0
+        self._time_in_queue: Deque[float] = deque(maxlen=_time_in_queue_samples)
+
+    def __len__(self) -> int:
+        """Returns the number of requests in the fifo."""
+        return len(self._requests)
+
+    def __repr__(self) -> str:
+        return f"RequestFifo: maxsize={self._maxsize}, policy={self._policy}, requests={[r for _, r in self._requests]}"
+
+    def set_maxsize(self, maxsize: int, policy: FifoPolicy = FifoPolicy.BLOCK) -> None:
+        """Set the maximum number of requests (0 == unlimited) and the
+        FifoPolicy for puts, that do not fit. Requests already in the fifo are
+        kept, even if they exceed the new maxsize."""
+        if maxsize < 0:
+            raise ValueError(f"Expected non-negative maxsize, but got {maxsize=}")
+        with self._put_lock:
+            self._maxsize = maxsize
+            self._policy = policy
+            self._not_full.notify_all()
+
+    def put(self, request: T) -> None:
+        """Append a request to the fifo (producer)."""
+        with self._put_lock:
+            if self._maxsize:
+                self._make_room((request,))
+
+            self._requests.append((perf_counter(), request))
+            self._enqueued += 1
+            depth = len(self._requests)
+            if depth > self._high_water_mark:
+                self._high_water_mark = depth
+
+    def put_many(self, requests: Iterable[T]) -> None:
+        """Append the requests to the fifo, without interleaving them with the
+        requests of other producers (producer)."""
+        requests = tuple(requests)
+        with self._put_lock:
+            if self._maxsize:
+                self._make_room(requests)
+            self._append_many(requests)
+
+    def get(self) -> Optional[T]:
+        """Remove and return the first request of the fifo (consumer).
+
+        :return: first request or None, if the fifo is empty.
+        """
+        requests = self._requests
+        if not requests:
+            return None
+        try:
+            enqueued_at, request = requests.popleft()
+        except IndexError:
+            # Dropped by a producer since the check (FifoPolicy.DROP_OLDEST).
+            return None
+
+        self._dequeued += 1
+        self._time_in_queue.append(perf_counter() - enqueued_at)
+        if self._waiting_producers:
+            with self._not_full:
+                self._not_full.notify_all()
+        return request
+
+    def get_stats(self) -> RequestFifoStats:
+        """Return a snapshot of the counters and the percentiles of the time
+        in queue of the most recent dequeued requests."""
+        samples = sorted(self._time_in_queue.copy())
+
+        def percentile(p: int) -> Optional[float]:
+            if not samples:
+                return None
+            return samples[max(ceil(p / 100 * len(samples)) - 1, 0)]
+
+        return RequestFifoStats(
+            depth=len(self._requests),
+            high_water_mark=self._high_water_mark,
+            enqueued=self._enqueued,
+            dequeued=self._dequeued,
+            dropped=self._dropped,
+            rejected=self._rejected,
+            time_in_queue_p50=percentile(50),
+            time_in_queue_p90=percentile(90),
+            time_in_queue_p99=percentile(99),
+            time_in_queue_max=samples[-1] if samples else None,
+        )
+
+    def _make_room(self, requests: Tuple[T, ...]) -> None:
+        """Make room for the requests according to the policy. The lock must be
+        held by the caller."""
+        try:
+            fits = self._check_room(len(requests))
+        except (ValueError, FifoFullError) as exception:
+            self._reject(requests, exception)
+        if not fits:
+            self._wait_for_room(len(requests))
+        self._drop_oldest(len(requests))
+
+    def _check_room(self, n: int) -> bool:
+        """Returns True, if 'n' requests can be appended without waiting, i.e.
+        they fit or the oldest requests are dropped (FifoPolicy.DROP_OLDEST).
+        The lock must be held by the caller.
+
+        :raises ValueError: if 'n' exceeds the maxsize.
+        :raises FifoFullError: if the requests are rejected (FifoPolicy.REJECT).
+        """
+        if n > self._maxsize:
+            raise ValueError(
+                f"Expected at most {self._maxsize=} requests per put, but got {n}"
+            )
+        if len(self._requests) + n <= self._maxsize:
+            return True
+
+        if self._policy == FifoPolicy.REJECT:
+            self._rejected += n
+            raise FifoFullError(
+                f"RequestFifo is full: {len(self._requests)} of {self._maxsize=} requests"
+            )
+        return self._policy == FifoPolicy.DROP_OLDEST
+
+    def _wait_for_room(self, n: int) -> None:
+        """Block until 'n' requests fit into the fifo (FifoPolicy.BLOCK). The
+        lock must be held by the caller."""
+        self._waiting_producers += 1
+        try:
+            while self._maxsize and len(self._requests) + n > self._maxsize:
+                self._not_full.wait()
+        finally:
+            self._waiting_producers -= 1
+
+    def _drop_oldest(self, n: int) -> None:
+        """Drop the oldest requests, until 'n' requests fit into the fifo. The
+        lock must be held by the caller."""
+        while self._maxsize and len(self._requests) + n > self._maxsize:
+            try:
+                _, request = self._requests.popleft()
+            except IndexError:
+                break
+            self._dropped += 1
+            if self._on_drop:
+                self._on_drop(request)
+
+    def _append_many(self, requests: Tuple[T, ...]) -> None:
+        """Append the requests, for which room has been made. The lock must be
+        held by the caller."""
+        now = perf_counter()
+        self._requests.extend((now, request) for request in requests)
+        self._enqueued += len(requests)
+        depth = len(self._requests)
+        if depth > self._high_water_mark:
+            self._high_water_mark = depth
+
+    def _reject(self, requests: Tuple[T, ...], exception: BaseException) -> NoReturn:
+        """Pass the requests of a put to on_reject and raise the exception."""
+        if self._on_reject:
+            for request in requests:
+                self._on_reject(request, exception)
+        raise exception
+
+
+def put_many_atomically(puts: Iterable[Tuple[RequestFifo[T], Iterable[T]]]) -> None:
+    """Append the requests to their RequestFifo, such that either the requests
+    of all puts or of none are appended, e.g. the batches of a transaction of
+    all SpiElements of a daisy chain.
+
+    The locks of all fifos are held, while the room is checked and the
+    requests are appended. A fifo with FifoPolicy.BLOCK is waited for with the
+    locks of the other fifos released, such that no producer or consumer of
+    another fifo is blocked meanwhile. If any put is rejected, on_reject of
+    every fifo is called with its requests and the exception is raised.
+
+    :param puts: pairs of distinct RequestFifos and their requests.
+    """
+    puts = [(fifo, tuple(requests)) for fifo, requests in puts]
+    puts = [(fifo, requests) for fifo, requests in puts if requests]
+    # Locked in a global order, such that concurrent calls do not deadlock.
+    locks = [fifo._put_lock for fifo, _ in sorted(puts, key=lambda put: id(put[0]))]
+    while True:
+        with ExitStack() as stack:
+            for lock in locks:
+                stack.enter_context(lock)
+            try:
+                blocked = [
+                    (fifo, len(requests))
+                    for fifo, requests in puts
+                    if fifo._maxsize and not fifo._check_room(len(requests))
+                ]
+            except (ValueError, FifoFullError) as exception:
+                for fifo, requests in puts:
+                    if fifo._on_reject:
+                        for request in requests:
+                            fifo._on_reject(request, exception)
+                raise
+
+            if not blocked:
+                for fifo, requests in puts:
+                    fifo._drop_oldest(len(requests))
+                    fifo._append_many(requests)
+                return
+
+        fifo, n = blocked[0]
+        with fifo._put_lock:
+            fifo._wait_for_room(n)
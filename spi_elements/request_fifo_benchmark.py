@@ -0,0 +1,121 @@
+"""Benchmark of the fifo of operation requests of SpiElements.
+
+The RequestFifo is compared with the previous fifo, a queue.Queue guarded by
+an additional RLock, whose empty state was signalled by raising queue.Empty.
+
+- idle: next() of an Ad5672 with an empty fifo (default operation request).
+- write + next: an Ad5672.write() followed by next() in the same thread.
+- contention: several producer threads call Ad5672.write(), while a consumer
+  thread (like the cyclic transfer thread of the SpiClient) drains the fifo
+  by calling next() continuously.
+
+Usage:
+    python3 spi_elements/request_fifo_benchmark.py
+"""
+
+from queue import Empty, Queue
+from threading import RLock, Thread
+from time import perf_counter
+from timeit import repeat
+from typing import Iterable, Optional
+
+from spi_elements.request_fifo import RequestFifo
+from spi_elements.spi_operation_request_iterator import (
+    OperationPriority,
+    SingleTransferOperationRequest,
+)
+from device_implementation.dac.ad5672 import Ad5672
+
+
+class QueueFifo:
+    """Previous fifo of SpiElementBase with the interface of RequestFifo."""
+
+    def __init__(self) -> None:
+        self._queue = Queue()
+        self._rlock = RLock()
+
+    def __len__(self) -> int:
+        return self._queue.qsize()
+
+    def put(self, request: SingleTransferOperationRequest) -> None:
+        with self._rlock:
+            self._queue.put_nowait(request)
+
+    def put_many(self, requests: Iterable[SingleTransferOperationRequest]) -> None:
+        with self._rlock:
+            for request in requests:
+                self._queue.put_nowait(request)
+
+    def get(self) -> Optional[SingleTransferOperationRequest]:
+        with self._rlock:
+            try:
+                return self._queue.get_nowait()
+            except Empty:
+                return None
+
+
+def create_dac(fifo_type: type) -> Ad5672:
+    dac = Ad5672()
+    dac._operation_requests = tuple(fifo_type() for _ in OperationPriority)
+    return dac
+
+
+def best_of(stmt, number: int) -> float:
+    """Return the best time per call in seconds."""
+    return min(repeat(stmt, number=number, repeat=5)) / number
+
+
+def contention(fifo_type: type, producers: int, writes: int) -> float:
+    """Return the time per write in seconds, until all writes of all producers
+    are taken from the fifo by the consumer."""
+    dac = create_dac(fifo_type)
+    default_op_req = dac._get_default_operation_request()
+    total = producers * writes
+
+    def produce() -> None:
+        for i in range(writes):
+            dac.write(addr=i % 8, voltage=2.5)
+
+    def consume() -> None:
+        consumed = 0
+        while consumed < total:
+            if next(dac) is not default_op_req:
+                consumed += 1
+
+    threads = [Thread(target=produce) for _ in range(producers)]
+    consumer = Thread(target=consume)
+
+    start = perf_counter()
+    consumer.start()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    consumer.join()
+    return (perf_counter() - start) / total
+
+
+if __name__ == "__main__":
+    fifo_types = [("Queue+RLock", QueueFifo), ("RequestFifo", RequestFifo)]
+
+    print(f"{'workload':<22} {'fifo':<12} {'per call [us]':>14}")
+    for fifo_name, fifo_type in fifo_types:
+        dac = create_dac(fifo_type)
+        t = best_of(lambda: next(dac), 100_000)
+        print(f"{'idle':<22} {fifo_name:<12} {t * 1e6:>14.3f}")
+
+    for fifo_name, fifo_type in fifo_types:
+        dac = create_dac(fifo_type)
+
+        def write_next() -> None:
+            dac.write(addr=3, voltage=2.5)
+            next(dac)
+
+        t = best_of(write_next, 20_000)
+        print(f"{'write + next':<22} {fifo_name:<12} {t * 1e6:>14.3f}")
+
+    for producers in [1, 4, 8]:
+        for fifo_name, fifo_type in fifo_types:
+            t = min(contention(fifo_type, producers, 20_000) for _ in range(3))
+            name = f"contention {producers} thr."
+            print(f"{name:<22} {fifo_name:<12} {t * 1e6:>14.3f}")
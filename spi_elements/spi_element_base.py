@@ -1,16 +1,43 @@
 from __future__ import annotations
 
-from typing import List, TypeVar, Any
-
-from queue import Queue, Empty
-from threading import RLock
+from collections import deque
+from contextlib import contextmanager
+from threading import local
+from typing import (
+    Callable,
+    Deque,
+    Dict,
+    Hashable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    TypeVar,
+)
 
 from spi_elements.spi_operation_request_iterator import (
     SpiOperationRequestIteratorBase,
     SingleTransferOperationRequest,
     SequenceTransferOperationRequest,
+    OperationPriority,
+    CycleMark,
+    CycleDelay,
+)
+from spi_elements.async_return import fail_callback
+from spi_elements.request_fifo import FifoPolicy, RequestFifo, RequestFifoStats
+from spi_elements.transfer_plan import TransferPlan, TransferPlanRequest
+from operation_base import OperationBase
+
+# Entry of the fifo: a single operation request or the operation requests of a
+# sequence, which must be processed without interruption. CycleMarks and
+# CycleDelays are entries without an operation, which schedule the entries of
+# their fifo.
+AtomicOperationRequests = (
+    SingleTransferOperationRequest
+    | List[SingleTransferOperationRequest]
+    | CycleMark
+    | CycleDelay
 )
-from spi_operation import SingleTransferOperation, SequenceTransferOperation
 
 
 class SpiElementBase(SpiOperationRequestIteratorBase):
@@ -25,91 +52,303 @@ class SpiElementBase(SpiOperationRequestIteratorBase):
     - must implement self._get_default_operation_request() to return the
       operation request, that shall be processed when no operation request can
       be retrieved from the fifo.
+
+    There is a fifo per OperationPriority. Operation requests of a higher
+    priority are processed before pending operation requests of a lower
+    priority, but a started sequence is always completed first.
+
+    Every call of next() is a cycle. The fifo of a priority can be delayed
+    until a number of cycles after a CycleMark (see .mark_cycle() and
+    .delay()), e.g. until a SpiElement of the same daisy chain is reset. The
+    fifos of other priorities are processed in the meantime.
     """
 
     def __init__(self) -> None:
-        """Initialize the SpiElement with an empty queue."""
-        self._operation_request = Queue()
-        self._queue_rlock = RLock()
+        """Initialize the SpiElement with an empty fifo per priority."""
+        self._operation_requests: Tuple[RequestFifo[AtomicOperationRequests], ...] = (
+            tuple(
+                RequestFifo(
+                    on_drop=self._drop_operation_requests,
+                    on_reject=self._fail_operation_requests,
+                )
+                for _ in OperationPriority
+            )
+        )
+        self._atomic_operation_requests: Deque[SingleTransferOperationRequest] = deque()
+        self._cycles = 0
+        # Active CycleDelay per priority, which holds back the fifo.
+        self._delays: List[Optional[CycleDelay]] = [None for _ in OperationPriority]
+        self._transfer_plans: Dict[Hashable, TransferPlan] = {}
+        self._transaction = local()
 
     def __next__(self) -> SingleTransferOperationRequest:
         """Return operation request from fifo if available. Fallback to the
         default operation request."""
-        with self._queue_rlock:
-            try:
-                return self._pop_unprocessed_operation_request()
-            except Empty:
-                return self._get_default_operation_request()
+        op_req = self._pop_unprocessed_operation_request()
+        self._cycles += 1
+        if op_req is None:
+            return self._get_default_operation_request()
+        return op_req
+
+    def has_pending_operation_request(self) -> bool:
+        """Returns True, if an operation request is pending in any fifo."""
+        return (
+            bool(self._atomic_operation_requests)
+            or any(self._operation_requests)
+            or any(self._delays)
+        )
+
+    def get_cycle_count(self) -> int:
+        """Returns the number of cycles, i.e. the number of the next cycle.
+        Idle cycles of an aggregate are counted before the next cycle, which
+        is not idle."""
+        return self._cycles
+
+    def mark_cycle(
+        self, priority: OperationPriority = OperationPriority.NORMAL
+    ) -> CycleMark:
+        """Put a CycleMark into the fifo, which is reached in the cycle of the
+        operation request following the mark (or of the default operation
+        request, if there is none).
+
+        :param priority: OperationPriority of the fifo.
+        """
+        mark = CycleMark()
+        self._put_unprocessed_operation_request(mark, priority=priority)
+        return mark
+
+    def delay(
+        self,
+        mark: CycleMark,
+        cycles: int = 0,
+        priority: OperationPriority = OperationPriority.NORMAL,
+    ) -> None:
+        """Delay the subsequent operation requests of the fifo until 'cycles'
+        cycles after 'mark'. Use e.g. the CycleMark of another SpiElement of
+        the daisy chain instead of padding the fifo with nop()s.
+
+        :param mark: CycleMark, which is reached by any SpiElement of the
+        daisy chain or created with the cycle, e.g. CycleMark(cycle=0).
+        :param cycles: minimum number of cycles between 'mark' and the next
+        operation request.
+        :param priority: OperationPriority of the fifo.
+        """
+        if cycles < 0:
+            raise ValueError(f"Expected non-negative cycles, but got {cycles=}")
+        self._put_unprocessed_operation_request(
+            CycleDelay(mark, cycles), priority=priority
+        )
+
+    def _count_idle_cycles(self, cycles: int) -> None:
+        self._cycles += cycles
+
+    def configure_fifo(
+        self, maxsize: int = 0, policy: FifoPolicy = FifoPolicy.BLOCK
+    ) -> None:
+        """Limit the number of entries in the fifo of every priority. An entry
+        is a single operation request or the operation requests of a sequence.
+
+        :param maxsize: maximum number of entries per priority, 0 for no limit.
+        :param policy: FifoPolicy, if a request does not fit into the fifo:
+        block the producer, drop the oldest entries (whose AsyncReturns fail
+        with a RuntimeError) or reject the request with a FifoFullError (which
+        its AsyncReturn fails with).
+        """
+        for fifo in self._operation_requests:
+            fifo.set_maxsize(maxsize, policy)
+
+    def get_fifo_stats(self) -> Dict[OperationPriority, RequestFifoStats]:
+        """Return a snapshot of the counters of the fifo of every priority,
+        e.g. to detect an overload of the SpiElement."""
+        return {
+            priority: fifo.get_stats()
+            for priority, fifo in zip(OperationPriority, self._operation_requests)
+        }
+
+    def _drop_operation_requests(self, op_reqs: AtomicOperationRequests) -> None:
+        """Called with the entry dropped from a fifo by FifoPolicy.DROP_OLDEST.
+        Child classes may extend it to release references to the entry.
+
+        The AsyncReturns of the dropped operation requests fail, such that no
+        waiter blocks forever.
+        """
+        self._fail_operation_requests(
+            op_reqs,
+            RuntimeError(
+                "Operation request dropped from the fifo by FifoPolicy.DROP_OLDEST"
+            ),
+        )
+
+    def _fail_operation_requests(
+        self, op_reqs: AtomicOperationRequests, exception: BaseException
+    ) -> None:
+        """Fail the AsyncReturns of an entry, which is never processed, e.g.
+        rejected by a put into a full fifo, with 'exception'."""
+        # A failed mark is reached, such that no fifo is delayed forever.
+        if isinstance(op_reqs, CycleMark):
+            if op_reqs.cycle is None:
+                op_reqs.cycle = self._cycles
+            return
+        if isinstance(op_reqs, CycleDelay):
+            return
+
+        for op_req in op_reqs if isinstance(op_reqs, list) else [op_reqs]:
+            fail_callback(op_req.callback, exception)
+
+    @contextmanager
+    def _batch(
+        self, puts: List[Tuple[RequestFifo, List[AtomicOperationRequests]]]
+    ) -> Iterator[None]:
+        """Collect the operation requests requested by the calling thread within
+        the context into a batch per priority, which is appended to 'puts' on
+        exit (see transaction()). The batches are not interleaved with
+        operation requests of other producers.
+
+        If the context is left by an exception, the batches are discarded and
+        the AsyncReturns of their operation requests fail with the exception.
+        Nested transactions are part of the outermost transaction.
+        """
+        if self._in_transaction():
+            yield
+            return
+
+        batches: List[List[AtomicOperationRequests]] = [[] for _ in OperationPriority]
+        self._transaction.batches = batches
+        try:
+            yield
+        except BaseException as exception:
+            for batch in batches:
+                for op_reqs in batch:
+                    self._fail_operation_requests(op_reqs, exception)
+            raise
+        finally:
+            self._transaction.batches = None
+
+        puts.extend(zip(self._operation_requests, batches))
 
-    def _pop_unprocessed_operation_request(self) -> SingleTransferOperationRequest:
+    def _in_transaction(self) -> bool:
+        """Returns True, if the calling thread is within a transaction()."""
+        return getattr(self._transaction, "batches", None) is not None
+
+    def _pop_unprocessed_operation_request(
+        self,
+    ) -> SingleTransferOperationRequest | None:
         """Pop the next operation request, that should be written to the
         physical SpiElement from the fifo of unprocessed operations.
 
+        The remaining operation requests of a started sequence are popped
+        first, such that sequences are never split by operation requests of
+        higher priority. Otherwise the fifo of the highest priority, which is
+        neither empty nor delayed, is popped.
+
         :return: SingleTransferOperationRequest containing the
         SingleTransferOperation with command in binary format (MSB first) that
-        shoud be run next.
+        shoud be run next, or None if the fifo is empty.
         """
-        with self._queue_rlock:
-            return self._operation_request.get_nowait()
+        if self._atomic_operation_requests:
+            return self._atomic_operation_requests.popleft()
+
+        cycle = self._cycles
+        for priority, fifo in enumerate(self._operation_requests):
+            delay = self._delays[priority]
+            if delay is not None:
+                if not delay.is_over(cycle):
+                    continue
+                self._delays[priority] = None
+
+            while (op_req := fifo.get()) is not None:
+                if isinstance(op_req, list):
+                    self._atomic_operation_requests.extend(op_req)
+                    return self._atomic_operation_requests.popleft()
+                if isinstance(op_req, CycleMark):
+                    op_req.cycle = cycle
+                elif isinstance(op_req, CycleDelay):
+                    if not op_req.is_over(cycle):
+                        self._delays[priority] = op_req
+                        break
+                else:
+                    return op_req
+        return None
 
     def _put_unprocessed_operation_request(
         self,
         op_req: (
             SingleTransferOperationRequest
+            | CycleMark
+            | CycleDelay
             | List[SingleTransferOperationRequest]
             | SequenceTransferOperationRequest
             | List[SequenceTransferOperationRequest]
+            | TransferPlanRequest
+            | List[TransferPlanRequest]
         ),
+        priority: OperationPriority = OperationPriority.NORMAL,
     ) -> None:
         """Put operation request(s), into the fifo that will be processed by
         the physical SpiElement. This method should be used by child classes to
         request the processing of spi operations.
+
+        Sequences are compiled into a TransferPlan, whose leaves are processed
+        in order without interruption by operation requests of higher priority.
+        All operation requests of a call are put into the fifo at once, i.e.
+        they are not interleaved with other producers. Within a transaction()
+        they are added to the batch of the transaction instead.
+
+        :param priority: OperationPriority of the fifo.
         """
+        batches = getattr(self._transaction, "batches", None)
+        if isinstance(op_req, (SingleTransferOperationRequest, CycleMark, CycleDelay)):
+            if batches is None:
+                self._operation_requests[priority].put(op_req)
+            else:
+                batches[priority].append(op_req)
+            return
+
         if not isinstance(op_req, list):
             op_req_list = [op_req]
         else:
             op_req_list = op_req
 
-        with self._queue_rlock:
-            for x in op_req_list:
-                if isinstance(x, SingleTransferOperationRequest):
-                    self._operation_request.put_nowait(x)
-                elif isinstance(x, SequenceTransferOperationRequest):
-                    ops = x.operation.get_operations()
-                    sequence_callback = x.callback
-
-                    responses = []
-
-                    def collect_ops_responses(response: Any):
-                        responses.append(response)
-                        if len(responses) == len(ops) and sequence_callback:
-                            sequence_callback(x.operation.get_parsed_response())
-                        return None
-
-                    for op in ops:
-                        if isinstance(op, SingleTransferOperation):
-                            self._put_unprocessed_operation_request(
-                                SingleTransferOperationRequest(
-                                    operation=op,
-                                    callback=collect_ops_responses,
-                                )
-                            )
-                        elif isinstance(op, SequenceTransferOperation):
-                            self._put_unprocessed_operation_request(
-                                SequenceTransferOperationRequest(
-                                    operation=op,
-                                    callback=collect_ops_responses,
-                                )
-                            )
-                        else:
-                            raise ValueError(
-                                f"Operation must be of type SingleTransferOperation or SequenceTransferOperation, but got {op} of type {type(op)}"
-                            )
+        atomic_op_reqs: List[AtomicOperationRequests] = []
+        for x in op_req_list:
+            if isinstance(x, SingleTransferOperationRequest):
+                atomic_op_reqs.append(x)
+                continue
+            elif isinstance(x, SequenceTransferOperationRequest):
+                leaf_reqs = TransferPlan(x.operation).create_operation_requests(
+                    x.callback
+                )
+            elif isinstance(x, TransferPlanRequest):
+                leaf_reqs = x.plan.create_operation_requests(x.callback)
+            else:
+                raise ValueError(
+                    f"OperationRequest must be of type SingleTransferOperationRequest, SequenceTransferOperationRequest or TransferPlanRequest, but got {x} of type {type(x)}"
+                )
+            atomic_op_reqs.append(leaf_reqs[0] if len(leaf_reqs) == 1 else leaf_reqs)
 
-                else:
-                    raise ValueError(
-                        f"OperationRequest must be of type SingleTransferOperationRequest or SequenceTransferOperationRequest, but got {x} of type {type(x)}"
-                    )
+        if batches is None:
+            self._operation_requests[priority].put_many(atomic_op_reqs)
+        else:
+            batches[priority].extend(atomic_op_reqs)
+
+    def _get_transfer_plan(
+        self, key: Hashable, create_operation: Callable[[], OperationBase]
+    ) -> TransferPlan:
+        """Return a TransferPlan of the operation tree identified by 'key'.
+
+        The plan is compiled only on the first request of 'key' and cached by
+        the SpiElement. A copy of the cached plan with its own responses is
+        returned.
+
+        :param key: identifies the operation tree, e.g. by its parameters.
+        :param create_operation: creates the operation tree, if the plan of
+        'key' is not cached yet.
+        """
+        try:
+            plan = self._transfer_plans[key]
+        except KeyError:
+            plan = self._transfer_plans[key] = TransferPlan(create_operation())
+        return plan.copy()
 
 
 SpiElement = TypeVar("SpiElement", bound=SpiElementBase)
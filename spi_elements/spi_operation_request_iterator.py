@@ -1,13 +1,25 @@
 from abc import ABC, abstractmethod
 
+from contextlib import contextmanager
 from dataclasses import dataclass
-from typing import Callable, Optional, TypeVar
+from enum import IntEnum
+from typing import Any, Callable, Iterator, List, Optional, Tuple, TypeVar
 
 from spi_elements.async_return import AsyncReturn
+from spi_elements.request_fifo import RequestFifo, put_many_atomically
 from spi_operation.single_transfer_operation import SingleTransferOperation
 from spi_operation.sequence_transfer_operation import SequenceTransferOperation
 
 
+class OperationPriority(IntEnum):
+    """Priority of operation requests. Operation requests of higher priority
+    (lower value) are processed before all pending operation requests of lower
+    priority, e.g. to disconnect an output on the next bus cycle."""
+
+    HIGH = 0
+    NORMAL = 1
+
+
 @dataclass
 class SingleTransferOperationRequest:
     operation: SingleTransferOperation
@@ -20,6 +32,34 @@ class SequenceTransferOperationRequest:
     callback: Optional[Callable[..., None]] = None
 
 
+@dataclass
+class CycleMark:
+    """Marks a cycle of a daisy chain, e.g. the cycle in which an operation
+    request is transferred. A mark is reached, when its cycle is known.
+
+    The members of a daisy chain are iterated in lockstep, therefore they
+    count the same cycles (see SpiElementBase.get_cycle_count()).
+    """
+
+    cycle: Optional[int] = None
+
+    def is_reached(self) -> bool:
+        return self.cycle is not None
+
+
+@dataclass
+class CycleDelay:
+    """Delays the subsequent operation requests of a fifo until 'cycles'
+    cycles after the CycleMark 'mark'."""
+
+    mark: CycleMark
+    cycles: int = 0
+
+    def is_over(self, cycle: int) -> bool:
+        """Returns True, if an operation request may be transferred in 'cycle'."""
+        return self.mark.cycle is not None and cycle - self.mark.cycle >= self.cycles
+
+
 class SpiOperationRequestIteratorBase(ABC):
     def __iter__(self):
         return self
@@ -39,6 +79,56 @@ class SpiOperationRequestIteratorBase(ABC):
         should be run when no other SingleTransferOperation is requested.
         """
 
+    def has_pending_operation_request(self) -> bool:
+        """Returns True, if the next operation request may be another one than
+        the default operation request. Iterators, which can not tell, always
+        return True."""
+        return True
+
+    def _count_idle_cycles(self, cycles: int) -> None:
+        """Called by an aggregate with the number of cycles, for which the
+        aggregate returned its cached idle operation request instead of calling
+        __next__(). The cycles are reported before the next call of
+        __next__()."""
+        _ = cycles
+
+    def _get_idle_operation_request(self) -> Optional[SingleTransferOperationRequest]:
+        """Get the operation request of an idle cycle, i.e. the default
+        operation request, if it is the same object for every cycle and does
+        neither take a response nor have a callback. Such an operation request
+        can be cached by an aggregate. Iterators with such a default operation
+        request opt in by overriding this method.
+
+        :return: constant default operation request, or None if the default
+        operation request is not constant.
+        """
+        return None
+
+    @contextmanager
+    def transaction(self) -> Iterator[None]:
+        """Context manager, which puts all operation requests requested within
+        the context into the fifo(s) at once on exit, i.e. not interleaved with
+        operation requests of other producers. Either all or none of the
+        operation requests are put (see put_many_atomically()).
+
+        Iterators without a fifo of their own do not batch operation requests.
+        """
+        puts: List[Tuple[RequestFifo, List[Any]]] = []
+        with self._batch(puts):
+            yield
+        put_many_atomically(puts)
+
+    @contextmanager
+    def _batch(self, puts: List[Tuple[RequestFifo, List[Any]]]) -> Iterator[None]:
+        """Context manager, which collects the operation requests requested by
+        the calling thread within the context and appends the batches with
+        their fifo to 'puts' on exit, instead of putting them. Used by
+        transaction() and by the transaction() of an aggregate, which puts the
+        batches of all its aggregated iterators at once.
+        """
+        _ = puts
+        yield
+
     @abstractmethod
     def nop(
         self,
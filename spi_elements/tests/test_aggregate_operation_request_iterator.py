@@ -4,10 +4,12 @@ from typing import Any, Callable, cast, List, Optional
 
 from util import reverse_string
 from spi_operation import SingleTransferOperation
-from spi_element_base import SpiElementBase, SingleTransferOperationRequest
+from spi_elements.spi_element_base import SpiElementBase, SingleTransferOperationRequest
 from spi_elements.async_return import AsyncReturn
 
-from aggregate_operation_request_iterator import AggregateOperationRequestIterator
+from spi_elements.aggregate_operation_request_iterator import (
+    AggregateOperationRequestIterator,
+)
 
 
 class DemoAdcNop(SingleTransferOperation):
@@ -175,3 +177,105 @@ class TestAggregateOperationRequestIterator(unittest.TestCase):
         self.assertEqual(self.adc1.__next__().operation, DemoAdcReadChannelOp(0))
         self.assertEqual(self.adc0.__next__().operation, DemoAdcReadChannelOp(1))
         self.assertEqual(self.adc1.__next__().operation, DemoAdcReadChannelOp(1))
+
+    def test_layout(self):
+        self.setup()
+        self.adc0.read_channel(1)
+        self.assertEqual(self.adc_chain.get_layout().get_bitlens(), (8, 8))
+        self.assertEqual(self.adc0.__next__().operation, DemoAdcReadChannelOp(1))
+
+    def test_split_response(self):
+        self.setup()
+        op_req = self.adc_chain.__next__()
+        self.assertEqual(op_req.operation.get_layout(), self.adc_chain.get_layout())
+        op_req.operation.set_response(bitarray("00000000 11111111"))
+        self.assertEqual(
+            op_req.operation.get_parsed_response(),
+            (bitarray("00000000"), bitarray("11111111")),
+        )
+
+    def test_layout_mismatch(self):
+        self.setup()
+        mismatch = AsyncReturn()
+        self.adc0._put_unprocessed_operation_request(
+            SingleTransferOperationRequest(
+                SingleTransferOperation(bitarray("0000"), response_required=False),
+                callback=mismatch.get_callback(),
+            )
+        )
+        read = self.adc1.read_channel(0)
+        with self.assertRaises(ValueError):
+            self.adc_chain.__next__()
+        self.assertIsInstance(mismatch.get_exception(), ValueError)
+        self.assertIsInstance(read.get_exception(), ValueError)
+
+    def test_nested_layout(self):
+        self.setup()
+        adc2 = DemoAdc()
+        nested_chain = AdcChain([self.adc_chain, adc2])
+        self.adc0.read_channel(1)
+        self.assertEqual(nested_chain.get_layout().get_bitlens(), (16, 8))
+        self.assertEqual(
+            nested_chain.__next__().operation.get_command(),
+            DemoAdcReadChannelOp(1).get_command()
+            + DemoAdcNop().get_command()
+            + DemoAdcNop().get_command(),
+        )
+
+    def test_no_idle_operation_request(self):
+        self.setup()
+        self.assertIsNone(self.adc_chain._get_idle_operation_request())
+        self.assertIsNot(self.adc_chain.__next__(), self.adc_chain.__next__())
+
+
+class ConstantAdc(DemoAdc):
+    def __init__(self) -> None:
+        super().__init__()
+        self._default_operation_request = SingleTransferOperationRequest(
+            operation=DemoAdcNop(),
+            callback=None,
+        )
+
+    def _get_default_operation_request(self) -> SingleTransferOperationRequest:
+        return self._default_operation_request
+
+    def _get_idle_operation_request(self) -> SingleTransferOperationRequest:
+        return self._default_operation_request
+
+
+class TestIdleOperationRequest(unittest.TestCase):
+    def setUp(self):
+        self.adc0 = ConstantAdc()
+        self.adc1 = ConstantAdc()
+        self.adc_chain = AdcChain([self.adc0, self.adc1])
+
+    def test_idle(self):
+        op_req = self.adc_chain.__next__()
+        self.assertIs(self.adc_chain.__next__(), op_req)
+        self.assertIsNone(op_req.callback)
+        self.assertFalse(op_req.operation.get_response_required())
+        self.assertEqual(
+            op_req.operation.get_command(),
+            DemoAdcNop().get_command() + DemoAdcNop().get_command(),
+        )
+
+    def test_pending(self):
+        idle_op_req = self.adc_chain.__next__()
+        self.adc1.read_channel(1)
+        self.assertTrue(self.adc_chain.has_pending_operation_request())
+        op_req = self.adc_chain.__next__()
+        self.assertIsNot(op_req, idle_op_req)
+        self.assertEqual(
+            op_req.operation.get_command(),
+            DemoAdcNop().get_command() + DemoAdcReadChannelOp(1).get_command(),
+        )
+        self.assertFalse(self.adc_chain.has_pending_operation_request())
+        self.assertIs(self.adc_chain.__next__(), idle_op_req)
+
+    def test_nested(self):
+        nested_chain = AdcChain([self.adc_chain, ConstantAdc()])
+        op_req = nested_chain.__next__()
+        self.assertIs(nested_chain.__next__(), op_req)
+        self.adc0.read_channel(0)
+        self.assertIsNot(nested_chain.__next__(), op_req)
+        self.assertIs(nested_chain.__next__(), op_req)
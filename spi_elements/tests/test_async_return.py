@@ -1,7 +1,15 @@
 import unittest
+import asyncio
 import threading
 
-from async_return import AsyncReturn
+from spi_elements.async_return import (
+    AsyncReturn,
+    ChainedCallback,
+    create_async_return,
+    fail_callback,
+    gather,
+    wait_all,
+)
 
 callback_called = threading.Event()
 
@@ -16,7 +24,7 @@ class TestAsyncReturn(unittest.TestCase):
     def test_init(self):
         ar = AsyncReturn(callback)
         self.assertEqual(ar._callback, callback)
-        self.assertFalse(ar._callback_finished.is_set())
+        self.assertFalse(ar.is_finished())
         self.assertIsNone(ar._result)
 
         self.assertFalse(callback_called.is_set())
@@ -53,3 +61,190 @@ class TestAsyncReturn(unittest.TestCase):
         ar.get_callback()(42, 0xDA1A)
         res = ar.wait()
         self.assertEqual(res, (42, 0xDA1A))
+
+    def test_lazy_event(self):
+        ar = AsyncReturn()
+        self.assertFalse(hasattr(ar, "__dict__"))
+        ar.get_callback()(42)
+        self.assertEqual(ar.wait(), 42)
+        self.assertIsNone(ar._event)
+
+    def test_wait_other_thread(self):
+        ar = AsyncReturn()
+        threading.Timer(0.01, ar.get_callback(), args=(42,)).start()
+        self.assertEqual(ar.wait(timeout=10), 42)
+        self.assertIsNotNone(ar._event)
+
+    def test_create_async_return(self):
+        results = []
+        ar, callback = create_async_return(results.append)
+        callback(42)
+        self.assertEqual(ar.get_result(), 42)
+        self.assertEqual(results, [42])
+
+        ar, callback = create_async_return(results.append, fire_and_forget=True)
+        self.assertIsNone(ar)
+        self.assertEqual(callback, results.append)
+
+        self.assertEqual(create_async_return(fire_and_forget=True), (None, None))
+
+    def test_wait_timeout(self):
+        ar = AsyncReturn()
+        with self.assertRaises(TimeoutError):
+            ar.wait(timeout=0.01)
+        ar.get_callback()(42)
+        self.assertEqual(ar.wait(timeout=0.01), 42)
+
+    def test_add_done_callback(self):
+        done = []
+        ar = AsyncReturn()
+        ar.add_done_callback(lambda ar: done.append(ar.get_result()))
+        self.assertEqual(done, [])
+        ar.get_callback()(42)
+        self.assertEqual(done, [42])
+        ar.add_done_callback(lambda ar: done.append(ar.get_result()))
+        self.assertEqual(done, [42, 42])
+
+    def test_to_future(self):
+        ar = AsyncReturn()
+        future = ar.to_future()
+        self.assertFalse(future.done())
+        threading.Timer(0.01, ar.get_callback(), args=(42,)).start()
+        self.assertEqual(future.result(timeout=10), 42)
+
+    def test_fail(self):
+        ar = AsyncReturn()
+        future = ar.to_future()
+        error = RuntimeError("dropped")
+        threading.Timer(0.01, ar.fail, args=(error,)).start()
+        with self.assertRaises(RuntimeError):
+            ar.wait(timeout=10)
+        self.assertTrue(ar.is_finished())
+        self.assertIs(ar.get_exception(), error)
+        self.assertIs(future.exception(timeout=10), error)
+        with self.assertRaises(RuntimeError):
+            ar.get_result()
+
+        ar.get_callback()(42)  # a failed AsyncReturn is not resolved anymore
+        ar.fail(ValueError())
+        self.assertIs(ar.get_exception(), error)
+
+    def test_fail_chained(self):
+        outer = AsyncReturn()
+        inner = AsyncReturn(outer.get_callback())
+        fail_callback(inner.get_callback(), RuntimeError("dropped"))
+        self.assertIsInstance(inner.get_exception(), RuntimeError)
+        self.assertIsInstance(outer.get_exception(), RuntimeError)
+
+    def test_fail_chained_callback(self):
+        ar = AsyncReturn()
+        responses = []
+        chained = ChainedCallback(responses.append, ar.fail)
+        chained(42)
+        self.assertEqual(responses, [42])
+        fail_callback(chained, RuntimeError("dropped"))
+        self.assertIsInstance(ar.get_exception(), RuntimeError)
+
+    def test_fail_plain_callback(self):
+        responses = []
+        fail_callback(responses.append, RuntimeError("dropped"))
+        fail_callback(None, RuntimeError("dropped"))
+        self.assertEqual(responses, [])
+
+
+def resolve_later(*async_returns: AsyncReturn, delay: float = 0.01) -> None:
+    """Resolve the AsyncReturns with their index from another thread, like a
+    SpiClient does."""
+    for i, ar in enumerate(async_returns):
+        threading.Timer(delay, ar.get_callback(), args=(i,)).start()
+
+
+class TestAsyncReturnAsyncio(unittest.TestCase):
+    def test_await(self):
+        async def main():
+            ar = AsyncReturn()
+            resolve_later(ar)
+            return await ar
+
+        self.assertEqual(asyncio.run(main()), 0)
+
+    def test_await_finished(self):
+        async def main():
+            ar = AsyncReturn()
+            ar.get_callback()(42)
+            return await ar
+
+        self.assertEqual(asyncio.run(main()), 42)
+
+    def test_await_cancelled(self):
+        ar = AsyncReturn()
+
+        async def main():
+            with self.assertRaises(TimeoutError):
+                await asyncio.wait_for(ar, timeout=0.01)
+
+        asyncio.run(main())
+        ar.get_callback()(42)  # loop closed, must not raise
+        self.assertEqual(ar.get_result(), 42)
+
+    def test_gather(self):
+        async_returns = [AsyncReturn() for _ in range(100)]
+
+        async def main():
+            resolve_later(*reversed(async_returns))
+            return await gather(*async_returns, timeout=10)
+
+        self.assertEqual(asyncio.run(main()), list(reversed(range(100))))
+
+    def test_gather_timeout(self):
+        async_returns = [AsyncReturn(), AsyncReturn()]
+
+        async def main():
+            resolve_later(async_returns[0])
+            return await gather(*async_returns, timeout=0.1)
+
+        with self.assertRaises(TimeoutError):
+            asyncio.run(main())
+
+    def test_await_failed(self):
+        async def main():
+            ar = AsyncReturn()
+            threading.Timer(0.01, ar.fail, args=(RuntimeError("dropped"),)).start()
+            return await ar
+
+        with self.assertRaises(RuntimeError):
+            asyncio.run(main())
+
+    def test_gather_failed(self):
+        async_returns = [AsyncReturn(), AsyncReturn()]
+
+        async def main():
+            resolve_later(async_returns[0])
+            async_returns[1].fail(RuntimeError("dropped"))
+            return await gather(*async_returns, timeout=10)
+
+        with self.assertRaises(RuntimeError):
+            asyncio.run(main())
+
+    def test_gather_empty(self):
+        self.assertEqual(asyncio.run(gather()), [])
+
+
+class TestWaitAll(unittest.TestCase):
+    def test_wait_all(self):
+        async_returns = [AsyncReturn() for _ in range(10)]
+        resolve_later(*async_returns)
+        self.assertEqual(wait_all(async_returns, timeout=10), list(range(10)))
+
+    def test_wait_all_timeout(self):
+        async_returns = [AsyncReturn(), AsyncReturn()]
+        resolve_later(async_returns[0])
+        with self.assertRaises(TimeoutError):
+            wait_all(async_returns, timeout=0.1)
+
+    def test_wait_all_failed(self):
+        async_returns = [AsyncReturn(), AsyncReturn()]
+        resolve_later(async_returns[0])
+        async_returns[1].fail(RuntimeError("dropped"))
+        with self.assertRaises(RuntimeError):
+            wait_all(async_returns, timeout=10)
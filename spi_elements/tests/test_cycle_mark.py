@@ -0,0 +1,132 @@
+import unittest
+
+from util import uint_to_bitarray
+from spi_operation import SingleTransferOperation
+from spi_elements.async_return import AsyncReturn
+from spi_elements.aggregate_operation_request_iterator import (
+    AggregateOperationRequestIterator,
+)
+from spi_elements.request_fifo import FifoPolicy
+from spi_elements.spi_element_base import SpiElementBase
+from spi_elements.spi_operation_request_iterator import (
+    CycleMark,
+    OperationPriority,
+    SingleTransferOperationRequest,
+)
+
+
+class Write(SingleTransferOperation):
+    def __init__(self, addr: int) -> None:
+        super().__init__(uint_to_bitarray(addr, 8), response_required=False)
+
+
+class Element(SpiElementBase):
+    def __init__(self) -> None:
+        super().__init__()
+        self._default_operation_request = SingleTransferOperationRequest(Write(0))
+
+    def _get_default_operation_request(self) -> SingleTransferOperationRequest:
+        return self._default_operation_request
+
+    def write(self, addr: int, priority=OperationPriority.NORMAL) -> None:
+        self._put_unprocessed_operation_request(
+            SingleTransferOperationRequest(Write(addr)), priority=priority
+        )
+
+    def nop(self, callback=None) -> AsyncReturn:
+        return AsyncReturn(callback)
+
+
+class Chain(AggregateOperationRequestIterator):
+    def nop(self, callback=None) -> AsyncReturn:
+        return AsyncReturn(callback)
+
+
+def cycles(element: Element, n: int) -> list:
+    return [next(element).operation for _ in range(n)]
+
+
+class TestCycleDelay(unittest.TestCase):
+    def test_delay(self):
+        element = Element()
+        element.write(1)
+        element.delay(CycleMark(cycle=0), cycles=3)
+        element.write(2)
+        self.assertTrue(element.has_pending_operation_request())
+        self.assertEqual(cycles(element, 4), [Write(1), Write(0), Write(0), Write(2)])
+        self.assertFalse(element.has_pending_operation_request())
+        self.assertEqual(element.get_cycle_count(), 4)
+
+    def test_delay_over(self):
+        element = Element()
+        cycles(element, 5)
+        element.delay(CycleMark(cycle=0), cycles=3)
+        element.write(1)
+        self.assertEqual(cycles(element, 1), [Write(1)])
+
+    def test_delay_negative_cycles(self):
+        with self.assertRaises(ValueError):
+            Element().delay(CycleMark(cycle=0), cycles=-1)
+
+    def test_other_priority_not_delayed(self):
+        element = Element()
+        element.delay(CycleMark(cycle=0), cycles=2)
+        element.write(1)
+        element.write(2, priority=OperationPriority.HIGH)
+        self.assertEqual(cycles(element, 3), [Write(2), Write(0), Write(1)])
+
+    def test_mark_cycle(self):
+        element = Element()
+        element.write(1)
+        element.write(2)
+        mark = element.mark_cycle()
+        element.write(3)
+        self.assertFalse(mark.is_reached())
+        cycles(element, 3)
+        self.assertEqual(mark.cycle, 2)
+
+    def test_dropped_mark_reached(self):
+        element = Element()
+        element.configure_fifo(maxsize=1, policy=FifoPolicy.DROP_OLDEST)
+        mark = element.mark_cycle()
+        element.write(1)
+        self.assertTrue(mark.is_reached())
+
+
+class TestCycleDelayChain(unittest.TestCase):
+    def setUp(self):
+        self.first = Element()
+        self.second = Element()
+        self.chain = Chain([self.first, self.second])
+
+    def frames(self, n: int) -> list:
+        return [next(self.chain).operation.get_command() for _ in range(n)]
+
+    def frame(self, first: int, second: int):
+        return Write(first).get_command() + Write(second).get_command()
+
+    def test_delay_after_mark_of_other_element(self):
+        self.first.write(1)
+        self.first.write(2)
+        mark = self.first.mark_cycle()
+        self.first.write(3)
+        self.second.delay(mark, cycles=1)
+        self.second.write(4)
+        self.assertEqual(
+            self.frames(4),
+            [
+                self.frame(1, 0),
+                self.frame(2, 0),
+                self.frame(3, 0),
+                self.frame(0, 4),
+            ],
+        )
+
+    def test_idle_cycles_counted(self):
+        idle_frame = self.frames(1)[0]
+        self.assertEqual(self.frames(5), [idle_frame] * 5)
+        self.second.delay(CycleMark(cycle=0), cycles=4)
+        self.second.write(4)
+        self.assertEqual(self.frames(1), [self.frame(0, 4)])
+        self.assertEqual(self.first.get_cycle_count(), 7)
+        self.assertEqual(self.second.get_cycle_count(), 7)
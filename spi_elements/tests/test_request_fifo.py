@@ -0,0 +1,186 @@
+import unittest
+import threading
+
+from spi_elements.request_fifo import (
+    FifoFullError,
+    FifoPolicy,
+    RequestFifo,
+    put_many_atomically,
+)
+
+
+class TestRequestFifo(unittest.TestCase):
+    def test_empty(self):
+        fifo = RequestFifo()
+        self.assertEqual(len(fifo), 0)
+        self.assertFalse(fifo)
+        self.assertIsNone(fifo.get())
+
+    def test_order(self):
+        fifo = RequestFifo()
+        fifo.put(0)
+        fifo.put_many([1, 2, 3])
+        fifo.put(4)
+        self.assertEqual(len(fifo), 5)
+        self.assertEqual([fifo.get() for _ in range(5)], [0, 1, 2, 3, 4])
+        self.assertIsNone(fifo.get())
+
+    def test_put_many_generator(self):
+        fifo = RequestFifo()
+        fifo.put_many(i for i in range(3))
+        self.assertEqual([fifo.get() for _ in range(3)], [0, 1, 2])
+
+    def test_concurrent_producers(self):
+        fifo = RequestFifo()
+        producers = 4
+        batches = 200
+        batch_len = 5
+        received = []
+
+        def produce(producer: int) -> None:
+            for batch in range(batches):
+                fifo.put_many((producer, batch, i) for i in range(batch_len))
+
+        def consume() -> None:
+            while len(received) < producers * batches * batch_len:
+                request = fifo.get()
+                if request is not None:
+                    received.append(request)
+
+        consumer = threading.Thread(target=consume)
+        threads = [
+            threading.Thread(target=produce, args=(p,)) for p in range(producers)
+        ]
+        consumer.start()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        consumer.join(timeout=10)
+        self.assertFalse(consumer.is_alive())
+
+        # Batches are contiguous and in order per producer.
+        for start in range(0, len(received), batch_len):
+            batch = received[start : start + batch_len]
+            self.assertEqual([i for _, _, i in batch], list(range(batch_len)))
+            self.assertEqual(len({(p, b) for p, b, _ in batch}), 1)
+        for producer in range(producers):
+            self.assertEqual(
+                [b for p, b, i in received if p == producer and i == 0],
+                list(range(batches)),
+            )
+        self.assertIsNone(fifo.get())
+
+
+class TestRequestFifoMaxsize(unittest.TestCase):
+    def test_reject(self):
+        rejected = []
+        fifo = RequestFifo(
+            maxsize=2,
+            policy=FifoPolicy.REJECT,
+            on_reject=lambda request, e: rejected.append((request, type(e))),
+        )
+        fifo.put(0)
+        fifo.put(1)
+        with self.assertRaises(FifoFullError):
+            fifo.put(2)
+        with self.assertRaises(ValueError):
+            fifo.put_many([3, 4, 5])
+        self.assertEqual([fifo.get(), fifo.get(), fifo.get()], [0, 1, None])
+        self.assertEqual(fifo.get_stats().rejected, 1)
+        self.assertEqual(
+            rejected,
+            [(2, FifoFullError), (3, ValueError), (4, ValueError), (5, ValueError)],
+        )
+
+    def test_drop_oldest(self):
+        dropped = []
+        fifo = RequestFifo(
+            maxsize=3, policy=FifoPolicy.DROP_OLDEST, on_drop=dropped.append
+        )
+        fifo.put_many([0, 1, 2])
+        fifo.put_many([3, 4])
+        self.assertEqual(dropped, [0, 1])
+        self.assertEqual([fifo.get() for _ in range(3)], [2, 3, 4])
+        self.assertEqual(fifo.get_stats().dropped, 2)
+
+    def test_block(self):
+        fifo = RequestFifo(maxsize=2, policy=FifoPolicy.BLOCK)
+        fifo.put_many([0, 1])
+        producer = threading.Thread(target=fifo.put_many, args=([2, 3],))
+        producer.start()
+        producer.join(timeout=0.05)
+        self.assertTrue(producer.is_alive())
+
+        self.assertEqual(fifo.get(), 0)
+        producer.join(timeout=0.05)
+        self.assertTrue(producer.is_alive())
+
+        self.assertEqual(fifo.get(), 1)
+        producer.join(timeout=10)
+        self.assertFalse(producer.is_alive())
+        self.assertEqual([fifo.get(), fifo.get(), fifo.get()], [2, 3, None])
+
+    def test_set_maxsize_unblocks(self):
+        fifo = RequestFifo(maxsize=1)
+        fifo.put(0)
+        producer = threading.Thread(target=fifo.put, args=(1,))
+        producer.start()
+        fifo.set_maxsize(0)
+        producer.join(timeout=10)
+        self.assertFalse(producer.is_alive())
+        self.assertEqual(len(fifo), 2)
+
+    def test_stats(self):
+        fifo = RequestFifo()
+        stats = fifo.get_stats()
+        self.assertEqual(stats.depth, 0)
+        self.assertIsNone(stats.time_in_queue_p50)
+
+        fifo.put_many(range(10))
+        for _ in range(4):
+            fifo.get()
+        fifo.put(10)
+        stats = fifo.get_stats()
+        self.assertEqual(stats.depth, 7)
+        self.assertEqual(stats.high_water_mark, 10)
+        self.assertEqual(stats.enqueued, 11)
+        self.assertEqual(stats.dequeued, 4)
+        self.assertEqual((stats.dropped, stats.rejected), (0, 0))
+        self.assertLessEqual(stats.time_in_queue_p50, stats.time_in_queue_p90)
+        self.assertLessEqual(stats.time_in_queue_p90, stats.time_in_queue_p99)
+        self.assertLessEqual(stats.time_in_queue_p99, stats.time_in_queue_max)
+
+
+class TestPutManyAtomically(unittest.TestCase):
+    def test_reject_all(self):
+        rejected = []
+        fifos = [
+            RequestFifo(on_reject=lambda request, e: rejected.append(request)),
+            RequestFifo(
+                maxsize=1,
+                policy=FifoPolicy.REJECT,
+                on_reject=lambda request, e: rejected.append(request),
+            ),
+        ]
+        fifos[1].put(0)
+        with self.assertRaises(FifoFullError):
+            put_many_atomically([(fifos[0], [1, 2]), (fifos[1], [3])])
+        self.assertEqual(rejected, [1, 2, 3])
+        self.assertEqual([len(fifo) for fifo in fifos], [0, 1])
+
+    def test_block_all(self):
+        fifos = [RequestFifo(), RequestFifo(maxsize=1)]
+        fifos[1].put(0)
+        producer = threading.Thread(
+            target=put_many_atomically, args=([(fifos[0], [1]), (fifos[1], [2])],)
+        )
+        producer.start()
+        producer.join(timeout=0.05)
+        self.assertTrue(producer.is_alive())
+        self.assertEqual(len(fifos[0]), 0)
+
+        self.assertEqual(fifos[1].get(), 0)
+        producer.join(timeout=10)
+        self.assertFalse(producer.is_alive())
+        self.assertEqual([fifos[0].get(), fifos[1].get()], [1, 2])
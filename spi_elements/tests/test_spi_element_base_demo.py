@@ -5,7 +5,7 @@ from bitarray import bitarray
 from itertools import accumulate
 
 from util import reverse_string
-from spi_element_base import SpiElementBase
+from spi_elements.spi_element_base import SpiElementBase
 from spi_operation import SingleTransferOperation
 from spi_elements.async_return import AsyncReturn
 from spi_elements.spi_operation_request_iterator import (
@@ -0,0 +1,203 @@
+import unittest
+import threading
+
+from util import uint_to_bitarray
+from spi_operation import SingleTransferOperation, SequenceTransferOperation
+from spi_elements.async_return import AsyncReturn
+from spi_elements.aggregate_operation_request_iterator import (
+    AggregateOperationRequestIterator,
+)
+from spi_elements.spi_element_base import SpiElementBase
+from spi_elements.request_fifo import FifoFullError, FifoPolicy
+from spi_elements.spi_operation_request_iterator import (
+    OperationPriority,
+    SequenceTransferOperationRequest,
+    SingleTransferOperationRequest,
+)
+
+
+class Write(SingleTransferOperation):
+    def __init__(self, addr: int) -> None:
+        super().__init__(uint_to_bitarray(addr, 8), response_required=False)
+
+
+class Element(SpiElementBase):
+    def _get_default_operation_request(self) -> SingleTransferOperationRequest:
+        return SingleTransferOperationRequest(Write(0))
+
+    def write(self, addr: int, priority=OperationPriority.NORMAL) -> None:
+        self._put_unprocessed_operation_request(
+            SingleTransferOperationRequest(Write(addr)), priority=priority
+        )
+
+    def nop(self, callback=None) -> AsyncReturn:
+        return AsyncReturn(callback)
+
+
+class Chain(AggregateOperationRequestIterator):
+    def nop(self, callback=None) -> AsyncReturn:
+        return AsyncReturn(callback)
+
+
+def pending(element: Element) -> list:
+    ops = []
+    while element.has_pending_operation_request():
+        ops.append(next(element).operation)
+    return ops
+
+
+class TestTransaction(unittest.TestCase):
+    def test_batch_on_exit(self):
+        element = Element()
+        with element.transaction():
+            element.write(1)
+            element._put_unprocessed_operation_request(
+                SequenceTransferOperationRequest(
+                    SequenceTransferOperation([Write(2), Write(3)])
+                )
+            )
+            element.write(4, priority=OperationPriority.HIGH)
+            self.assertFalse(element.has_pending_operation_request())
+        self.assertEqual(len(element._operation_requests[OperationPriority.NORMAL]), 2)
+        self.assertEqual(len(element._operation_requests[OperationPriority.HIGH]), 1)
+        self.assertEqual(pending(element), [Write(4), Write(1), Write(2), Write(3)])
+
+    def test_nested(self):
+        element = Element()
+        with element.transaction():
+            element.write(1)
+            with element.transaction():
+                element.write(2)
+            self.assertFalse(element.has_pending_operation_request())
+        self.assertEqual(pending(element), [Write(1), Write(2)])
+
+    def test_exception_discards_batch(self):
+        element = Element()
+        ar = AsyncReturn()
+        with self.assertRaises(ValueError):
+            with element.transaction():
+                element.write(1)
+                element._put_unprocessed_operation_request(
+                    SingleTransferOperationRequest(Write(3), callback=ar.get_callback())
+                )
+                raise ValueError("abort")
+        self.assertFalse(element.has_pending_operation_request())
+        self.assertIsInstance(ar.get_exception(), ValueError)
+
+        element.write(2)
+        self.assertEqual(pending(element), [Write(2)])
+
+    def test_other_thread_not_batched(self):
+        element = Element()
+        with element.transaction():
+            element.write(1)
+            thread = threading.Thread(target=element.write, args=(2,))
+            thread.start()
+            thread.join()
+            element.write(3)
+        self.assertEqual(pending(element), [Write(2), Write(1), Write(3)])
+
+    def test_aggregate(self):
+        elements = [Element(), Element()]
+        chain = Chain(elements)
+        with chain.transaction():
+            elements[0].write(1)
+            elements[1].write(2)
+            self.assertFalse(any(e.has_pending_operation_request() for e in elements))
+        self.assertEqual(pending(elements[0]), [Write(1)])
+        self.assertEqual(pending(elements[1]), [Write(2)])
+
+
+class TestConfigureFifo(unittest.TestCase):
+    def test_sequence_is_one_entry(self):
+        element = Element()
+        element.configure_fifo(maxsize=2, policy=FifoPolicy.REJECT)
+        element._put_unprocessed_operation_request(
+            SequenceTransferOperationRequest(
+                SequenceTransferOperation([Write(1), Write(2), Write(3)])
+            )
+        )
+        element.write(4)
+        with self.assertRaises(FifoFullError):
+            element.write(5)
+        element.write(6, priority=OperationPriority.HIGH)
+
+        stats = element.get_fifo_stats()
+        self.assertEqual(stats[OperationPriority.NORMAL].depth, 2)
+        self.assertEqual(stats[OperationPriority.NORMAL].rejected, 1)
+        self.assertEqual(stats[OperationPriority.HIGH].depth, 1)
+        self.assertEqual(
+            pending(element), [Write(6), Write(1), Write(2), Write(3), Write(4)]
+        )
+
+    def test_transaction_exceeding_maxsize(self):
+        element = Element()
+        element.configure_fifo(maxsize=1, policy=FifoPolicy.DROP_OLDEST)
+        with self.assertRaises(ValueError):
+            with element.transaction():
+                element.write(1)
+                element.write(2)
+        self.assertFalse(element.has_pending_operation_request())
+
+    def test_dropped_requests_fail(self):
+        element = Element()
+        element.configure_fifo(maxsize=1, policy=FifoPolicy.DROP_OLDEST)
+        single = AsyncReturn()
+        sequence = AsyncReturn()
+        errors = []
+
+        def wait():
+            try:
+                single.wait()
+            except RuntimeError as e:
+                errors.append(e)
+
+        element._put_unprocessed_operation_request(
+            SingleTransferOperationRequest(Write(1), callback=single.get_callback())
+        )
+        future = single.to_future()
+        waiter = threading.Thread(target=wait)
+        waiter.start()
+
+        element._put_unprocessed_operation_request(
+            SequenceTransferOperationRequest(
+                SequenceTransferOperation([Write(2), Write(3)]),
+                callback=sequence.get_callback(),
+            )
+        )
+        waiter.join(timeout=5)
+        self.assertFalse(waiter.is_alive())
+        self.assertEqual(len(errors), 1)
+        self.assertIsInstance(future.exception(timeout=5), RuntimeError)
+        self.assertFalse(sequence.is_finished())
+
+        element.write(4)
+        with self.assertRaises(RuntimeError):
+            sequence.wait(timeout=5)
+        self.assertEqual(pending(element), [Write(4)])
+
+    def test_rejected_requests_fail(self):
+        element = Element()
+        element.configure_fifo(maxsize=1, policy=FifoPolicy.REJECT)
+        element.write(1)
+        rejected = AsyncReturn()
+        with self.assertRaises(FifoFullError):
+            element._put_unprocessed_operation_request(
+                SingleTransferOperationRequest(
+                    Write(2), callback=rejected.get_callback()
+                )
+            )
+        self.assertIsInstance(rejected.get_exception(), FifoFullError)
+
+        oversized = [AsyncReturn(), AsyncReturn()]
+        element.configure_fifo(maxsize=1, policy=FifoPolicy.DROP_OLDEST)
+        with self.assertRaises(ValueError):
+            element._put_unprocessed_operation_request(
+                [
+                    SingleTransferOperationRequest(Write(3), callback=ar.get_callback())
+                    for ar in oversized
+                ]
+            )
+        for ar in oversized:
+            self.assertIsInstance(ar.get_exception(), ValueError)
+        self.assertEqual(pending(element), [Write(1)])
@@ -0,0 +1,165 @@
+import unittest
+from typing import Any, List
+
+from bitarray import bitarray
+
+from util import uint_to_bitarray
+from spi_operation import SingleTransferOperation, SequenceTransferOperation
+from spi_elements.async_return import AsyncReturn
+from spi_elements.spi_operation_request_iterator import (
+    OperationPriority,
+    SequenceTransferOperationRequest,
+    SingleTransferOperationRequest,
+)
+from spi_elements.spi_element_base import SpiElementBase
+from spi_elements.transfer_plan import TransferPlan, TransferPlanRequest
+
+
+class Read(SingleTransferOperation):
+    def __init__(self, addr: int) -> None:
+        super().__init__(uint_to_bitarray(addr, 8))
+
+    def _parse_response(self, rsp: bitarray) -> Any:
+        return rsp
+
+
+class Write(SingleTransferOperation):
+    def __init__(self, addr: int) -> None:
+        super().__init__(uint_to_bitarray(0x80 | addr, 8), response_required=False)
+
+
+class Collect(SequenceTransferOperation):
+    def _parse_response(self, operations_rsp: List[Any]) -> Any:
+        return operations_rsp
+
+
+class Element(SpiElementBase):
+    def _get_default_operation_request(self) -> SingleTransferOperationRequest:
+        return SingleTransferOperationRequest(Write(0))
+
+    def nop(self, callback=None) -> AsyncReturn:
+        return AsyncReturn(callback)
+
+
+def nested() -> Collect:
+    return Collect([Write(1), Collect([Read(2), Read(3)]), Read(4)])
+
+
+def process(element: Element, n: int) -> None:
+    for i in range(n):
+        op_req = next(element)
+        if op_req.operation.get_response_required():
+            op_req.operation.set_response(uint_to_bitarray(i, 8))
+        if op_req.callback:
+            op_req.callback(op_req.operation.get_parsed_response())
+
+
+class TestTransferPlan(unittest.TestCase):
+    def test_leaves(self):
+        operation = nested()
+        plan = TransferPlan(operation)
+        self.assertEqual(len(plan), 4)
+        self.assertIs(plan.get_operation(), operation)
+        self.assertEqual(plan.get_leaves(), [Write(1), Read(2), Read(3), Read(4)])
+        self.assertEqual(plan.get_leaves(), operation.get_single_transfer_operations())
+
+    def test_single_transfer_operation(self):
+        plan = TransferPlan(Read(5))
+        self.assertEqual(plan.get_leaves(), [Read(5)])
+
+    def test_operation_requests(self):
+        results = []
+        op_reqs = TransferPlan(nested()).create_operation_requests(results.append)
+        self.assertEqual(len(op_reqs), 4)
+        self.assertEqual(
+            [op_req.callback is None for op_req in op_reqs][:-1], [True] * 3
+        )
+        self.assertIsNotNone(op_reqs[-1].callback)
+
+        op_reqs_no_callback = TransferPlan(nested()).create_operation_requests()
+        self.assertTrue(all(op_req.callback is None for op_req in op_reqs_no_callback))
+
+    def test_copy(self):
+        plan = TransferPlan(nested())
+        plan_copy = plan.copy()
+        self.assertEqual(plan_copy.get_operation(), plan.get_operation())
+        for leaf, leaf_copy in zip(plan.get_leaves(), plan_copy.get_leaves()):
+            self.assertIsNot(leaf, leaf_copy)
+            self.assertIs(leaf.get_command(), leaf_copy.get_command())
+
+        plan_copy.get_leaves()[1].set_response(uint_to_bitarray(0xAB, 8))
+        self.assertIsNone(plan.get_leaves()[1].get_response())
+
+
+class TestSpiElementTransferPlan(unittest.TestCase):
+    def test_sequence_request(self):
+        element = Element()
+        ar = AsyncReturn()
+        element._put_unprocessed_operation_request(
+            SequenceTransferOperationRequest(nested(), ar.get_callback())
+        )
+        process(element, 3)
+        self.assertFalse(ar.is_finished())
+        process(element, 1)
+        self.assertTrue(ar.is_finished())
+        self.assertEqual(
+            ar.get_result(),
+            [
+                None,
+                [uint_to_bitarray(1, 8), uint_to_bitarray(2, 8)],
+                uint_to_bitarray(0, 8),
+            ],
+        )
+
+    def test_plan_request(self):
+        element = Element()
+        ar = AsyncReturn()
+        plan = element._get_transfer_plan("nested", nested)
+        element._put_unprocessed_operation_request(
+            TransferPlanRequest(plan, ar.get_callback())
+        )
+        process(element, 4)
+        self.assertEqual(
+            ar.get_result(),
+            [
+                None,
+                [uint_to_bitarray(1, 8), uint_to_bitarray(2, 8)],
+                uint_to_bitarray(3, 8),
+            ],
+        )
+
+    def test_plan_cached(self):
+        element = Element()
+        created = []
+
+        def create_operation() -> Collect:
+            created.append(None)
+            return nested()
+
+        plan = element._get_transfer_plan("nested", create_operation)
+        plan_copy = element._get_transfer_plan("nested", create_operation)
+        self.assertEqual(len(created), 1)
+        self.assertIsNot(plan, plan_copy)
+        self.assertIsNot(plan.get_leaves()[0], plan_copy.get_leaves()[0])
+
+        element._get_transfer_plan("other", create_operation)
+        self.assertEqual(len(created), 2)
+
+    def test_sequence_not_split_by_priority(self):
+        element = Element()
+        element._put_unprocessed_operation_request(
+            [
+                SequenceTransferOperationRequest(nested()),
+                SingleTransferOperationRequest(Read(5)),
+            ]
+        )
+        self.assertEqual(next(element).operation, Write(1))
+        element._put_unprocessed_operation_request(
+            SingleTransferOperationRequest(Read(6)), priority=OperationPriority.HIGH
+        )
+        self.assertEqual(
+            [next(element).operation for _ in range(5)],
+            [Read(2), Read(3), Read(4), Read(6), Read(5)],
+        )
+        self.assertFalse(element.has_pending_operation_request())
+        self.assertEqual(next(element).operation, Write(0))
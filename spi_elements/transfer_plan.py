@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Callable, List, Optional
+
+from spi_elements.async_return import ChainedCallback, fail_callback
+from spi_elements.spi_operation_request_iterator import SingleTransferOperationRequest
+from spi_operation import SingleTransferOperation
+from operation_base import OperationBase
+
+
+class TransferPlan:
+    """Flat plan of an operation tree, i.e. of a SingleTransferOperation or a
+    (nested) SequenceTransferOperation.
+
+    The tree is compiled once into the list of its leaves, which are the
+    SingleTransferOperations in the order of transfer. The leaves of a plan
+    are processed in order by the fifo of a SpiElement, therefore the plan is
+    completed by the response to its last leaf. Only the last leaf gets a
+    callback, which parses the response of the entire tree. The other leaves
+    do not require a callback (their response is set by the SpiClient).
+
+    Plans of frequently requested operation trees can be cached and copied,
+    see SpiElementBase._get_transfer_plan().
+    """
+
+    def __init__(self, operation: OperationBase) -> None:
+        """Compile the plan of the operation tree.
+
+        :param operation: root of the tree. The plan takes ownership of it,
+        i.e. the responses are written into the operations of the tree.
+        """
+        leaves = operation.get_single_transfer_operations()
+        for leaf in leaves:
+            if not isinstance(leaf, SingleTransferOperation):
+                raise ValueError(
+                    f"Operation must be of type SingleTransferOperation, but got {leaf} of type {type(leaf)}"
+                )
+
+        self._operation = operation
+        self._leaves: List[SingleTransferOperation] = leaves
+
+    def __repr__(self) -> str:
+        return f"TransferPlan: operation={self._operation}"
+
+    def __len__(self) -> int:
+        """Returns the number of spi transfers of the plan."""
+        return len(self._leaves)
+
+    def copy(self) -> TransferPlan:
+        """Return a plan of a copy of the operation tree, which has its own
+        responses."""
+        return TransferPlan(self._operation.copy())
+
+    def get_operation(self) -> OperationBase:
+        return self._operation
+
+    def get_leaves(self) -> List[SingleTransferOperation]:
+        return self._leaves
+
+    def create_operation_requests(
+        self, callback: Optional[Callable[..., None]] = None
+    ) -> List[SingleTransferOperationRequest]:
+        """Create the operation requests of all leaves in order of transfer.
+
+        :param callback: called with the parsed response of the operation tree
+        after the last leaf has been processed.
+        """
+        op_reqs = [SingleTransferOperationRequest(leaf) for leaf in self._leaves]
+        if callback is not None:
+            operation = self._operation
+
+            def complete(_: Any) -> None:
+                callback(operation.get_parsed_response())
+
+            # The plan fails, if its last leaf is dropped (see fail_callback()).
+            op_reqs[-1].callback = ChainedCallback(
+                complete, lambda exception: fail_callback(callback, exception)
+            )
+        return op_reqs
+
+
+@dataclass
+class TransferPlanRequest:
+    plan: TransferPlan
+    callback: Optional[Callable[..., None]] = None
@@ -0,0 +1,123 @@
+"""Benchmark of enqueueing nested operation trees into a SpiElement.
+
+- recursive: the previous flattening by SpiElementBase, which created a
+  closure, a list of responses and a SequenceTransferOperationRequest per
+  level of the tree.
+- plan: the operation tree is compiled into a TransferPlan.
+- cached plan: a copy of the cached TransferPlan is enqueued (like
+  Ads866x.initialize()), i.e. the tree is not constructed again.
+
+Each workload enqueues the tree, takes all operation requests from the fifo
+and calls their callbacks with a zero response.
+
+Usage:
+    python3 spi_elements/transfer_plan_benchmark.py
+"""
+
+from timeit import repeat
+from typing import Any, Callable
+
+from util import uint_to_bitarray
+from spi_operation import SingleTransferOperation
+from spi_elements.spi_operation_request_iterator import (
+    SequenceTransferOperationRequest,
+    SingleTransferOperationRequest,
+    OperationPriority,
+)
+from spi_elements.transfer_plan import TransferPlanRequest
+from device_implementation.adc.ads866x import (
+    Ads866x,
+    Ads866xInputRange,
+    Initialize,
+    WriteVerifyWord,
+)
+
+
+def put_recursive(adc: Ads866x, x: SequenceTransferOperationRequest) -> None:
+    ops = x.operation.get_operations()
+    sequence_callback = x.callback
+
+    responses = []
+
+    def collect_ops_responses(response: Any):
+        responses.append(response)
+        if len(responses) == len(ops) and sequence_callback:
+            sequence_callback(x.operation.get_parsed_response())
+        return None
+
+    for op in ops:
+        if isinstance(op, SingleTransferOperation):
+            adc._operation_requests[OperationPriority.NORMAL].put(
+                SingleTransferOperationRequest(op, callback=collect_ops_responses)
+            )
+        else:
+            put_recursive(
+                adc, SequenceTransferOperationRequest(op, collect_ops_responses)
+            )
+
+
+def drain(adc: Ads866x) -> None:
+    while adc.has_pending_operation_request():
+        op_req = next(adc)
+        if op_req.operation.get_response_required():
+            op_req.operation.set_response(
+                uint_to_bitarray(0, op_req.operation.get_bitlength())
+            )
+        if op_req.callback:
+            try:
+                op_req.callback(op_req.operation.get_parsed_response())
+            except ValueError:
+                # Initialize fails the verification of zero responses.
+                pass
+
+
+def best_of(stmt, number: int) -> float:
+    """Return the best time per call in seconds."""
+    return min(repeat(stmt, number=number, repeat=5)) / number
+
+
+def discard(_: Any) -> None:
+    return None
+
+
+if __name__ == "__main__":
+    adc = Ads866x()
+    input_range = Ads866xInputRange.UNIPOLAR_5V12
+    addr = uint_to_bitarray(0x014, 9)
+    data = uint_to_bitarray(0xDEADBEEF, 32)
+
+    def workloads(name: str, create_operation: Callable[[], Any]):
+        def recursive() -> None:
+            put_recursive(
+                adc, SequenceTransferOperationRequest(create_operation(), discard)
+            )
+            drain(adc)
+
+        def plan() -> None:
+            adc._put_unprocessed_operation_request(
+                SequenceTransferOperationRequest(create_operation(), discard)
+            )
+            drain(adc)
+
+        def cached_plan() -> None:
+            adc._put_unprocessed_operation_request(
+                TransferPlanRequest(
+                    adc._get_transfer_plan(name, create_operation), discard
+                )
+            )
+            drain(adc)
+
+        return [
+            ("recursive", recursive),
+            ("plan", plan),
+            ("cached plan", cached_plan),
+        ]
+
+    print(f"{'tree':<18} {'workload':<12} {'per call [us]':>14}")
+    for name, create_operation, number in [
+        ("WriteVerifyWord", lambda: WriteVerifyWord(addr=addr, data=data), 2_000),
+        ("Initialize", lambda: Initialize(input_range), 500),
+    ]:
+        for workload_name, workload in workloads(name, create_operation):
+            t = best_of(workload, number)
+            print(f"{name:<18} {workload_name:<12} {t * 1e6:>14.2f}")
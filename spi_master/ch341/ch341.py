@@ -116,7 +116,11 @@ class CH341(SpiMasterBase):
             return self._transfer_posix(cs, buf)
 
     def _transfer_win(self, cs: int, buf: bytearray) -> bytearray:
-        cbuf = (c_uint8 * len(buf)).from_buffer(super().reverse_bit_order(buf))
+        # The CH341 is operated in LSB first mode on windows, because
+        # SPI_DATA_MODE_MSB does not work as documented. The buffer is owned by
+        # this method and reversed in place before and after the transfer.
+        self.reverse_bit_order_inplace(buf)
+        cbuf = (c_uint8 * len(buf)).from_buffer(buf)
 
         ret = c_bool(
             ch341dll.CH341StreamSPI4(  # pyright: ignore
@@ -131,7 +135,8 @@ class CH341(SpiMasterBase):
                 f"CH341StreamSPI4({self._id}, {hex(SPI_CS_STATE_USED | cs)}, {len(buf)}, {byref(cbuf)}) failed."
             )
 
-        return super().reverse_bit_order(bytearray(cbuf))
+        self.reverse_bit_order_inplace(buf)
+        return buf
 
     def _transfer_posix(self, cs: int, buf: bytearray) -> bytearray:
         cbuf = (c_uint8 * len(buf)).from_buffer(buf)
@@ -1,6 +1,10 @@
 from abc import ABC, abstractmethod
 from typing import TypeVar
 
+# Translation table mapping every byte value to the byte value with reversed
+# bit order, e.g. 0b0000_0001 -> 0b1000_0000.
+_reverse_bit_order_table = bytes(int(f"{byte:08b}"[::-1], 2) for byte in range(256))
+
 
 class SpiMasterBase(ABC):
     @abstractmethod
@@ -14,7 +18,8 @@ class SpiMasterBase(ABC):
     @abstractmethod
     def transfer(self, cs: int, buf: bytearray) -> bytearray:
         """Transfer content of 'buf' via SPI bus with chip select 'cs' enabled and
-        receive bytes
+        receive bytes. The bytes are transmitted in order and each byte MSB
+        first.
 
         :param cs: id of chip select used for SPI transfer
         :param buf: bytearray containing bytes to be sent
@@ -29,15 +34,23 @@ class SpiMasterBase(ABC):
         :param buf: buffer of bytes to reverse the bit order
         :return: bytearray of bytes with reversed bit order
         """
-        result = bytearray(len(buf))
-        for i, byte in enumerate(buf):
-            reversed_byte = 0
-            for j in range(8):
-                reversed_byte <<= 1  # shift left
-                reversed_byte |= byte & 1
-                byte >>= 1  # shift right
-            result[i] = reversed_byte
-        return result
+        return bytearray(buf).translate(_reverse_bit_order_table)
+
+    @staticmethod
+    def reverse_bit_order_inplace(buf: bytearray | memoryview) -> None:
+        """Reverse the bit order of individual bytes in a writable buffer in
+        place. This allows for sw implementation of MSB/LSB first without
+        allocating a result buffer for the caller.
+
+        :param buf: writable buffer of bytes (e.g. bytearray or ctypes array)
+        to reverse the bit order
+        """
+        if isinstance(buf, bytearray):
+            buf[:] = buf.translate(_reverse_bit_order_table)
+            return
+
+        with memoryview(buf) as view, view.cast("B") as byte_view:
+            byte_view[:] = byte_view.tobytes().translate(_reverse_bit_order_table)
 
 
 SpiMaster = TypeVar("SpiMaster", bound=SpiMasterBase)
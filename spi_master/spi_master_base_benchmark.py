@@ -0,0 +1,49 @@
+"""Throughput benchmark of SpiMasterBase.reverse_bit_order() and
+SpiMasterBase.reverse_bit_order_inplace() against the previous implementation,
+which reversed the bits of every byte with a python loop.
+
+Usage:
+    python3 spi_master/spi_master_base_benchmark.py
+"""
+
+from os import urandom
+from timeit import repeat
+
+from spi_master.spi_master_base import SpiMasterBase
+
+
+def reverse_bit_order_loop(buf: bytearray) -> bytearray:
+    result = bytearray(len(buf))
+    for i, byte in enumerate(buf):
+        reversed_byte = 0
+        for _ in range(8):
+            reversed_byte <<= 1
+            reversed_byte |= byte & 1
+            byte >>= 1
+        result[i] = reversed_byte
+    return result
+
+
+def throughput(stmt, nbytes: int) -> float:
+    """Return the best throughput in MiB/s."""
+    number = max(1, 2**16 // nbytes)
+    t = min(repeat(stmt, number=number, repeat=5)) / number
+    return nbytes / t / 2**20
+
+
+if __name__ == "__main__":
+    # 3 byte == one Pss frame with the previous chain layout
+    sizes = [3, 11, 64, 1024, 2**16]
+
+    print(f"{'size [B]':>10} {'loop':>12} {'table':>12} {'inplace':>12}  [MiB/s]")
+    for nbytes in sizes:
+        buf = bytearray(urandom(nbytes))
+        if reverse_bit_order_loop(buf) != SpiMasterBase.reverse_bit_order(buf):
+            raise RuntimeError(f"Mismatch of reversed bit order for {nbytes=}")
+
+        loop = throughput(lambda: reverse_bit_order_loop(buf), nbytes)
+        table = throughput(lambda: SpiMasterBase.reverse_bit_order(buf), nbytes)
+        inplace = throughput(
+            lambda: SpiMasterBase.reverse_bit_order_inplace(buf), nbytes
+        )
+        print(f"{nbytes:>10} {loop:>12.1f} {table:>12.1f} {inplace:>12.1f}")
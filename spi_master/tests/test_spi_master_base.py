@@ -0,0 +1,33 @@
+import unittest
+from ctypes import c_uint8
+
+from spi_master.spi_master_base import SpiMasterBase
+
+
+class TestSpiMasterBase(unittest.TestCase):
+    buf = bytearray(b"\x01\x80\x0f\xa5\x00\xff")
+    buf_reversed = bytearray(b"\x80\x01\xf0\xa5\x00\xff")
+
+    def test_reverse_bit_order(self):
+        result = SpiMasterBase.reverse_bit_order(self.buf)
+        self.assertIsInstance(result, bytearray)
+        self.assertEqual(result, self.buf_reversed)
+        self.assertEqual(SpiMasterBase.reverse_bit_order(result), self.buf)
+
+    def test_reverse_bit_order_all_bytes(self):
+        buf = bytearray(range(256))
+        result = SpiMasterBase.reverse_bit_order(buf)
+        for byte, reversed_byte in zip(buf, result):
+            self.assertEqual(f"{byte:08b}"[::-1], f"{reversed_byte:08b}")
+
+    def test_reverse_bit_order_inplace(self):
+        buf = bytearray(self.buf)
+        SpiMasterBase.reverse_bit_order_inplace(buf)
+        self.assertEqual(buf, self.buf_reversed)
+
+    def test_reverse_bit_order_inplace_ctypes(self):
+        buf = bytearray(self.buf)
+        cbuf = (c_uint8 * len(buf)).from_buffer(buf)
+        SpiMasterBase.reverse_bit_order_inplace(cbuf)
+        self.assertEqual(bytearray(cbuf), self.buf_reversed)
+        self.assertEqual(buf, self.buf_reversed)
@@ -1,2 +1,3 @@
 from single_transfer_operation import SingleTransferOperation
 from sequence_transfer_operation import SequenceTransferOperation
+from constant_operation import constant_operation
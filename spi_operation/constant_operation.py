@@ -0,0 +1,37 @@
+from __future__ import annotations
+
+from functools import wraps
+from typing import Tuple, Type, TypeVar
+
+from bitarray import frozenbitarray
+
+from single_transfer_operation import SingleTransferOperation
+
+ConstantOperation = TypeVar("ConstantOperation", bound=Type[SingleTransferOperation])
+
+
+def constant_operation(cls: ConstantOperation) -> ConstantOperation:
+    """Class decorator for SingleTransferOperations without parameters, i.e.
+    whose command is the same for every instance.
+
+    The command is assembled only once by the __init__() of the class, when
+    the first instance is created. It is frozen and shared by all instances,
+    such that an instance only owns its response.
+    """
+    init = cls.__init__
+    template: Tuple[frozenbitarray, bool] | None = None
+
+    @wraps(init)
+    def __init__(self: SingleTransferOperation) -> None:
+        nonlocal template
+        if template is None:
+            init(self)
+            template = (frozenbitarray(self.get_command()), self._response_required)
+
+        command, response_required = template
+        SingleTransferOperation.__init__(
+            self, command=command, response_required=response_required
+        )
+
+    cls.__init__ = __init__
+    return cls
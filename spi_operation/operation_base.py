@@ -32,6 +32,13 @@ class OperationBase(ABC):
     def __eq__(self, other: object, /) -> bool:
         """Checks if the two operations are equal."""
 
+    @abstractmethod
+    def copy(self) -> OperationBase:
+        """Return a copy of the operation, which has its own response(s).
+
+        Commands are never modified after construction and are therefore shared
+        with the copy."""
+
     @abstractmethod
     def get_single_transfer_operations(
         self,
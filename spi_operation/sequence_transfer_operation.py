@@ -1,4 +1,5 @@
-from copy import deepcopy
+from __future__ import annotations
+
 from typing import Any, List, Sequence
 
 from operation_base import OperationBase
@@ -10,7 +11,9 @@ class SequenceTransferOperation(OperationBase):
         if not operations:
             raise ValueError(f"Excpected a non-empty list, but got {operations}")
 
-        self._operations = deepcopy(operations)
+        # Copy the operations (not the commands), such that responses do not
+        # leak between sequences constructed from the same operations.
+        self._operations = [op.copy() for op in operations]
 
     def __repr__(self) -> str:
         return f"SequenceTransferOperation: operations={self._operations}"
@@ -27,6 +30,13 @@ class SequenceTransferOperation(OperationBase):
         else:
             return False
 
+    def copy(self) -> SequenceTransferOperation:
+        """Return a copy of the sequence with copies of all its operations."""
+        seq = self.__class__.__new__(self.__class__)
+        seq.__dict__.update(self.__dict__)
+        seq._operations = [op.copy() for op in self._operations]
+        return seq
+
     def get_operations(self) -> Sequence[OperationBase]:
         return self._operations
 
@@ -55,6 +55,14 @@ class SingleTransferOperation(OperationBase):
         else:
             return False
 
+    def copy(self) -> SingleTransferOperation:
+        """Return a shallow copy of the operation. The command is shared and the
+        response slot is replaced on the next set_response() of either
+        operation, such that responses do not leak between the copies."""
+        op = self.__class__.__new__(self.__class__)
+        op.__dict__.update(self.__dict__)
+        return op
+
     def set_response(self, response: bitarray) -> None:
         if not self._response_required:
             raise ValueError("operation does not require a response.")
@@ -0,0 +1,37 @@
+import unittest
+
+from bitarray import bitarray
+
+from single_transfer_operation import SingleTransferOperation
+from constant_operation import constant_operation
+
+
+@constant_operation
+class ConstantOperation(SingleTransferOperation):
+    instances = 0
+
+    def __init__(self):
+        ConstantOperation.instances += 1
+        super().__init__(bitarray("0001000100"), response_required=True)
+
+
+class TestConstantOperation(unittest.TestCase):
+    def test_command_shared(self):
+        op_1 = ConstantOperation()
+        op_2 = ConstantOperation()
+        self.assertIs(op_1.get_command(), op_2.get_command())
+        self.assertEqual(op_1.get_command(), bitarray("0001000100"))
+        self.assertEqual(ConstantOperation.instances, 1)
+
+    def test_command_immutable(self):
+        op = ConstantOperation()
+        with self.assertRaises(TypeError):
+            op.get_command()[0] = 1
+
+    def test_response_not_shared(self):
+        op_1 = ConstantOperation()
+        op_2 = ConstantOperation()
+        op_1.set_response(bitarray("1111100000"))
+        self.assertEqual(op_1.get_response(), bitarray("1111100000"))
+        self.assertEqual(op_2.get_response(), None)
+        self.assertTrue(op_2.get_response_required())
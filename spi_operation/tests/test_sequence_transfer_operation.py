@@ -130,3 +130,29 @@ class TestSequenceTransferOperation(unittest.TestCase):
         parsed_rsp = op.get_parsed_response()
 
         self.assertIs(parsed_rsp, None)
+
+    def test_copy(self):
+        op = SequenceTransferOperation(
+            [self.single_op, SequenceTransferOperation([self.single_op])]
+        )
+        op_copy = op.copy()
+        self.assertIsNot(op_copy, op)
+        self.assertEqual(op_copy, op)
+        for leaf, leaf_copy in zip(
+            op.get_single_transfer_operations(),
+            op_copy.get_single_transfer_operations(),
+        ):
+            self.assertIsNot(leaf_copy, leaf)
+            self.assertIs(leaf_copy.get_command(), leaf.get_command())
+
+    def test_responses_not_shared(self):
+        single_op = SingleTransferOperation(self.op_cmd_10_bit, response_required=True)
+        op = SequenceTransferOperation([single_op, single_op])
+        op_2 = SequenceTransferOperation([single_op])
+
+        leafs = op.get_single_transfer_operations()
+        leafs[0].set_response(self.op_rsp_10_bit)
+        self.assertIsNot(leafs[0], leafs[1])
+        self.assertEqual(leafs[1].get_response(), None)
+        self.assertEqual(op_2.get_single_transfer_operations()[0].get_response(), None)
+        self.assertEqual(single_op.get_response(), None)
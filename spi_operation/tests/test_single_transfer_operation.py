@@ -118,3 +118,14 @@ class TestSingleTransferOperation(unittest.TestCase):
         op = SingleTransferOperation(self.op_cmd_10_bit, response_required=False)
         parsed_rsp = op.get_parsed_response()
         self.assertIs(parsed_rsp, None)
+
+    def test_copy(self):
+        op = SingleTransferOperation(self.op_cmd_10_bit, response_required=True)
+        op_copy = op.copy()
+        self.assertIsNot(op_copy, op)
+        self.assertEqual(op_copy, op)
+        self.assertIs(op_copy.get_command(), op.get_command())
+
+        op_copy.set_response(self.op_rsp_10_bit)
+        self.assertEqual(op_copy.get_response(), self.op_rsp_10_bit)
+        self.assertIs(op.get_response(), None)
@@ -1,2 +1,15 @@
 from util.util_str import reverse_string
-from util.util_bitarray import uint_to_bitarray, bitarray_to_uint, concat_bitarray
+from util.util_bitarray import (
+    uint_to_bitarray,
+    bitarray_to_uint,
+    bitarray_to_bytes,
+    bytes_to_bitarray,
+    concat_bitarray,
+    FrameLayout,
+    FrameTemplate,
+)
+from util.util_ndarray import (
+    bytes_to_uint_ndarray,
+    uint_ndarray_to_bytes,
+    extract_bitfield_ndarray,
+)
@@ -2,7 +2,16 @@ import unittest
 
 from bitarray import bitarray
 
-from util.util_bitarray import uint_to_bitarray, bitarray_to_uint, concat_bitarray
+from util import reverse_string
+from util.util_bitarray import (
+    uint_to_bitarray,
+    bitarray_to_uint,
+    bitarray_to_bytes,
+    bytes_to_bitarray,
+    concat_bitarray,
+    FrameLayout,
+    FrameTemplate,
+)
 
 
 class TestUtilBitarray(unittest.TestCase):
@@ -36,3 +45,108 @@ class TestUtilBitarray(unittest.TestCase):
         self.assertEqual(
             concat_bitarray(self.len8_val9, self.len4_val12), bitarray("100100000011")
         )
+
+    def test_uint_to_bitarray_roundtrip(self):
+        for bitlen in [1, 4, 9, 12, 16, 24, 32]:
+            for n in [0, 1, 2 ** (bitlen - 1), 2**bitlen - 1]:
+                ba = uint_to_bitarray(n=n, bitlen=bitlen)
+                self.assertEqual(len(ba), bitlen)
+                self.assertEqual(bitarray_to_uint(ba), n)
+
+    def test_uint_to_bitarray_lsb_first(self):
+        self.assertEqual(uint_to_bitarray(n=0x069, bitlen=9), bitarray("100101100"))
+        self.assertEqual(uint_to_bitarray(n=0x601234, bitlen=24)[0:4], bitarray("0010"))
+
+    def test_uint_to_bitarray_out_of_range(self):
+        with self.assertRaises(ValueError):
+            _ = uint_to_bitarray(n=16, bitlen=4)
+        with self.assertRaises(ValueError):
+            _ = uint_to_bitarray(n=-1, bitlen=4)
+
+    def test_bitarray_to_uint_endianness(self):
+        self.assertEqual(bitarray_to_uint(bitarray("100101100", endian="big")), 0x069)
+        self.assertEqual(
+            bitarray_to_uint(bitarray("100101100", endian="little")), 0x069
+        )
+
+    def test_concat_bitarray_003(self):
+        self.assertEqual(
+            concat_bitarray(self.len4_val12, self.len8_val9, self.len4_val12),
+            bitarray("0011 10010000 0011"),
+        )
+
+    def test_frame_layout_assemble(self):
+        layout = FrameLayout({"low": 4, "high": 8})
+        self.assertEqual(layout.get_bitlength(), 12)
+        self.assertEqual(layout.get_slice("high"), slice(4, 12))
+        self.assertEqual(
+            layout.assemble(self.len4_val12, self.len8_val9),
+            concat_bitarray(self.len4_val12, self.len8_val9),
+        )
+
+    def test_frame_layout_names(self):
+        self.assertEqual(
+            FrameLayout({"low": 4, "high": 8}).get_names(), ("low", "high")
+        )
+        self.assertEqual(FrameLayout([4, 8]).get_names(), (0, 1))
+
+    def test_frame_layout_assemble_wrong_field(self):
+        layout = FrameLayout([4, 8])
+        with self.assertRaises(ValueError):
+            _ = layout.assemble(self.len8_val9, self.len4_val12)
+        with self.assertRaises(ValueError):
+            _ = layout.assemble(self.len4_val12)
+
+    def test_frame_template_build(self):
+        layout = FrameLayout({"low": 4, "mid": 8, "high": 4})
+        template = FrameTemplate(layout, {"high": self.len4_val12})
+        self.assertEqual(
+            template.build(mid=self.len8_val9),
+            layout.assemble(bitarray("0000"), self.len8_val9, self.len4_val12),
+        )
+        self.assertEqual(
+            template.build(),
+            layout.assemble(bitarray("0000"), bitarray(8 * "0"), self.len4_val12),
+        )
+
+    def test_frame_template_build_independent_frames(self):
+        template = FrameTemplate(FrameLayout({"low": 4, "high": 8}))
+        frame = template.build(low=self.len4_val12)
+        frame.setall(1)
+        self.assertEqual(template.build(), bitarray(12 * "0"))
+
+    def test_frame_template_wrong_field(self):
+        layout = FrameLayout({"low": 4, "high": 8})
+        with self.assertRaises(ValueError):
+            _ = FrameTemplate(layout, {"low": self.len8_val9})
+        template = FrameTemplate(layout)
+        with self.assertRaises(ValueError):
+            _ = template.build(high=self.len4_val12)
+        with self.assertRaises(ValueError):
+            _ = template.build(unknown=self.len4_val12)
+
+    def test_bitarray_to_bytes(self):
+        self.assertEqual(
+            bitarray_to_bytes(uint_to_bitarray(0x601234, 24)), b"\x60\x12\x34"
+        )
+        self.assertEqual(bitarray_to_bytes(self.len8_val9), b"\x09")
+        self.assertEqual(bitarray_to_bytes(bitarray("0011", endian="little")), b"\xc0")
+
+    def test_bitarray_to_bytes_legacy(self):
+        for ba in [self.len4_val12, self.len8_val9, uint_to_bitarray(0xBADC0DED, 32)]:
+            for endian in ["big", "little"]:
+                legacy = bytearray(bitarray(ba, endian="big")[::-1].tobytes())
+                self.assertEqual(bitarray_to_bytes(bitarray(ba, endian=endian)), legacy)
+
+    def test_bytes_to_bitarray(self):
+        self.assertEqual(bytes_to_bitarray(b"\x09"), self.len8_val9)
+        self.assertEqual(
+            bytes_to_bitarray(b"\x60\x12\x34"), uint_to_bitarray(0x601234, 24)
+        )
+
+    def test_bytes_to_bitarray_legacy(self):
+        buf = bytearray(b"\xba\xdc\x0d\xed\x01")
+        legacy = bitarray(reverse_string("".join(format(byte, "08b") for byte in buf)))
+        self.assertEqual(bytes_to_bitarray(buf), legacy)
+        self.assertEqual(buf, bytearray(b"\xba\xdc\x0d\xed\x01"))
+        self.assertEqual(bitarray_to_bytes(bytes_to_bitarray(buf)), buf)
@@ -0,0 +1,73 @@
+import unittest
+
+import numpy as np
+
+from util.util_bitarray import uint_to_bitarray, bitarray_to_bytes
+from util.util_ndarray import (
+    bytes_to_uint_ndarray,
+    uint_ndarray_to_bytes,
+    extract_bitfield_ndarray,
+)
+
+
+class TestUtilNdarray(unittest.TestCase):
+    codes = [0x000000, 0x601234, 0x800001, 0xFFFFFF]
+
+    def test_bytes_to_uint_ndarray(self):
+        buf = b"".join(bitarray_to_bytes(uint_to_bitarray(n, 24)) for n in self.codes)
+        codes = bytes_to_uint_ndarray(buf, 24)
+        self.assertEqual(codes.dtype, np.uint64)
+        self.assertEqual(codes.tolist(), self.codes)
+
+    def test_bytes_to_uint_ndarray_padded(self):
+        codes = [0b1011001101, 0b0000000001, 0b1111111111]
+        buf = b"".join(bitarray_to_bytes(uint_to_bitarray(n, 10)) for n in codes)
+        self.assertEqual(bytes_to_uint_ndarray(buf, 10).tolist(), codes)
+
+    def test_bytes_to_uint_ndarray_64_bit(self):
+        buf = bitarray_to_bytes(uint_to_bitarray(2**64 - 2, 64))
+        self.assertEqual(bytes_to_uint_ndarray(buf, 64).tolist(), [2**64 - 2])
+
+    def test_bytes_to_uint_ndarray_invalid(self):
+        with self.assertRaises(ValueError):
+            bytes_to_uint_ndarray(b"\x00\x00\x00\x00", 24)
+        with self.assertRaises(ValueError):
+            bytes_to_uint_ndarray(b"\x00" * 9, 72)
+
+    def test_uint_ndarray_to_bytes(self):
+        buf = b"".join(bitarray_to_bytes(uint_to_bitarray(n, 24)) for n in self.codes)
+        self.assertEqual(uint_ndarray_to_bytes(np.array(self.codes), 24), buf)
+
+        codes = [0b1011001101, 0b0000000001]
+        buf = b"".join(bitarray_to_bytes(uint_to_bitarray(n, 10)) for n in codes)
+        self.assertEqual(uint_ndarray_to_bytes(codes, 10), buf)
+
+    def test_uint_ndarray_to_bytes_invalid(self):
+        with self.assertRaises(ValueError):
+            uint_ndarray_to_bytes([0x1000000], 24)
+        with self.assertRaises(ValueError):
+            uint_ndarray_to_bytes([-1], 24)
+
+    def test_round_trip(self):
+        codes = np.arange(0, 2**16, 7, dtype=np.uint64)
+        buf = uint_ndarray_to_bytes(codes, 16)
+        self.assertEqual(len(buf), 2 * len(codes))
+        np.testing.assert_array_equal(bytes_to_uint_ndarray(buf, 16), codes)
+
+    def test_extract_bitfield_ndarray(self):
+        frames = [uint_to_bitarray(n, 24) for n in self.codes]
+        codes = np.array(self.codes, dtype=np.uint64)
+        for offset, bitlen in [(0, 1), (0, 24), (4, 12), (20, 4)]:
+            expected = [
+                int.from_bytes(frame[offset : offset + bitlen].tobytes(), "little")
+                for frame in frames
+            ]
+            self.assertEqual(
+                extract_bitfield_ndarray(codes, offset, bitlen).tolist(), expected
+            )
+
+    def test_extract_bitfield_ndarray_invalid(self):
+        with self.assertRaises(ValueError):
+            extract_bitfield_ndarray([0], 60, 5)
+        with self.assertRaises(ValueError):
+            extract_bitfield_ndarray([0], 0, 0)
@@ -1,15 +1,87 @@
+from __future__ import annotations
+
+from typing import Dict, Hashable, Mapping, Sequence, Tuple
+from itertools import accumulate
 from bitarray import bitarray
-from functools import reduce
-from operator import add
-from util import reverse_string
+
+# Bitarrays representing unsigned integers are ordered LSB first, i.e. index 0
+# of the bitarray is the least significant bit. The conversion functions below
+# return bitarrays with endianness "little", because then the in-memory layout
+# matches the little-endian byte order used by int.to_bytes()/int.from_bytes()
+# and no intermediate strings or bit-reversal passes are required.
+#
+# Wire representation of frames: the command of a SingleTransferOperation is a
+# bitarray with endianness "little" and index 0 == LSB of the frame, from its
+# construction up to SpiClient. SpiClient converts it with bitarray_to_bytes()
+# into the bytearray passed to SpiMasterBase.transfer(), which is transmitted
+# MSB first (most significant byte first, most significant bit of each byte
+# first). The received bytearray is converted back with bytes_to_bitarray().
+# Bit order reversal is only done by SpiMasters, whose hardware requires it.
+#
+# New bitarrays are created by copying the empty template below, because
+# passing the endianness to the bitarray constructor is several times slower
+# than the copy.
+_empty_little_endian_bitarray = bitarray(0, "little")
 
 
 def uint_to_bitarray(n: int, bitlen: int) -> bitarray:
-    return bitarray(reverse_string(bin(n)[2:].zfill(bitlen)))
+    """Convert the unsigned integer 'n' into a bitarray of length 'bitlen'.
+
+    :param n: unsigned integer, must be representable with 'bitlen' bits.
+    :param bitlen: number of bits of the returned bitarray.
+    :return: bitarray with index 0 == LSB of 'n'.
+    """
+    if n < 0 or n.bit_length() > bitlen:
+        raise ValueError(
+            f"Expected unsigned integer representable with {bitlen} bits, but got {n=}"
+        )
+
+    ba = _empty_little_endian_bitarray.copy()
+    ba.frombytes(n.to_bytes((bitlen + 7) // 8, "little"))
+    del ba[bitlen:]
+    return ba
 
 
 def bitarray_to_uint(ba: bitarray) -> int:
-    return int(reverse_string(ba.to01()), 2)
+    """Convert the bitarray 'ba' with index 0 == LSB into an unsigned integer."""
+    if ba.endian() != "little":
+        ba = bitarray(ba, endian="little")
+    return int.from_bytes(ba.tobytes(), "little")
+
+
+def bitarray_to_bytes(ba: bitarray) -> bytearray:
+    """Convert the bitarray 'ba' with index 0 == LSB into bytes in transfer
+    order, i.e. most significant byte first. If the bitlength is not a multiple
+    of 8, the bitarray is padded with zeros at the LSB end (transferred last).
+
+    :return: bytearray, which is the only allocation of the conversion.
+    """
+    pad = -len(ba) % 8
+    if pad or ba.endian() != "little":
+        buf = bytearray((len(ba) + pad) // 8)
+        view = bitarray(buffer=buf, endian="little")
+        view[pad:] = ba
+        del view
+    else:
+        buf = bytearray(ba)
+
+    buf.reverse()
+    return buf
+
+
+def bytes_to_bitarray(buf: bytes | bytearray) -> bitarray:
+    """Convert bytes in transfer order (most significant byte first) into a
+    bitarray with index 0 == LSB, i.e. the LSB of the last byte.
+
+    :return: bitarray, which is the only allocation of the conversion.
+    """
+    ba = _empty_little_endian_bitarray.copy()
+    ba.frombytes(buf)
+    # Reversing all bits reverses the byte order and the bit order within the
+    # bytes. The second pass restores the bit order within the bytes.
+    ba.reverse()
+    ba.bytereverse()
+    return ba
 
 
 def concat_bitarray(*args: bitarray) -> bitarray:
@@ -20,4 +92,146 @@ def concat_bitarray(*args: bitarray) -> bitarray:
                 f"Expected argument of type bitarray but got {arg}, which is of type {type(arg)}."
             )
 
-    return reduce(add, args)
+    frame = _empty_little_endian_bitarray.copy()
+    for arg in args:
+        frame += arg
+    return frame
+
+
+class FrameLayout:
+    """Fixed layout of consecutive bitfields within a frame. The first field is
+    the least significant field, i.e. it starts at index 0 of the frame.
+
+    The offsets of all fields are computed once, such that fields can be
+    accessed by their slice without recomputation. Frames are assembled in a
+    single bitarray, which is extended in place by every field. (Writing the
+    fields into a preallocated frame by slice assignment is slower in CPython,
+    because of the per-slice overhead.)
+    """
+
+    def __init__(self, bitlens: Mapping[Hashable, int] | Sequence[int]) -> None:
+        """Create the layout from the bitlength of every field.
+
+        :param bitlens: bitlength of the fields (first == LSB). If a mapping is
+        given, the keys are used as names of the fields, otherwise the fields
+        are named by their index.
+        """
+        if not isinstance(bitlens, Mapping):
+            bitlens = dict(enumerate(bitlens))
+        for name, bitlen in bitlens.items():
+            if bitlen < 0:
+                raise ValueError(f"Expected non-negative bitlength, but got {name=}")
+
+        self._bitlens: Tuple[int, ...] = tuple(bitlens.values())
+        self._offsets: Tuple[int, ...] = tuple(accumulate(self._bitlens, initial=0))
+        self._slices: Tuple[slice, ...] = tuple(
+            slice(offset, offset + bitlen)
+            for offset, bitlen in zip(self._offsets, self._bitlens)
+        )
+        self._names: Dict[Hashable, int] = {
+            name: i for i, name in enumerate(bitlens.keys())
+        }
+        self._bitlength: int = self._offsets[-1]
+
+    def __len__(self) -> int:
+        """Returns the number of fields of the layout."""
+        return len(self._bitlens)
+
+    def __repr__(self) -> str:
+        return f"FrameLayout: bitlens={dict(zip(self._names, self._bitlens))}"
+
+    def __eq__(self, other: object, /) -> bool:
+        return (
+            isinstance(other, FrameLayout)
+            and self._bitlens == other._bitlens
+            and self._names == other._names
+        )
+
+    def get_bitlength(self) -> int:
+        """Returns the bitlength of an entire frame."""
+        return self._bitlength
+
+    def get_bitlens(self) -> Tuple[int, ...]:
+        """Returns the bitlength of every field (first == LSB)."""
+        return self._bitlens
+
+    def get_names(self) -> Tuple[Hashable, ...]:
+        """Returns the name of every field (first == LSB)."""
+        return tuple(self._names)
+
+    def get_slice(self, name: Hashable) -> slice:
+        """Returns the slice of the field 'name' within the frame."""
+        return self._slices[self._names[name]]
+
+    def get_slices(self) -> Tuple[slice, ...]:
+        """Returns the slices of all fields within the frame (first == LSB)."""
+        return self._slices
+
+    def assemble(self, *fields: bitarray) -> bitarray:
+        """Assemble a frame from the given fields (first == LSB).
+
+        :return: bitarray of length self.get_bitlength()
+        """
+        if tuple(map(len, fields)) != self._bitlens:
+            raise ValueError(
+                f"Expected fields with bitlengths {self._bitlens} for {self}, but got {fields=}"
+            )
+
+        frame = _empty_little_endian_bitarray.copy()
+        for field in fields:
+            frame += field
+        return frame
+
+
+class FrameTemplate:
+    """Preassembled frame of a FrameLayout with fixed fields. Frames are built
+    by copying the template and patching the variable fields into the copy.
+
+    The fixed fields are validated once, when the template is created. Fields,
+    which are not fixed, are zero in the template. Building a frame only
+    checks the bitlength of the patched fields.
+    """
+
+    def __init__(
+        self, layout: FrameLayout, fields: Mapping[Hashable, bitarray] | None = None
+    ) -> None:
+        """Create the template of 'layout' with the fixed 'fields'.
+
+        :param layout: layout of the frames built from the template.
+        :param fields: mapping of field names to the value of the fixed fields.
+        """
+        self._layout = layout
+        self._fields: Dict[Hashable, Tuple[slice, int]] = {
+            name: (field, bitlen)
+            for name, field, bitlen in zip(
+                layout.get_names(), layout.get_slices(), layout.get_bitlens()
+            )
+        }
+        self._frame = uint_to_bitarray(0, layout.get_bitlength())
+        self._patch(self._frame, fields or {})
+
+    def __repr__(self) -> str:
+        return f"FrameTemplate: layout={self._layout}, frame={self._frame}"
+
+    def get_layout(self) -> FrameLayout:
+        return self._layout
+
+    def build(self, **fields: bitarray) -> bitarray:
+        """Build a frame from the template with the given variable fields.
+
+        :param fields: value of the variable fields by name.
+        :return: bitarray of length self.get_layout().get_bitlength()
+        """
+        frame = self._frame.copy()
+        self._patch(frame, fields)
+        return frame
+
+    def _patch(self, frame: bitarray, fields: Mapping[Hashable, bitarray]) -> None:
+        for name, value in fields.items():
+            try:
+                field, bitlen = self._fields[name]
+            except KeyError:
+                raise ValueError(f"Unknown field {name=} of {self._layout}") from None
+            if len(value) != bitlen:
+                raise ValueError(f"Expected {bitlen}-bit {name}, but got {value=}")
+            frame[field] = value
@@ -0,0 +1,103 @@
+"""Micro-benchmarks of util.util_bitarray.
+
+- uint <-> bitarray conversion against the previous implementation, which
+  converted via intermediate strings.
+- frame assembly of daisy chains against the previous implementation, which
+  concatenated with functools.reduce(operator.add).
+
+Usage:
+    python3 util/util_bitarray_benchmark.py
+"""
+
+from functools import reduce
+from operator import add
+from timeit import repeat
+
+from bitarray import bitarray
+
+from util import (
+    reverse_string,
+    uint_to_bitarray,
+    bitarray_to_uint,
+    concat_bitarray,
+    FrameLayout,
+)
+
+
+def uint_to_bitarray_str(n: int, bitlen: int) -> bitarray:
+    return bitarray(reverse_string(bin(n)[2:].zfill(bitlen)))
+
+
+def bitarray_to_uint_str(ba: bitarray) -> int:
+    return int(reverse_string(ba.to01()), 2)
+
+
+def concat_bitarray_reduce(*args: bitarray) -> bitarray:
+    return reduce(add, args)
+
+
+def best_of(stmt, number: int) -> float:
+    """Return the best time per call in seconds."""
+    return min(repeat(stmt, number=number, repeat=5)) / number
+
+
+def benchmark_uint_conversion() -> None:
+    number = 100_000
+
+    # (name, value, bitlen) of conversions performed during regular operation
+    cases = [
+        ("ad5672 addr", 0x7, 4),
+        ("ad5672 code", 0xABC, 12),
+        ("ads866x addr", 0x014, 9),
+        ("ads866x word", 0xDEADBEEF, 32),
+    ]
+
+    print(
+        f"{'case':<14} {'direction':<10} {'str [ns]':>10} {'int [ns]':>10} {'speedup':>8}"
+    )
+    for name, n, bitlen in cases:
+        ba = uint_to_bitarray(n, bitlen)
+        if ba != uint_to_bitarray_str(n, bitlen):
+            raise RuntimeError(f"Mismatch of conversion for {name}")
+
+        t_str = best_of(lambda: uint_to_bitarray_str(n, bitlen), number)
+        t_int = best_of(lambda: uint_to_bitarray(n, bitlen), number)
+        print(
+            f"{name:<14} {'to ba':<10} {t_str * 1e9:>10.0f} {t_int * 1e9:>10.0f} {t_str / t_int:>7.2f}x"
+        )
+
+        t_str = best_of(lambda: bitarray_to_uint_str(ba), number)
+        t_int = best_of(lambda: bitarray_to_uint(ba), number)
+        print(
+            f"{name:<14} {'to uint':<10} {t_str * 1e9:>10.0f} {t_int * 1e9:>10.0f} {t_str / t_int:>7.2f}x"
+        )
+
+
+def benchmark_frame_assembly() -> None:
+    number = 2_000
+
+    print(
+        f"{'chain length':<14} {'reduce [us]':>12} {'concat [us]':>12} {'layout [us]':>12}"
+    )
+    for chain_length in [3, 16, 128]:
+        # Alternating 24-bit dac words and 32-bit adc words like a Pss chain.
+        fields = [
+            uint_to_bitarray(0xF00000, 24) if i % 3 == 0 else uint_to_bitarray(0, 32)
+            for i in range(chain_length)
+        ]
+        layout = FrameLayout([len(field) for field in fields])
+        if not concat_bitarray_reduce(*fields) == layout.assemble(*fields):
+            raise RuntimeError(f"Mismatch of frame for {chain_length=}")
+
+        t_reduce = best_of(lambda: concat_bitarray_reduce(*fields), number)
+        t_concat = best_of(lambda: concat_bitarray(*fields), number)
+        t_layout = best_of(lambda: layout.assemble(*fields), number)
+        print(
+            f"{chain_length:<14} {t_reduce * 1e6:>12.2f} {t_concat * 1e6:>12.2f} {t_layout * 1e6:>12.2f}"
+        )
+
+
+if __name__ == "__main__":
+    benchmark_uint_conversion()
+    print()
+    benchmark_frame_assembly()
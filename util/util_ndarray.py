@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+import numpy as np
+import numpy.typing as npt
+
+# Batch conversions of many frames of the same bitlength. Frames are stored
+# back to back in transfer order, i.e. the representation produced by
+# util_bitarray.bitarray_to_bytes() (most significant byte first, zero padding
+# at the LSB end, if the bitlength is not a multiple of 8). Codes are unsigned
+# integers in a numpy array of dtype uint64, therefore frames are limited to
+# 64 bits.
+
+_max_bitlen = 64
+
+
+def _check_bitlen(bitlen: int) -> None:
+    if not 0 < bitlen <= _max_bitlen:
+        raise ValueError(f"Expected bitlen in [1, {_max_bitlen}], but got {bitlen=}")
+
+
+def bytes_to_uint_ndarray(
+    buf: bytes | bytearray | memoryview | npt.NDArray[np.uint8], bitlen: int
+) -> npt.NDArray[np.uint64]:
+    """Convert a buffer of consecutive frames of 'bitlen' bits each into an
+    array of unsigned integers.
+
+    :param buf: contiguous buffer of frames in transfer order. The length must
+    be a multiple of the bytes per frame.
+    :param bitlen: number of bits of every frame.
+    :return: numpy array (dtype uint64) with one code per frame.
+    """
+    _check_bitlen(bitlen)
+    nbytes = (bitlen + 7) // 8
+    frames = np.frombuffer(buf, dtype=np.uint8)
+    if frames.size % nbytes:
+        raise ValueError(
+            f"Expected buffer with a multiple of {nbytes} bytes, but got {frames.size} bytes"
+        )
+
+    words = np.zeros((frames.size // nbytes, 8), dtype=np.uint8)
+    words[:, 8 - nbytes :] = frames.reshape(-1, nbytes)
+    codes = words.view(">u8").ravel().astype(np.uint64)
+    codes >>= np.uint64(8 * nbytes - bitlen)
+    return codes
+
+
+def uint_ndarray_to_bytes(codes: npt.ArrayLike, bitlen: int) -> bytearray:
+    """Convert an array of unsigned integers into a buffer of consecutive
+    frames of 'bitlen' bits each.
+
+    :param codes: unsigned integers, every one representable with 'bitlen' bits.
+    :param bitlen: number of bits of every frame.
+    :return: bytearray of frames in transfer order.
+    """
+    _check_bitlen(bitlen)
+    codes = np.asarray(codes)
+    if codes.size and (codes.min() < 0 or int(codes.max()).bit_length() > bitlen):
+        raise ValueError(
+            f"Expected unsigned integers representable with {bitlen} bits, but got {codes=}"
+        )
+
+    nbytes = (bitlen + 7) // 8
+    words = codes.astype(">u8").ravel()
+    words <<= np.uint64(8 * nbytes - bitlen)
+    return bytearray(words.view(np.uint8).reshape(-1, 8)[:, 8 - nbytes :].tobytes())
+
+
+def extract_bitfield_ndarray(
+    codes: npt.ArrayLike, offset: int, bitlen: int
+) -> npt.NDArray[np.uint64]:
+    """Extract the bitfield at 'offset' with 'bitlen' bits from every code,
+    which corresponds to the slice [offset:offset+bitlen] of the frame as
+    bitarray (index 0 == LSB).
+
+    :param codes: unsigned integers, e.g. from bytes_to_uint_ndarray()
+    :param offset: bit position of the LSB of the bitfield.
+    :param bitlen: number of bits of the bitfield.
+    :return: numpy array (dtype uint64) with the value of the bitfield per code.
+    """
+    if offset < 0 or bitlen < 1 or offset + bitlen > _max_bitlen:
+        raise ValueError(
+            f"Expected bitfield within {_max_bitlen} bits, but got {offset=}, {bitlen=}"
+        )
+
+    mask = np.uint64((1 << bitlen) - 1)
+    return (np.asarray(codes, dtype=np.uint64) >> np.uint64(offset)) & mask
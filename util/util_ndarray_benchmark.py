@@ -0,0 +1,55 @@
+"""Micro-benchmark of util.util_ndarray.
+
+Decoding of the 12-bit conversion result (bits [20:32]) of logged 32-bit
+Ads866x ReadVoltage frames, per sample with util_bitarray against a single
+vectorized call per batch.
+
+Usage:
+    python3 util/util_ndarray_benchmark.py
+"""
+
+from timeit import repeat
+
+import numpy as np
+
+from util import (
+    bytes_to_bitarray,
+    bitarray_to_uint,
+    bytes_to_uint_ndarray,
+    extract_bitfield_ndarray,
+)
+
+
+def decode_per_sample(buf: bytes, nbytes: int) -> list:
+    return [
+        bitarray_to_uint(bytes_to_bitarray(buf[i : i + nbytes])[20:32])
+        for i in range(0, len(buf), nbytes)
+    ]
+
+
+def decode_batch(buf: bytes, bitlen: int) -> np.ndarray:
+    return extract_bitfield_ndarray(bytes_to_uint_ndarray(buf, bitlen), 20, 12)
+
+
+def best_of(stmt, number: int) -> float:
+    """Return the best time per call in seconds."""
+    return min(repeat(stmt, number=number, repeat=5)) / number
+
+
+if __name__ == "__main__":
+    rng = np.random.default_rng(0)
+
+    print(
+        f"{'frames':<8} {'per sample [us]':>16} {'batch [us]':>11} {'speedup':>8} {'frames/s batch':>15}"
+    )
+    for nframes in [10, 1_000, 100_000]:
+        buf = rng.integers(0, 256, 4 * nframes, dtype=np.uint8).tobytes()
+        if decode_per_sample(buf, 4) != decode_batch(buf, 32).tolist():
+            raise RuntimeError(f"Mismatch of decoding for {nframes=}")
+
+        number = max(1, 10_000 // nframes)
+        t_loop = best_of(lambda: decode_per_sample(buf, 4), number)
+        t_batch = best_of(lambda: decode_batch(buf, 32), number)
+        print(
+            f"{nframes:<8} {t_loop * 1e6:>16.1f} {t_batch * 1e6:>11.1f} {t_loop / t_batch:>7.1f}x {nframes / t_batch:>15.3g}"
+        )